@@ -0,0 +1,89 @@
+"""Benchmark path storage for findings on a deep synthetic tree.
+
+Usage: python scripts/bench_path_interning.py [--packages N] [--depth D] [--files F]
+
+Builds N nested chains of D directories, each directory holding F files
+named nul.<i> (reserved device name, so every file is a finding), scans
+it, and compares the bytes the store would hold for three eager path
+strings per finding against the shared PathNode tree findings now use.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from nullout.config import Root  # noqa: E402
+from nullout.scanner import ScanOptions, walk_root  # noqa: E402
+from nullout.store import Store  # noqa: E402
+from nullout.win_paths import to_extended_path  # noqa: E402
+
+
+def build_tree(root: str, packages: int, depth: int, files: int) -> None:
+    for p in range(packages):
+        current = os.path.join(root, f"package-{p:03d}")
+        for d in range(depth):
+            current = os.path.join(current, f"node_modules_{d:02d}")
+            os.makedirs(to_extended_path(current))
+            for i in range(files):
+                with open(to_extended_path(os.path.join(current, f"nul.{i}")), "w"):
+                    pass
+
+
+def measure(store: Store, scan_id: str) -> tuple[int, int, int, int]:
+    """Return (findings, eager string bytes, unique nodes, node bytes)."""
+    eager = 0
+    nodes: dict[int, object] = {}
+    finding_ids = store.get_scan_findings(scan_id)
+    for fid in finding_ids:
+        f = store.get_finding(fid)
+        eager += sum(sys.getsizeof(s) for s in (f.relativePath, f.observedPath, f.canonicalPath))
+        node = f.path
+        while node is not None and id(node) not in nodes:
+            nodes[id(node)] = node
+            node = node.parent
+    interned = sum(sys.getsizeof(n) + sys.getsizeof(n.name) for n in nodes.values())
+    return len(finding_ids), eager, len(nodes), interned
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--packages", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=30)
+    parser.add_argument("--files", type=int, default=10)
+    args = parser.parse_args()
+
+    td = tempfile.mkdtemp(prefix="nullout-bench-")
+    try:
+        build_tree(td, args.packages, args.depth, args.files)
+        store = Store()
+        started = time.perf_counter()
+        result, _ = walk_root(
+            Root("bench", "bench", td),
+            store.new_id("scan"),
+            ScanOptions(recursive=True, include_dirs=False, max_depth=args.depth + 1),
+            store,
+        )
+        elapsed = time.perf_counter() - started
+        scan_id = result.scan_id
+        del result  # response dicts are transient; measure what the store keeps
+
+        findings, eager, n_nodes, interned = measure(store, scan_id)
+        print(f"tree:      {args.packages} packages x depth {args.depth} x {args.files} files")
+        print(f"findings:  {findings} (scan {elapsed * 1000:.0f} ms)")
+        print(f"eager:     {eager:>12,} bytes  (3 path strings per finding)")
+        print(f"interned:  {interned:>12,} bytes  ({n_nodes} path nodes)")
+        if interned:
+            print(f"saving:    {eager / interned:.1f}x")
+    finally:
+        shutil.rmtree(to_extended_path(td), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""Drive the MCP server with a JSON-RPC request mix and report latency.
+
+Usage:
+  python scripts/load_harness.py [--transport stdio|inproc] [--concurrency N]
+                                 [--requests N] [--mix TOOL=WEIGHT,...]
+                                 [--session FILE | --record FILE]
+                                 [--dirs N] [--files N] [--json]
+
+Builds a temp tree (--dirs directories of --files files, a third of them
+hazardous), points one root at it and either spawns the server over stdio
+(python -m nullout.server, requests pipelined on one pipe) or calls
+NullOutServer.handle_rpc in-process from --concurrency threads.
+
+The workload is a synthetic mix of scan_reserved_names, get_finding,
+plan_cleanup and delete_entry, or the steps of an NDJSON session file.
+Each session line is {"tool": ..., "params": {...}}. Params may use
+placeholders filled from earlier responses:
+  "$findingId"      a findingId returned by some scan
+  "$planned"        (delete_entry only) a findingId + confirmToken pair
+                    from some plan_cleanup, each used once
+--record writes the steps that were run to such a file.
+
+Reports spawn-to-first-response time, then per tool: requests, errors,
+skipped (no placeholder value available), throughput and p50/p95/p99 ms.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from nullout.config import Root  # noqa: E402
+from nullout.store import Store  # noqa: E402
+from nullout.tools import set_store  # noqa: E402
+
+ROOT_ID = "root_0"  # load_roots numbers roots from 0
+TOKEN_SECRET = "load-harness-secret"
+DEFAULT_MIX = "scan_reserved_names=1,get_finding=6,plan_cleanup=2,delete_entry=1"
+HAZARD_NAMES = ("NUL.txt", "CON.log", "trailing. ", "AUX")
+PLACEHOLDER_WAIT_S = 5.0
+
+
+def build_tree(root: str, dirs: int, files: int) -> None:
+    for d in range(dirs):
+        current = os.path.join(root, f"d{d // 10:03d}", f"e{d:04d}")
+        os.makedirs(current)
+        for i in range(files):
+            name = HAZARD_NAMES[i % len(HAZARD_NAMES)] + str(i) if i % 3 == 0 else f"ok{i}.txt"
+            with open(os.path.join(current, name), "w") as f:
+                f.write("x")
+
+
+def synthetic_session(mix: str, count: int, seed: int) -> list[dict[str, Any]]:
+    """A warm-up scan, then count steps drawn from the weighted mix."""
+    weights = {}
+    for part in mix.split(","):
+        tool, _, w = part.partition("=")
+        weights[tool.strip()] = float(w or 1)
+    templates = {
+        "scan_reserved_names": {"rootId": ROOT_ID, "recursive": True, "includeDirs": False},
+        "get_finding": {"findingId": "$findingId"},
+        "plan_cleanup": {"findingIds": ["$findingId"], "requestedActions": ["DELETE"]},
+        "delete_entry": "$planned",
+    }
+    unknown = set(weights) - set(templates)
+    if unknown:
+        raise SystemExit(f"unknown tools in --mix: {sorted(unknown)}")
+    rng = random.Random(seed)
+    tools = rng.choices(list(weights), weights=list(weights.values()), k=count)
+    steps = [{"tool": "scan_reserved_names", "params": templates["scan_reserved_names"]}]
+    steps += [{"tool": t, "params": templates[t]} for t in tools]
+    return steps
+
+
+class Placeholders:
+    """Values harvested from responses for later steps to use."""
+
+    def __init__(self, seed: int) -> None:
+        self.finding_ids: list[str] = []
+        self.planned: list[tuple[str, str]] = []
+        self._rng = random.Random(seed)
+        self._cond = threading.Condition()
+
+    def harvest(self, tool: str, result: dict[str, Any]) -> None:
+        if not result.get("ok"):
+            return
+        body = result["result"]
+        with self._cond:
+            if tool == "scan_reserved_names":
+                self.finding_ids.extend(f["findingId"] for f in body["findings"])
+            elif tool == "plan_cleanup":
+                self.planned.extend((e["findingId"], e["confirmToken"]) for e in body["entries"])
+            self._cond.notify_all()
+
+    def resolve(self, params: Any) -> Any | None:
+        """Fill placeholders; None if a value did not turn up in time."""
+        with self._cond:
+            if params == "$planned":
+                if not self._cond.wait_for(lambda: self.planned, PLACEHOLDER_WAIT_S):
+                    return None
+                finding_id, token = self.planned.pop(0)
+                return {"findingId": finding_id, "confirmToken": token}
+            if "$findingId" in json.dumps(params):
+                if not self._cond.wait_for(lambda: self.finding_ids, PLACEHOLDER_WAIT_S):
+                    return None
+                return _substitute(params, lambda: self._rng.choice(self.finding_ids))
+        return params
+
+
+def _substitute(value: Any, pick: Callable[[], str]) -> Any:
+    if value == "$findingId":
+        return pick()
+    if isinstance(value, dict):
+        return {k: _substitute(v, pick) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_substitute(v, pick) for v in value]
+    return value
+
+
+# --- Transports: call(method, params) -> result, safe from many threads ---
+
+
+class InProcess:
+    def __init__(self, root_path: str) -> None:
+        from nullout.server import NullOutServer
+
+        store = Store()
+        set_store(store)
+        roots = {ROOT_ID: Root(ROOT_ID, "load", root_path)}
+        self.server = NullOutServer(roots, store, TOKEN_SECRET.encode())
+
+    def call(self, method: str, params: dict[str, Any]) -> dict[str, Any]:
+        return self.server.handle_rpc({"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+
+    def close(self) -> None:
+        pass
+
+
+class Stdio:
+    """One server process; requests are pipelined and matched by id."""
+
+    def __init__(self, root_path: str) -> None:
+        env = {
+            **os.environ,
+            "NULLOUT_ROOTS": root_path,
+            "NULLOUT_TOKEN_SECRET": TOKEN_SECRET,
+            "NULLOUT_HTTP_PORT": "",  # stdio even if the caller's env enables HTTP
+            "PYTHONPATH": os.pathsep.join(filter(None, [SRC, os.environ.get("PYTHONPATH")])),
+        }
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "nullout.server"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env, text=True, bufsize=1,
+        )
+        self._next_id = 0
+        self._waiting: dict[int, list[Any]] = {}
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self) -> None:
+        for line in self.proc.stdout:
+            resp = json.loads(line)
+            with self._lock:
+                slot = self._waiting.pop(resp["id"])
+            slot.append(resp)
+            slot[0].set()
+
+    def call(self, method: str, params: dict[str, Any]) -> dict[str, Any]:
+        done = threading.Event()
+        slot: list[Any] = [done]
+        with self._lock:
+            self._next_id += 1
+            rpc_id = self._next_id
+            self._waiting[rpc_id] = slot
+            self.proc.stdin.write(json.dumps({"jsonrpc": "2.0", "id": rpc_id, "method": method, "params": params}) + "\n")
+        done.wait()
+        return slot[1]
+
+    def close(self) -> None:
+        self.proc.stdin.close()
+        self.proc.wait(timeout=30)
+
+
+# --- Run and report ---
+
+
+def percentile(sorted_ms: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_ms:
+        return 0.0
+    rank = max(1, -(-len(sorted_ms) * pct // 100))
+    return sorted_ms[int(rank) - 1]
+
+
+def run(
+    transport: Any,
+    steps: list[dict[str, Any]],
+    concurrency: int,
+    seed: int,
+    record: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    placeholders = Placeholders(seed)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    skipped: dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+    cursor = iter(steps)
+
+    def worker() -> None:
+        while True:
+            with lock:
+                step = next(cursor, None)
+            if step is None:
+                return
+            tool = step["tool"]
+            params = placeholders.resolve(step["params"])
+            if params is None:
+                with lock:
+                    skipped[tool] += 1
+                continue
+            started = time.perf_counter()
+            resp = transport.call(tool, params)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            result = resp.get("result") or {}
+            placeholders.harvest(tool, result)
+            with lock:
+                latencies[tool].append(elapsed_ms)
+                if "error" in resp or not result.get("ok"):
+                    errors[tool] += 1
+                if record is not None:
+                    record.append(step)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall_s = time.perf_counter() - started
+
+    tools = {}
+    for tool in sorted(set(latencies) | set(skipped)):
+        ms = sorted(latencies[tool])
+        tools[tool] = {
+            "requests": len(ms),
+            "errors": errors[tool],
+            "skipped": skipped[tool],
+            "throughputPerS": len(ms) / wall_s if wall_s else 0.0,
+            "p50Ms": percentile(ms, 50),
+            "p95Ms": percentile(ms, 95),
+            "p99Ms": percentile(ms, 99),
+        }
+    total = sum(t["requests"] for t in tools.values())
+    return {"wallS": wall_s, "requests": total, "throughputPerS": total / wall_s if wall_s else 0.0, "tools": tools}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transport", choices=["stdio", "inproc"], default="stdio")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=500, help="synthetic steps after the warm-up scan")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--session", help="replay this NDJSON session instead of a synthetic mix")
+    parser.add_argument("--record", help="write the steps that ran to this NDJSON file")
+    parser.add_argument("--dirs", type=int, default=200)
+    parser.add_argument("--files", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.session:
+        with open(args.session, encoding="utf-8") as f:
+            steps = [json.loads(line) for line in f if line.strip()]
+    else:
+        steps = synthetic_session(args.mix, args.requests, args.seed)
+
+    td = tempfile.mkdtemp(prefix="nullout-load-")
+    transport = None
+    try:
+        build_tree(td, args.dirs, args.files)
+        spawn = time.perf_counter()
+        transport = Stdio(td) if args.transport == "stdio" else InProcess(td)
+        transport.call("tools/list", {})
+        first_response_ms = (time.perf_counter() - spawn) * 1000
+
+        record: list[dict[str, Any]] | None = [] if args.record else None
+        report = run(transport, steps, args.concurrency, args.seed, record)
+        report = {"transport": args.transport, "concurrency": args.concurrency,
+                  "firstResponseMs": first_response_ms, **report}
+        if record is not None:
+            with open(args.record, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(step) + "\n" for step in record)
+    finally:
+        if transport is not None:
+            transport.close()
+        shutil.rmtree(td, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"transport:      {report['transport']} x{report['concurrency']}")
+    print(f"first response: {report['firstResponseMs']:.1f} ms")
+    print(f"total:          {report['requests']} requests in {report['wallS']:.2f} s "
+          f"({report['throughputPerS']:.0f}/s)")
+    print(f"{'tool':<22}{'reqs':>7}{'err':>6}{'skip':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for tool, t in report["tools"].items():
+        print(f"{tool:<22}{t['requests']:>7}{t['errors']:>6}{t['skipped']:>6}{t['throughputPerS']:>9.0f}"
+              f"{t['p50Ms']:>9.2f}{t['p95Ms']:>9.2f}{t['p99Ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
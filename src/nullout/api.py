@@ -0,0 +1,130 @@
+"""In-process Python API for scanning and classification.
+
+For callers that import nullout instead of speaking MCP. Scanner.iter_findings
+streams lightweight FindingRecords while the walk is still running; scan and
+scan_all return the same results the MCP tools are built from.
+
+    from nullout.api import Scanner
+
+    for record in Scanner().iter_findings("/srv/share", exclude=["node_modules"]):
+        print(record.path, record.hazards)
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from typing import Any, Iterable, Iterator, Mapping
+
+from nullout.config import Root
+from nullout.estimate import HazardEstimate, estimate_root
+from nullout.models import FindingRecord
+from nullout.scanner import (
+    DEFAULT_MAX_DEPTH,
+    RootLayout,
+    ScanOptions,
+    ScanResult,
+    scan_roots,
+    stream_root,
+    walk_root,
+)
+from nullout.store import Store
+from nullout.trace import ScanTrace
+
+__all__ = ["FindingRecord", "HazardEstimate", "Scanner", "ScanOptions", "ScanResult"]
+
+STREAM_BUFFER = 64  # directory batches queued ahead of the consumer
+_DONE = object()
+
+
+class Scanner:
+    """Scans roots in-process. Findings from scan/scan_all go into store."""
+
+    def __init__(self, store: Store | None = None) -> None:
+        self.store = store if store is not None else Store()
+
+    def iter_findings(
+        self,
+        root: str | Root,
+        *,
+        recursive: bool = True,
+        include_dirs: bool = False,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        exclude: Iterable[str] = (),
+        identity: bool = True,
+        workers_per_device: int | None = None,
+        prioritize: bool = False,
+    ) -> Iterator[FindingRecord]:
+        """Yield a FindingRecord per flagged entry as the walk finds it.
+
+        The walk runs on background threads and stays at most STREAM_BUFFER
+        directories ahead of the consumer. identity=False skips the
+        per-entry volume/file id lookup. prioritize=True walks directories
+        hot in earlier scans of this root first (nullout.heat). Closing the
+        generator early (break) stops the walk. Nothing is registered in the
+        store.
+        """
+        if not isinstance(root, Root):
+            root = Root("root_api", os.path.basename(os.path.abspath(root)), root)
+        opts = ScanOptions(
+            recursive=recursive, include_dirs=include_dirs, max_depth=max_depth, excludes=tuple(exclude),
+            prioritize=prioritize,
+        )
+        batches: queue.Queue[Any] = queue.Queue(STREAM_BUFFER)
+        cancel = threading.Event()
+
+        def put(item: Any) -> None:
+            while not cancel.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def run() -> None:
+            try:
+                stream_root(root, opts, put, cancel, identity, workers_per_device)
+            except BaseException as e:  # handed to the consumer
+                put(e)
+            else:
+                put(_DONE)
+
+        thread = threading.Thread(target=run, name="nullout-stream", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = batches.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield from item
+        finally:
+            cancel.set()
+            thread.join()
+
+    def scan(
+        self,
+        root: Root,
+        opts: ScanOptions,
+        scan_id: str | None = None,
+        **kwargs: Any,
+    ) -> tuple[ScanResult, list[dict[str, Any]]]:
+        """Walk one root and register its findings; see scanner.walk_root."""
+        return walk_root(root, scan_id or self.store.new_id("scan"), opts, self.store, **kwargs)
+
+    def scan_all(
+        self,
+        roots: dict[str, Root],
+        opts: ScanOptions,
+        workers_per_device: int | None = None,
+        trace: ScanTrace | None = None,
+        root_opts: Mapping[str, ScanOptions] | None = None,
+    ) -> tuple[list[ScanResult], RootLayout, list[dict[str, Any]]]:
+        """Scan every root concurrently; see scanner.scan_roots."""
+        return scan_roots(roots, opts, self.store, workers_per_device, trace, root_opts)
+
+    def estimate(self, root: Root, opts: ScanOptions, **kwargs: Any) -> HazardEstimate:
+        """Estimate hazard counts from random directory probes; see estimate.estimate_root."""
+        return estimate_root(root, opts, **kwargs)
@@ -0,0 +1,267 @@
+"""Append-only NDJSON audit journal for plans and deletions.
+
+With NULLOUT_AUDIT_DIR set, plan_cleanup records each plan and delete_entry
+(and every retry-queue attempt) records an intent before it touches the
+target and an outcome after. Each record carries the finding's identity
+bindings. A writer thread commits whatever has queued up, many records per
+fsync, at most COMMIT_INTERVAL_S after the first one arrived. A delete waits
+for the group holding its intent to be fsynced before it touches the
+target, so concurrent deletes share one fsync; outcome records and plans
+are not waited on.
+
+The active file is audit.ndjson. Past NULLOUT_AUDIT_MAX_BYTES it is renamed
+to audit-<first seq>.ndjson and a new file is started; rotated files are
+never removed or overwritten, and a restart continues the seq after the
+newest one. After a crash the last line may be cut short (readers skip
+it), and plan or outcome records from the last commit interval may be
+missing. An intent without an outcome means the process stopped between the two; check
+whether the target still exists. plan_status replays the journal for one
+plan.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Iterator
+
+JOURNAL_NAME = "audit.ndjson"
+COMMIT_INTERVAL_S = 0.02  # how long the writer gathers records before one fsync
+MAX_BATCH = 512  # commit early once this many records are queued
+COMMIT_WAIT_TIMEOUT_S = 5.0  # longest a delete waits for its intent to be committed
+_TAIL_BYTES = 64 * 1024  # enough of the old file to find its last seq
+
+
+def _last_seq(path: str) -> int:
+    """Highest seq in an existing journal file (0 if none or unreadable)."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - _TAIL_BYTES))
+            lines = f.read().splitlines()
+    except OSError:
+        return 0
+    for line in reversed(lines):
+        try:
+            return int(json.loads(line)["seq"])
+        except (ValueError, KeyError, TypeError):
+            continue  # torn last line, or a partial first line of the tail
+    return 0
+
+
+def _first_seq_in(path: str) -> int | None:
+    """Lowest seq in an existing journal file (None if it has no complete record)."""
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    return int(json.loads(line)["seq"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+    except OSError:
+        pass
+    return None
+
+
+def _rotated_paths(directory: str) -> list[str]:
+    """Rotated journal files, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, "audit-*.ndjson")))
+
+
+def _fsync_dir(directory: str) -> None:
+    """Make a rename in directory durable (no-op where directories cannot be opened)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Windows
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class AuditJournal:
+    """Group-committing NDJSON writer for one journal directory."""
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.path = os.path.join(directory, JOURNAL_NAME)
+        self._seq = _last_seq(self.path)
+        first = _first_seq_in(self.path)
+        if first is None:
+            # Empty active file, e.g. just after a rotation: continue after the newest rotated one
+            rotated = _rotated_paths(directory)
+            self._seq = max(self._seq, _last_seq(rotated[-1]) if rotated else 0)
+        self._file = open(self.path, "ab")
+        if self._file.tell() and not _ends_with_newline(self.path):
+            self._file.write(b"\n")  # close a line torn by a crash so it stays one bad line
+        # first seq in the active file (its name once rotated)
+        self._first_seq = first if first is not None else self._seq + 1
+        self._pending: list[bytes] = []
+        self._committed = self._seq
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error: OSError | None = None  # set if a write failed; the writer has stopped
+        self.commits = 0  # fsyncs so far
+        self._thread = threading.Thread(target=self._run, name="nullout-audit", daemon=True)
+        self._thread.start()
+
+    def append(self, event: str, **fields: Any) -> int:
+        """Queue one record; returns its seq. Never waits for the disk."""
+        with self._cond:
+            self._seq += 1
+            record = {"seq": self._seq, "ts": round(time.time(), 3), "event": event, **fields}
+            self._pending.append(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+            if len(self._pending) == 1 or len(self._pending) >= MAX_BATCH:
+                self._cond.notify_all()
+            return self._seq
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every record queued so far is on disk."""
+        with self._cond:
+            target = self._seq
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._committed >= target or self._closed, timeout)
+
+    def wait_committed(self, seq: int, timeout: float | None = None) -> bool:
+        """Wait until the record with this seq is on disk; False on timeout or write error."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._committed >= seq or self._error is not None, timeout)
+            return self._committed >= seq
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending and self._closed:
+                    return
+                # Let a group gather; a full batch or close() cuts the wait short
+                self._cond.wait_for(lambda: len(self._pending) >= MAX_BATCH or self._closed, COMMIT_INTERVAL_S)
+                batch, self._pending = self._pending, []
+                last = self._seq
+            try:
+                self._file.write(b"".join(batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                if self._file.tell() >= self.max_bytes:
+                    self._rotate(last)
+            except OSError as e:
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._committed = last
+                self.commits += 1
+                self._cond.notify_all()
+
+    def _rotate(self, last_seq: int) -> None:
+        """Rename the active file to audit-<first seq>.ndjson; never replaces an existing file."""
+        self._file.close()
+        target = os.path.join(self.directory, f"audit-{self._first_seq:012d}.ndjson")
+        n = 0
+        while True:
+            try:
+                os.link(self.path, target)  # fails rather than overwrite
+                os.unlink(self.path)
+                break
+            except FileExistsError:
+                pass
+            except OSError:
+                # No hard links on this filesystem: check, then rename
+                if not os.path.exists(target):
+                    os.rename(self.path, target)
+                    break
+            n += 1
+            target = os.path.join(self.directory, f"audit-{self._first_seq:012d}-{n}.ndjson")
+        _fsync_dir(self.directory)
+        self._file = open(self.path, "ab")
+        self._first_seq = last_seq + 1
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._file.close()
+
+
+def read_journal(directory: str) -> Iterator[dict[str, Any]]:
+    """Every complete record in the directory, rotated files first."""
+    paths = _rotated_paths(directory)
+    paths.append(os.path.join(directory, JOURNAL_NAME))
+    for path in paths:
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            continue
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # line torn by a crash
+
+
+def plan_status(directory: str, plan_id: str) -> dict[str, Any]:
+    """Replay the journal for one plan: what each of its entries got to.
+
+    Per finding, status is "planned" (no delete attempted), "started"
+    (intent recorded, no outcome: interrupted), "deleted" or "failed".
+    """
+    entries: dict[str, dict[str, Any]] = {}
+    found = False
+    for record in read_journal(directory):
+        if record.get("planId") != plan_id:
+            continue
+        event = record["event"]
+        if event == "plan":
+            found = True
+            for e in record["entries"]:
+                entries[e["findingId"]] = {**e, "status": "planned", "attempts": 0}
+            continue
+        entry = entries.setdefault(record["findingId"], {"findingId": record["findingId"], "attempts": 0})
+        if event == "delete_intent":
+            entry["status"] = "started"
+            entry["attempts"] += 1
+        elif event == "delete_outcome":
+            entry["status"] = "deleted" if record["ok"] else "failed"
+            entry["code"] = record.get("code")
+    return {"planId": plan_id, "found": found, "entries": list(entries.values())}
+
+
+# Module-level journal; None when NULLOUT_AUDIT_DIR is unset
+journal_ref: AuditJournal | None = None
+
+
+def set_audit_journal(journal: AuditJournal | None) -> None:
+    """Install the journal at startup."""
+    global journal_ref
+    journal_ref = journal
+
+
+def record(event: str, **fields: Any) -> None:
+    """Append to the installed journal, if any."""
+    journal = journal_ref
+    if journal is not None:
+        journal.append(event, **fields)
+
+
+def record_committed(event: str, **fields: Any) -> bool:
+    """Append and wait for the record's group commit; False if it did not reach the disk."""
+    journal = journal_ref
+    if journal is None:
+        return True
+    return journal.wait_committed(journal.append(event, **fields), COMMIT_WAIT_TIMEOUT_S)
@@ -0,0 +1,174 @@
+"""Command-line entry point: the MCP server, or one-shot scan/classify runs.
+
+    nullout-mcp                      run the MCP server (stdio or HTTP)
+    nullout-mcp scan --root PATH     scan and print findings, no MCP framing
+    nullout-mcp classify [PATH ...]  classify names without walking anything
+    nullout-mcp audit PLAN_ID        replay the audit journal for one plan
+
+scan and classify exit with EXIT_HAZARDS when any hazard was found, so they
+can gate CI jobs and cron scans. They import only the scanner, not the
+server, its tools or transports.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Iterable, TextIO
+
+EXIT_CLEAN = 0
+EXIT_HAZARDS = 1
+# argparse exits with 2 on usage errors
+EXIT_NOT_FOUND = 3  # audit: plan not in the journal
+
+SUBCOMMANDS = ("scan", "classify", "audit")
+
+
+def _record_row(record: Any) -> dict[str, Any]:
+    return {
+        "path": record.path,
+        "relativePath": record.relative_path,
+        "entryType": record.entry_type,
+        "hazards": list(record.hazards),
+        "size": record.size,
+        "volumeSerial": record.volume_serial,
+        "fileId": record.file_id,
+    }
+
+
+def cmd_scan(args: argparse.Namespace, out: TextIO) -> int:
+    """Stream NDJSON findings (or one summary object per root)."""
+    from nullout.api import Scanner
+    from nullout.config import Root, load_lane_limits, load_max_dir_fds
+    from nullout.dirfd import set_dir_fd_limit
+    from nullout.scanner import ScanOptions, set_lane_limits
+    from nullout.summary import HazardHistogram
+
+    set_lane_limits(load_lane_limits())
+    set_dir_fd_limit(load_max_dir_fds())
+    api = Scanner()
+    flagged = 0
+    for i, path in enumerate(args.root):
+        root = Root(f"root_{i}", os.path.basename(path) or path, os.path.abspath(path))
+        if args.format == "summary":
+            opts = ScanOptions(
+                recursive=True, include_dirs=args.include_dirs, max_depth=args.max_depth,
+                excludes=tuple(args.exclude),
+            )
+            result, lanes = api.scan(
+                root, opts, workers_per_device=args.workers, summary=HazardHistogram(args.top_directories),
+            )
+            flagged += result.stats.flagged
+            out.write(json.dumps({
+                "root": root.path,
+                "summary": result.summary.to_dict(),
+                "stats": {**result.stats.to_dict(), "lanes": lanes},
+            }) + "\n")
+            continue
+        records = api.iter_findings(
+            root, include_dirs=args.include_dirs, max_depth=args.max_depth, exclude=args.exclude,
+            identity=args.identity, workers_per_device=args.workers,
+        )
+        for record in records:
+            flagged += 1
+            out.write(json.dumps(_record_row(record)) + "\n")
+    out.flush()
+    return EXIT_HAZARDS if flagged else EXIT_CLEAN
+
+
+def _classify_inputs(paths: list[str], stdin: TextIO) -> Iterable[str]:
+    if paths and paths != ["-"]:
+        return paths
+    return (line.rstrip("\r\n") for line in stdin if line.strip())
+
+
+def cmd_classify(args: argparse.Namespace, out: TextIO, stdin: TextIO) -> int:
+    """Classify each path by name and length; lstat only for reparse points."""
+    from nullout.hazards import detect_hazards
+    from nullout.win_paths import is_reparse_point, to_extended_path
+
+    flagged = 0
+    for path in _classify_inputs(args.paths, stdin):
+        name = path.rstrip("/\\") or path
+        name = name.replace("\\", "/").rsplit("/", 1)[-1]
+        reparse = os.path.lexists(path) and is_reparse_point(path)
+        hazards = detect_hazards(name, len(to_extended_path(path)), is_reparse=reparse)
+        if hazards:
+            flagged += 1
+        elif not args.all:
+            continue
+        out.write(json.dumps({"path": path, "hazards": [h["code"] for h in hazards]}) + "\n")
+    out.flush()
+    return EXIT_HAZARDS if flagged else EXIT_CLEAN
+
+
+def cmd_audit(args: argparse.Namespace, out: TextIO) -> int:
+    """One NDJSON line per plan entry with how far its deletion got."""
+    from nullout.audit import plan_status
+
+    status = plan_status(args.dir, args.plan_id)
+    if not status["found"] and not status["entries"]:
+        print(f"nullout: plan {args.plan_id} not found in {args.dir}", file=sys.stderr)
+        return EXIT_NOT_FOUND
+    for entry in status["entries"]:
+        out.write(json.dumps(entry) + "\n")
+    out.flush()
+    return EXIT_CLEAN
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from nullout.scanner import DEFAULT_MAX_DEPTH
+    from nullout.summary import DEFAULT_TOP_DIRECTORIES
+
+    parser = argparse.ArgumentParser(prog="nullout-mcp", description="Find Windows-hazardous file names.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scan = sub.add_parser("scan", help="scan directories and print findings as NDJSON")
+    scan.add_argument("--root", action="append", required=True, help="directory to scan (repeatable)")
+    scan.add_argument("--workers", type=int, help="concurrent directory scans per device")
+    scan.add_argument("--format", choices=["ndjson", "summary"], default="ndjson")
+    scan.add_argument("--exclude", action="append", default=[], help="directory pattern to skip (repeatable)")
+    scan.add_argument("--include-dirs", action="store_true", help="also classify directory names")
+    scan.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH)
+    scan.add_argument("--no-identity", dest="identity", action="store_false",
+                      help="skip volume serial / file id capture (ndjson)")
+    scan.add_argument("--top-directories", type=int, default=DEFAULT_TOP_DIRECTORIES, help="(summary)")
+
+    classify = sub.add_parser("classify", help="classify paths given as arguments or on stdin")
+    classify.add_argument("paths", nargs="*", help="paths to classify; '-' or none reads one per line from stdin")
+    classify.add_argument("--all", action="store_true", help="also print paths without hazards")
+
+    audit = sub.add_parser("audit", help="show which entries of a plan were deleted, per the audit journal")
+    audit.add_argument("plan_id")
+    audit.add_argument("--dir", default=os.environ.get("NULLOUT_AUDIT_DIR"),
+                       help="journal directory (default NULLOUT_AUDIT_DIR)")
+    return parser
+
+
+def run(argv: list[str], out: TextIO = sys.stdout, stdin: TextIO = sys.stdin) -> int:
+    """Run a scan, classify or audit command line; returns the exit status."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "scan":
+        for path in args.root:
+            if not os.path.isdir(path):
+                parser.error(f"--root is not a directory: {path}")
+        if args.workers is not None and args.workers < 1:
+            parser.error("--workers must be at least 1")
+        return cmd_scan(args, out)
+    if args.command == "audit":
+        if not args.dir or not os.path.isdir(args.dir):
+            parser.error("audit needs --dir or NULLOUT_AUDIT_DIR pointing at the journal directory")
+        return cmd_audit(args, out)
+    return cmd_classify(args, out, stdin)
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    if argv and argv[0] in SUBCOMMANDS:
+        sys.exit(run(argv))
+    from nullout.server import main as serve
+
+    serve()
@@ -1,9 +1,11 @@
-"""Configuration: allowlisted roots, token secret, TTL."""
+"""Configuration: allowlisted roots, token secret, TTL, I/O lanes."""
 
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from nullout.win_paths import root_prefix
 
 
 @dataclass(frozen=True)
@@ -11,11 +13,43 @@ class Root:
     root_id: str
     display_name: str
     path: str  # win32 style, e.g. C:\Users\me\Downloads
+    excludes: tuple[str, ...] = ()  # directory patterns never walked, see nullout.excludes
+    max_depth: int | None = None  # default maxDepth for scans of this root
+    max_workers_per_device: int | None = None  # default maxWorkersPerDevice for this root
+    # Precomputed once: absolute path, and normcased prefix ending in os.sep
+    abs_path: str = field(init=False, repr=False, compare=False)
+    prefix: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        abs_path = os.path.abspath(self.path)  # Root paths never have trailing dots/spaces
+        object.__setattr__(self, "abs_path", abs_path)
+        object.__setattr__(self, "prefix", root_prefix(abs_path))
+
+    def contains(self, target_abs: str) -> bool:
+        """True if target_abs is this root or inside it; one normalization of target_abs."""
+        t = os.path.normcase(os.path.normpath(target_abs))
+        return t.startswith(self.prefix) or t == self.prefix[:-1]
 
 
 REPARSE_POLICY = "deny_all"
 TOKEN_TTL_SECONDS = 300  # 5 minutes
+CONTINUATION_TTL_SECONDS = 3600  # per resume hop; each resume issues a fresh token
 STRATEGY_V1 = "WIN_EXTENDED_PATH_DELETE"
+DEFAULT_LANE_WORKERS = 4  # concurrent directory scans per device
+DEFAULT_MAX_DIR_FDS = 256  # open directory descriptors for fd-relative traversal
+DEFAULT_HTTP_HOST = "127.0.0.1"
+DEFAULT_AUDIT_MAX_BYTES = 64 * 1024**2  # audit journal rotation size
+
+
+@dataclass(frozen=True)
+class LaneLimits:
+    """Per-device scan concurrency. Devices are keyed by st_dev / volume serial."""
+
+    default: int = DEFAULT_LANE_WORKERS
+    per_device: dict[int, int] = field(default_factory=dict)
+
+    def for_device(self, device: int) -> int:
+        return self.per_device.get(device, self.default)
 
 
 def get_token_secret() -> bytes:
@@ -29,12 +63,77 @@ def get_token_secret() -> bytes:
     return secret.encode("utf-8")
 
 
+def get_http_token() -> bytes:
+    """Return the HTTP transport bearer token from env. Fail closed if missing."""
+    token = os.environ.get("NULLOUT_HTTP_TOKEN", "").strip()
+    if not token:
+        raise RuntimeError(
+            "NULLOUT_HTTP_TOKEN environment variable is required with NULLOUT_HTTP_PORT. "
+            "Generate a random value: python -c \"import secrets; print(secrets.token_hex(32))\""
+        )
+    return token.encode("utf-8")
+
+
+def get_export_dir() -> str | None:
+    """Return the export directory from NULLOUT_EXPORT_DIR, or None if exports are off.
+
+    Exports are only ever written inside this directory. Fail closed if it
+    is set but does not exist.
+    """
+    raw = os.environ.get("NULLOUT_EXPORT_DIR", "").strip()
+    if not raw:
+        return None
+    path = os.path.abspath(raw)
+    if not os.path.isdir(path):
+        raise RuntimeError(f"NULLOUT_EXPORT_DIR does not exist or is not a directory: {path}")
+    return path
+
+
+def get_snapshot_dir() -> str | None:
+    """Return the snapshot directory from NULLOUT_SNAPSHOT_DIR, or None if snapshots are off.
+
+    Snapshots are written here by save_snapshot and mapped again at startup.
+    Fail closed if it is set but does not exist.
+    """
+    raw = os.environ.get("NULLOUT_SNAPSHOT_DIR", "").strip()
+    if not raw:
+        return None
+    path = os.path.abspath(raw)
+    if not os.path.isdir(path):
+        raise RuntimeError(f"NULLOUT_SNAPSHOT_DIR does not exist or is not a directory: {path}")
+    return path
+
+
+def get_roots_file() -> str | None:
+    """Return the roots file from NULLOUT_ROOTS_FILE, or None to use NULLOUT_ROOTS.
+
+    See nullout.roots for the file format. Fail closed if it is set but missing.
+    """
+    raw = os.environ.get("NULLOUT_ROOTS_FILE", "").strip()
+    if not raw:
+        return None
+    path = os.path.abspath(raw)
+    if not os.path.isfile(path):
+        raise RuntimeError(f"NULLOUT_ROOTS_FILE does not exist or is not a file: {path}")
+    return path
+
+
+def load_global_excludes() -> tuple[str, ...]:
+    """NULLOUT_EXCLUDES: semicolon-separated directory patterns for every root."""
+    return tuple(
+        p.strip() for p in os.environ.get("NULLOUT_EXCLUDES", "").split(";") if p.strip()
+    )
+
+
 def load_roots() -> dict[str, Root]:
     """Load allowlisted roots from NULLOUT_ROOTS env var.
 
     Format: semicolon-separated absolute paths.
     Example: NULLOUT_ROOTS=C:\\Users\\me\\Downloads;C:\\temp\\cleanup
 
+    Optional NULLOUT_EXCLUDES (semicolon-separated directory patterns,
+    e.g. node_modules;**/.git/objects) applies to every root.
+
     Fail closed if no roots configured.
     """
     raw = os.environ.get("NULLOUT_ROOTS", "")
@@ -42,9 +141,12 @@ def load_roots() -> dict[str, Root]:
         raise RuntimeError(
             "NULLOUT_ROOTS environment variable is required. "
             "Set semicolon-separated absolute paths: "
-            "NULLOUT_ROOTS=C:\\Users\\me\\Downloads;C:\\temp"
+            "NULLOUT_ROOTS=C:\\Users\\me\\Downloads;C:\\temp "
+            "(or point NULLOUT_ROOTS_FILE at a roots file)"
         )
 
+    excludes = load_global_excludes()
+
     roots: dict[str, Root] = {}
     for i, path in enumerate(raw.split(";")):
         path = path.strip()
@@ -55,9 +157,143 @@ def load_roots() -> dict[str, Root]:
             raise RuntimeError(f"Configured root does not exist or is not a directory: {abs_path}")
         root_id = f"root_{i}"
         display_name = os.path.basename(abs_path) or abs_path
-        roots[root_id] = Root(root_id=root_id, display_name=display_name, path=abs_path)
+        roots[root_id] = Root(
+            root_id=root_id, display_name=display_name, path=abs_path, excludes=excludes,
+        )
 
     if not roots:
         raise RuntimeError("NULLOUT_ROOTS is set but contains no valid paths.")
 
     return roots
+
+
+def load_lane_limits() -> LaneLimits:
+    """Load per-device scan concurrency from NULLOUT_IO_LANES env var.
+
+    Format: semicolon-separated key=workers pairs. The key is either
+    "default" or any path on the device the limit applies to.
+    Example: NULLOUT_IO_LANES=default=4;D:\\=1;\\\\nas\\share=2
+
+    Unset means DEFAULT_LANE_WORKERS for every device.
+    """
+    raw = os.environ.get("NULLOUT_IO_LANES", "")
+    default = DEFAULT_LANE_WORKERS
+    per_device: dict[int, int] = {}
+
+    for item in raw.split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        key, sep, value = item.rpartition("=")
+        if not sep or not key.strip() or not value.strip().isdigit() or int(value) < 1:
+            raise RuntimeError(f"Invalid NULLOUT_IO_LANES entry (expected key=workers): {item!r}")
+        key, workers = key.strip(), int(value)
+        if key == "default":
+            default = workers
+            continue
+        try:
+            per_device[os.stat(key).st_dev] = workers
+        except OSError as e:
+            raise RuntimeError(f"NULLOUT_IO_LANES path is not accessible: {key}") from e
+
+    return LaneLimits(default=default, per_device=per_device)
+
+
+def load_max_dir_fds() -> int:
+    """Load the open directory-descriptor cap from NULLOUT_MAX_DIR_FDS.
+
+    0 turns fd-relative traversal off. Unset means DEFAULT_MAX_DIR_FDS.
+    Ignored on Windows, which always uses path-based calls.
+    """
+    raw = os.environ.get("NULLOUT_MAX_DIR_FDS", "").strip()
+    if not raw:
+        return DEFAULT_MAX_DIR_FDS
+    if not raw.isdigit():
+        raise RuntimeError(f"Invalid NULLOUT_MAX_DIR_FDS (expected a non-negative integer): {raw!r}")
+    return int(raw)
+
+
+def load_http_address() -> tuple[str, int] | None:
+    """Load the HTTP transport address from NULLOUT_HTTP_PORT / NULLOUT_HTTP_HOST.
+
+    Unset port means the stdio transport (None). The host must be loopback.
+    """
+    raw = os.environ.get("NULLOUT_HTTP_PORT", "").strip()
+    if not raw:
+        return None
+    if not raw.isdigit() or not 0 < int(raw) < 65536:
+        raise RuntimeError(f"Invalid NULLOUT_HTTP_PORT (expected 1-65535): {raw!r}")
+    host = os.environ.get("NULLOUT_HTTP_HOST", "").strip() or DEFAULT_HTTP_HOST
+    if host not in ("127.0.0.1", "localhost", "::1"):
+        raise RuntimeError(f"NULLOUT_HTTP_HOST must be a loopback address, got: {host!r}")
+    return host, int(raw)
+
+
+_SIZE_SUFFIXES = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def _load_size(name: str) -> int | None:
+    """Bytes from env var name, with an optional K/M/G suffix; None if unset."""
+    raw = os.environ.get(name, "").strip().upper().removesuffix("B")
+    if not raw:
+        return None
+    number, suffix = (raw[:-1], raw[-1]) if raw[-1] in "KMG" else (raw, "")
+    if not number.isdigit():
+        raise RuntimeError(f"Invalid {name} (expected bytes with optional K/M/G suffix): {raw!r}")
+    return int(number) * _SIZE_SUFFIXES[suffix]
+
+
+def load_max_scan_memory() -> int:
+    """Load the per-scan memory budget in bytes from NULLOUT_MAX_SCAN_MEMORY.
+
+    Accepts a byte count with an optional K/M/G suffix (e.g. 256M).
+    Unset or 0 means unlimited: findings are never spilled to disk.
+    """
+    return _load_size("NULLOUT_MAX_SCAN_MEMORY") or 0
+
+
+def get_audit_dir() -> str | None:
+    """Return the audit journal directory from NULLOUT_AUDIT_DIR, or None if auditing is off.
+
+    Fail closed if it is set but does not exist.
+    """
+    raw = os.environ.get("NULLOUT_AUDIT_DIR", "").strip()
+    if not raw:
+        return None
+    path = os.path.abspath(raw)
+    if not os.path.isdir(path):
+        raise RuntimeError(f"NULLOUT_AUDIT_DIR does not exist or is not a directory: {path}")
+    return path
+
+
+def get_trace_dir() -> str | None:
+    """Return the scan trace directory from NULLOUT_TRACE_DIR, or None if trace files are off.
+
+    Traced scans still report per-phase timings without it. Fail closed if
+    it is set but does not exist.
+    """
+    raw = os.environ.get("NULLOUT_TRACE_DIR", "").strip()
+    if not raw:
+        return None
+    path = os.path.abspath(raw)
+    if not os.path.isdir(path):
+        raise RuntimeError(f"NULLOUT_TRACE_DIR does not exist or is not a directory: {path}")
+    return path
+
+
+def load_trace_all() -> bool:
+    """Whether every scan is traced, from NULLOUT_TRACE (0 or 1, default 0)."""
+    raw = os.environ.get("NULLOUT_TRACE", "").strip()
+    if raw not in ("", "0", "1"):
+        raise RuntimeError(f"NULLOUT_TRACE must be 0 or 1: {raw!r}")
+    return raw == "1"
+
+
+def load_audit_max_bytes() -> int:
+    """Size at which the audit journal rotates, from NULLOUT_AUDIT_MAX_BYTES (K/M/G suffix)."""
+    size = _load_size("NULLOUT_AUDIT_MAX_BYTES")
+    if size is None:
+        return DEFAULT_AUDIT_MAX_BYTES
+    if size < 1:
+        raise RuntimeError("NULLOUT_AUDIT_MAX_BYTES must be positive")
+    return size
@@ -0,0 +1,196 @@
+"""Directory-descriptor-relative traversal and checks.
+
+Where the OS supports it (os.scandir(fd) and dir_fd= on stat, open,
+rmdir and unlink; not Windows), scans keep an open descriptor for the
+directory being enumerated and open each subdirectory relative to it;
+delete_entry checks and removes its target by name relative to the
+parent's descriptor. Each call then resolves one path component instead
+of the whole path, and renaming an ancestor between the checks and the
+delete cannot redirect them to another entry.
+
+Open descriptors are capped process-wide (NULLOUT_MAX_DIR_FDS); at the
+cap, directories fall back to the path-based calls. On Windows, delete
+targets are a single Win32 handle instead (nullout.win_handle).
+"""
+
+from __future__ import annotations
+
+import os
+import stat
+import threading
+
+from nullout.config import DEFAULT_MAX_DIR_FDS
+from nullout.win_identity import get_identity, identity_from_stat
+from nullout.win_paths import is_reparse_point, to_extended_path
+
+DIR_FD_SUPPORTED = (
+    os.scandir in os.supports_fd
+    and {os.stat, os.open, os.rmdir, os.unlink} <= os.supports_dir_fd
+)
+
+_DIR_FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_CLOEXEC", 0)
+_NOFOLLOW = getattr(os, "O_NOFOLLOW", 0)
+
+
+class DirFdLimiter:
+    """Counts open directory descriptors against a cap. limit 0 disables fd mode."""
+
+    def __init__(self, limit: int = DEFAULT_MAX_DIR_FDS) -> None:
+        self.limit = limit if DIR_FD_SUPPORTED else 0
+        self.peak = 0
+        self._open = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    @property
+    def open_count(self) -> int:
+        return self._open
+
+    def open(self, path: str, dir_fd: int | None = None) -> int | None:
+        """Open a directory, or return None when the cap is reached.
+
+        With dir_fd, path is a single name opened relative to it without
+        following symlinks. Raises OSError if the open itself fails.
+        """
+        with self._lock:
+            if self._open >= self.limit:
+                return None
+            self._open += 1
+            self.peak = max(self.peak, self._open)
+        try:
+            if dir_fd is None:
+                return os.open(path, _DIR_FLAGS)
+            return os.open(path, _DIR_FLAGS | _NOFOLLOW, dir_fd=dir_fd)
+        except BaseException:
+            with self._lock:
+                self._open -= 1
+            raise
+
+    def close(self, fd: int) -> None:
+        try:
+            os.close(fd)
+        finally:
+            with self._lock:
+                self._open -= 1
+
+
+class EntryChangedError(OSError):
+    """The entry was replaced between the identity check and the delete."""
+
+
+class PathEntry:
+    """An entry checked and removed by full path (fallback when neither a
+    single handle nor a directory descriptor is available)."""
+
+    relative_to_dir_fd = False
+    single_handle = False
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def is_reparse(self) -> bool:
+        return is_reparse_point(self.path)
+
+    def identity(self) -> tuple[str, str]:
+        return get_identity(self.path)
+
+    def is_empty_dir(self) -> bool:
+        with os.scandir(to_extended_path(self.path)) as it:
+            return not any(True for _ in it)
+
+    def remove(self, is_dir: bool) -> None:
+        ext_path = to_extended_path(self.path)
+        if is_dir:
+            os.rmdir(ext_path)
+        else:
+            os.remove(ext_path)
+
+    def close(self) -> None:
+        pass
+
+
+class DirFdEntry(PathEntry):
+    """An entry checked and removed by name relative to its pinned parent.
+
+    The parent is opened once and the target lstat'd once; reparse and
+    identity checks both read that stat, and the delete is unlinkat/rmdir
+    on the same parent descriptor.
+    """
+
+    relative_to_dir_fd = True
+    single_handle = True
+
+    def __init__(self, path: str, limiter: DirFdLimiter) -> None:
+        super().__init__(path)
+        parent, self.name = os.path.split(path)
+        self._limiter = limiter
+        self._parent_fd = limiter.open(parent)
+        if self._parent_fd is None:
+            raise OSError("directory descriptor cap reached")
+        try:
+            self._stat = os.stat(self.name, dir_fd=self._parent_fd, follow_symlinks=False)
+        except BaseException:
+            self.close()
+            raise
+
+    def is_reparse(self) -> bool:
+        return stat.S_ISLNK(self._stat.st_mode)
+
+    def identity(self) -> tuple[str, str]:
+        return identity_from_stat(self._stat)
+
+    def is_empty_dir(self) -> bool:
+        fd = os.open(self.name, _DIR_FLAGS | _NOFOLLOW, dir_fd=self._parent_fd)
+        try:
+            st = os.fstat(fd)
+            if (st.st_dev, st.st_ino) != (self._stat.st_dev, self._stat.st_ino):
+                raise EntryChangedError(f"entry replaced after identity check: {self.path}")
+            with os.scandir(fd) as it:
+                return not any(True for _ in it)
+        finally:
+            os.close(fd)
+
+    def remove(self, is_dir: bool) -> None:
+        if is_dir:
+            os.rmdir(self.name, dir_fd=self._parent_fd)
+        else:
+            os.unlink(self.name, dir_fd=self._parent_fd)
+
+    def close(self) -> None:
+        if self._parent_fd is not None:
+            self._limiter.close(self._parent_fd)
+            self._parent_fd = None
+
+
+def open_entry(path: str, limiter: DirFdLimiter, is_dir: bool) -> PathEntry:
+    """Open a delete target: one Win32 handle on Windows, a pinned parent
+    descriptor elsewhere, full paths as the fallback.
+
+    Raises FileNotFoundError if the target is gone, and on Windows any
+    other OSError from opening it (e.g. winerror 32 when in use).
+    """
+    if os.name == "nt":
+        from nullout.win_handle import HandleEntry  # imports PathEntry from here
+
+        return HandleEntry(path, is_dir)
+    if limiter.enabled:
+        try:
+            return DirFdEntry(path, limiter)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            pass  # at the cap, or the parent can't be opened: use the path
+    return PathEntry(path)
+
+
+# Module-level limiter shared by scans and deletes — set by server.py at startup
+limiter_ref: DirFdLimiter = DirFdLimiter()
+
+
+def set_dir_fd_limit(limit: int) -> None:
+    """Set the process-wide directory-descriptor cap. Called by server.py at init."""
+    global limiter_ref
+    limiter_ref = DirFdLimiter(limit)
@@ -0,0 +1,329 @@
+"""Estimate-mode scans: hazard counts for huge trees from random probes.
+
+A probe walks from the root down to a directory with no subdirectories,
+picking one subdirectory at random at each level. Each directory on the way
+is listed and classified with the same rules as a summary scan
+(is_reparse_point, excludes, maxDepth, includeDirs, detect_hazards). Its
+counts are scaled by the product of the fan-outs above it (Knuth's
+estimator), so the mean over probes is an unbiased estimate of the whole
+tree's counts; the spread over probes gives a 95% confidence interval.
+
+Probing stops once the interval for the total flagged count is within
+target_precision of the estimate (after MIN_PROBES), when the time budget
+or max_probes runs out, or when every directory has been listed. In the
+last case the counts are exact. Listings are cached (up to
+MAX_CACHED_DIRECTORIES), so the upper levels are listed once.
+
+The interval is a normal approximation. With rare hazards in a few deep
+pockets, probes may miss them all, and a zero estimate with a narrow
+interval can be wrong. A run that has seen no hazards keeps probing until
+its budget is spent.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from nullout import scanner
+from nullout.config import Root
+from nullout.excludes import MatchState, compile_excludes
+from nullout.hazards import HAZARD_CODES, detect_hazards
+from nullout.lanes import device_of
+from nullout.scanner import ScanOptions
+from nullout.summary import DEFAULT_TOP_DIRECTORIES, DirCounts
+from nullout.win_paths import is_reparse_point, to_extended_path
+
+_N = len(HAZARD_CODES)
+Z_95 = 1.96
+MIN_PROBES = 30
+DEFAULT_TARGET_PRECISION = 0.05  # interval half-width / estimate
+DEFAULT_ESTIMATE_TIME_BUDGET_MS = 10_000
+DEFAULT_MAX_PROBES = 100_000
+MAX_CACHED_DIRECTORIES = 10_000
+
+
+class _Listing:
+    """One directory's counts and the subdirectories a full scan would enter."""
+
+    __slots__ = ("counts", "entries", "subdirs")
+
+    def __init__(self, counts: DirCounts, entries: int, subdirs: list[tuple[str, MatchState]]) -> None:
+        self.counts = counts
+        self.entries = entries
+        self.subdirs = subdirs
+
+
+class _Moments:
+    """Running sum and sum of squares of one quantity's per-probe estimates."""
+
+    __slots__ = ("total", "squares")
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.squares = 0.0
+
+    def add(self, x: float) -> None:
+        self.total += x
+        self.squares += x * x
+
+    def mean(self, n: int) -> float:
+        return self.total / n if n else 0.0
+
+    def half_width(self, n: int) -> float:
+        if n < 2:
+            return math.inf
+        mean = self.total / n
+        var = max(self.squares / n - mean * mean, 0.0) * n / (n - 1)
+        return Z_95 * math.sqrt(var / n)
+
+    def interval(self, n: int) -> dict[str, int | None]:
+        """Estimate and 95% bounds; high is None with fewer than two probes."""
+        mean, hw = self.mean(n), self.half_width(n)
+        if math.isinf(hw):
+            return {"estimate": round(mean), "low": 0, "high": None}
+        return {"estimate": round(mean), "low": max(0, math.floor(mean - hw)), "high": math.ceil(mean + hw)}
+
+
+def _exact(value: int) -> dict[str, int | None]:
+    return {"estimate": value, "low": value, "high": value}
+
+
+class HazardEstimate:
+    """Per-probe estimates of one root's hazard counts, and their intervals."""
+
+    def __init__(self, root: Root, opts: ScanOptions, top_n: int = DEFAULT_TOP_DIRECTORIES) -> None:
+        self.root_abs = root.abs_path
+        self.opts = opts
+        self.top_n = top_n
+        self.excludes = compile_excludes(root.excludes + opts.excludes)
+        self.probes = 0
+        self.flagged = _Moments()
+        self.entries = _Moments()
+        self.directories = _Moments()
+        self.by_code = [_Moments() for _ in range(_N)]
+        self.top: dict[str, _Moments] = {}  # root subdirectory -> flagged in its subtree
+        self.stop_reason: str | None = None
+        self.listed = 0  # directory enumerations, cache misses included twice if raced
+        self.entries_listed = 0
+        self._cache: dict[str, _Listing] = {}
+        self._unlisted = 1  # known directories not yet in the cache (the root)
+        self._overflow = False  # cache full: the tree can no longer be exhausted
+        self._lock = threading.Lock()
+
+    # --- probing ---
+
+    def _list(self, rel: str, depth: int, state: MatchState) -> _Listing:
+        """List one directory, or take it from the cache."""
+        with self._lock:
+            listing = self._cache.get(rel)
+        if listing is not None:
+            return listing
+        opts = self.opts
+        excludes = self.excludes
+        path = self.root_abs + os.sep + rel if rel else self.root_abs
+        counts = DirCounts()
+        entries = 0
+        subdirs: list[tuple[str, MatchState]] = []
+        try:
+            with os.scandir(to_extended_path(path)) as it:
+                for entry in it:
+                    entries += 1
+                    name = entry.name
+                    full = path + os.sep + name
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if is_reparse_point(full):
+                        counts.add(detect_hazards(name, len(to_extended_path(full)), is_reparse=True), is_dir)
+                        continue
+                    child_state = MatchState()
+                    if is_dir and state:
+                        child_state, excluded = excludes.step(state, name)  # type: ignore[union-attr]
+                        if excluded:
+                            continue
+                    descend = opts.recursive and is_dir and depth < opts.max_depth
+                    if not (is_dir and not opts.include_dirs):
+                        hazards = detect_hazards(name, len(to_extended_path(full)), is_reparse=False)
+                        if hazards:
+                            counts.add(hazards, is_dir)
+                    if descend:
+                        subdirs.append((name, child_state))
+        except PermissionError:
+            pass  # counted as an empty directory, like a full scan
+        listing = _Listing(counts, entries, subdirs)
+        with self._lock:
+            self.listed += 1
+            self.entries_listed += entries
+            if rel in self._cache:
+                return self._cache[rel]
+            if len(self._cache) < MAX_CACHED_DIRECTORIES:
+                self._cache[rel] = listing
+                self._unlisted += len(subdirs) - 1
+            else:
+                self._overflow = True
+        return listing
+
+    def probe(self, rng: random.Random) -> None:
+        """Walk one random root-to-leaf path and fold its estimates in."""
+        rel, depth, weight = "", 0, 1.0
+        excludes = self.excludes
+        state = excludes.start if excludes else MatchState()
+        flagged = entries = directories = subtree = 0.0
+        by_code = [0.0] * _N
+        top = None
+        while True:
+            listing = self._list(rel, depth, state)
+            counts = listing.counts
+            directories += weight
+            entries += weight * listing.entries
+            flagged += weight * counts.flagged
+            if depth:
+                subtree += weight * counts.flagged
+            if counts.flagged:
+                by_type = counts.by_type
+                for i in range(_N):
+                    by_code[i] += weight * (by_type[i] + by_type[_N + i])
+            if not listing.subdirs:
+                break
+            name, state = rng.choice(listing.subdirs)
+            weight *= len(listing.subdirs)
+            if not depth:
+                top = name
+            rel = rel + os.sep + name if rel else name
+            depth += 1
+        with self._lock:
+            self.probes += 1
+            self.flagged.add(flagged)
+            self.entries.add(entries)
+            self.directories.add(directories)
+            for moments, x in zip(self.by_code, by_code):
+                moments.add(x)
+            if top is not None:
+                self.top.setdefault(top, _Moments()).add(subtree)
+
+    @property
+    def exhausted(self) -> bool:
+        """Every directory of the tree has been listed (and cached)."""
+        with self._lock:
+            return self._unlisted == 0 and not self._overflow
+
+    def precision(self) -> float | None:
+        """Interval half-width relative to the flagged estimate; None until hazards are seen."""
+        with self._lock:
+            n, mean = self.probes, self.flagged.mean(self.probes)
+            if mean <= 0:
+                return None
+            return self.flagged.half_width(n) / mean
+
+    # --- results ---
+
+    def _exact_dict(self) -> dict[str, Any]:
+        by_type = [0] * (2 * _N)
+        flagged = entries = 0
+        top: dict[str, int] = {}
+        for rel, listing in self._cache.items():
+            entries += listing.entries
+            flagged += listing.counts.flagged
+            for i, n in enumerate(listing.counts.by_type):
+                by_type[i] += n
+            if rel and listing.counts.flagged:
+                head = rel.split(os.sep, 1)[0]
+                top[head] = top.get(head, 0) + listing.counts.flagged
+        by_code = [by_type[i] + by_type[_N + i] for i in range(_N)]
+        ranked = sorted(top.items(), key=lambda kv: (-kv[1], kv[0]))[: self.top_n]
+        return {
+            "flagged": _exact(flagged),
+            "byCode": {"estimate": by_code, "low": by_code, "high": by_code},
+            "entries": _exact(entries),
+            "directories": _exact(len(self._cache)),
+            "topDirectories": [{"relativePath": rel, "flagged": _exact(n)} for rel, n in ranked],
+        }
+
+    def _sampled_dict(self) -> dict[str, Any]:
+        n = self.probes
+        codes = [m.interval(n) for m in self.by_code]
+        ranked = sorted(self.top.items(), key=lambda kv: (-kv[1].total, kv[0]))[: self.top_n]
+        return {
+            "flagged": self.flagged.interval(n),
+            "byCode": {k: [c[k] for c in codes] for k in ("estimate", "low", "high")},
+            "entries": self.entries.interval(n),
+            "directories": self.directories.interval(n),
+            "topDirectories": [
+                {"relativePath": rel, "flagged": m.interval(n)} for rel, m in ranked if m.total > 0
+            ],
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        """Counts as {estimate, low, high} (95%); byCode arrays are indexed like hazardCodes."""
+        exact = self.stop_reason == "exhausted"
+        body = self._exact_dict() if exact else self._sampled_dict()
+        precision = None if exact else self.precision()
+        return {
+            "hazardCodes": list(HAZARD_CODES),
+            "confidence": 0.95,
+            "exact": exact,
+            "probes": self.probes,
+            "precision": round(precision, 4) if precision is not None else None,
+            "stopReason": self.stop_reason,
+            **body,
+        }
+
+
+def estimate_root(
+    root: Root,
+    opts: ScanOptions,
+    target_precision: float = DEFAULT_TARGET_PRECISION,
+    time_budget_ms: int | None = None,
+    max_probes: int = DEFAULT_MAX_PROBES,
+    workers: int | None = None,
+    top_n: int = DEFAULT_TOP_DIRECTORIES,
+    seed: int | None = None,
+) -> HazardEstimate:
+    """Probe one root until the estimate is precise enough or a limit is hit.
+
+    workers probes run at once (default: the root device's lane limit).
+    seed makes a single-worker run repeatable.
+    """
+    est = HazardEstimate(root, opts, top_n)
+    if time_budget_ms is None:
+        time_budget_ms = DEFAULT_ESTIMATE_TIME_BUDGET_MS
+    if workers is None:
+        workers = scanner.lane_limits_ref.for_device(device_of(root.abs_path))
+    master = random.Random(seed)
+    seeds = [master.getrandbits(64) for _ in range(workers)]
+    deadline = time.monotonic() + time_budget_ms / 1000
+    stop = threading.Event()
+    lock = threading.Lock()
+
+    def should_stop() -> bool:
+        with lock:
+            if est.stop_reason is None:
+                precision = est.precision()
+                if est.exhausted:
+                    est.stop_reason = "exhausted"
+                elif est.probes >= MIN_PROBES and precision is not None and precision <= target_precision:
+                    est.stop_reason = "targetPrecision"
+                elif est.probes >= max_probes:
+                    est.stop_reason = "maxProbes"
+                elif time.monotonic() >= deadline:
+                    est.stop_reason = "timeBudgetMs"
+            return est.stop_reason is not None
+
+    def run(worker_seed: int) -> None:
+        rng = random.Random(worker_seed)
+        try:
+            while not stop.is_set():
+                if should_stop():
+                    break
+                est.probe(rng)
+        finally:
+            stop.set()  # also stops the other workers if this one failed
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nullout-estimate") as pool:
+        for future in [pool.submit(run, s) for s in seeds]:
+            future.result()
+    return est
@@ -0,0 +1,129 @@
+"""Exclude rules: directory patterns compiled into a segment automaton.
+
+Patterns are matched against paths relative to the scan root, one path
+segment at a time, as the walk pushes each subdirectory:
+
+    node_modules        a directory with this name at any depth
+    *.egg-info          same, with a glob
+    build/output        path prefix anchored at the root
+    **/.git/objects     glob segments; ** matches any number of segments
+
+Matching is case-insensitive on Windows. Each pattern is split into
+segments and merged into a trie; a walk carries the set of trie nodes
+its directory has reached, so checking a child costs a dict lookup per
+live node instead of re-matching every pattern against the full path.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+from functools import lru_cache
+
+MatchState = frozenset  # frozenset[_Node]: trie nodes reached by a directory
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+class _Node:
+    __slots__ = ("literal", "globs", "star", "loop", "terminal")
+
+    def __init__(self, loop: bool = False) -> None:
+        self.literal: dict[str, _Node] = {}
+        self.globs: list[tuple[re.Pattern[str], _Node]] = []
+        self.star: _Node | None = None  # child reached through a "**" segment
+        self.loop = loop  # this node is a "**": it also consumes any segment
+        self.terminal = False
+
+
+def _segments(pattern: str) -> list[str]:
+    parts = [p for p in re.split(r"[\\/]+", pattern.strip()) if p and p != "."]
+    anchored = pattern.strip()[:1] in ("/", "\\") or len(parts) > 1
+    if parts and not anchored and parts[0] != "**":
+        parts.insert(0, "**")  # bare names match at any depth
+    return parts
+
+
+class ExcludeMatcher:
+    """Compiled set of exclude patterns for one walk."""
+
+    def __init__(self, patterns: tuple[str, ...]) -> None:
+        self.patterns = patterns
+        self._root = _Node()
+        for pattern in patterns:
+            self._add(_segments(pattern))
+        self.start: MatchState = self._closure({self._root})
+
+    def _add(self, segments: list[str]) -> None:
+        if not segments:
+            return
+        node = self._root
+        for seg in segments:
+            seg = os.path.normcase(seg)
+            if seg == "**":
+                if node.star is None:
+                    node.star = _Node(loop=True)
+                node = node.star
+            elif _GLOB_CHARS.search(seg):
+                regex = re.compile(fnmatch.translate(seg))
+                for existing, child in node.globs:
+                    if existing.pattern == regex.pattern:
+                        node = child
+                        break
+                else:
+                    child = _Node()
+                    node.globs.append((regex, child))
+                    node = child
+            else:
+                node = node.literal.setdefault(seg, _Node())
+        node.terminal = True
+
+    @staticmethod
+    def _closure(nodes: set[_Node]) -> MatchState:
+        """Add the nodes reachable through "**" matching zero segments."""
+        pending = list(nodes)
+        while pending:
+            star = pending.pop().star
+            if star is not None and star not in nodes:
+                nodes.add(star)
+                pending.append(star)
+        return frozenset(nodes)
+
+    def step(self, state: MatchState, name: str) -> tuple[MatchState, bool]:
+        """Advance from a directory's state to its child's.
+
+        Returns (child state, excluded). An empty state can never match
+        again, so callers skip the check for the whole subtree.
+        """
+        name = os.path.normcase(name)
+        nxt: set[_Node] = set()
+        for node in state:
+            if node.loop:
+                nxt.add(node)
+            child = node.literal.get(name)
+            if child is not None:
+                nxt.add(child)
+            for regex, child in node.globs:
+                if regex.match(name):
+                    nxt.add(child)
+        if not nxt:
+            return MatchState(), False
+        closed = self._closure(nxt)
+        return closed, any(n.terminal for n in closed)
+
+    def state_for(self, rel_path: str) -> tuple[MatchState, bool]:
+        """State for a directory given its path relative to the root."""
+        state, excluded = self.start, False
+        for seg in re.split(r"[\\/]+", rel_path):
+            if seg:
+                state, hit = self.step(state, seg)
+                excluded = excluded or hit
+        return state, excluded
+
+
+@lru_cache(maxsize=64)
+def compile_excludes(patterns: tuple[str, ...]) -> ExcludeMatcher | None:
+    """Compile patterns once; None when there is nothing to exclude."""
+    patterns = tuple(p for p in patterns if p.strip())
+    return ExcludeMatcher(patterns) if patterns else None
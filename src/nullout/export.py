@@ -0,0 +1,165 @@
+"""Streaming export of scan findings to NDJSON or CSV files.
+
+Directory tasks hand their findings to ExportWriter.write(), which puts
+them on a bounded queue; a single writer thread serializes rows to disk
+while the walk is still running. When the queue is full, scan workers
+block, so memory stays bounded however many findings the scan produces.
+
+Files are written as <name>.partial and renamed into place on success.
+The SHA-256 checksum covers the bytes on disk (after gzip, if enabled).
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import queue
+import threading
+from typing import Any, BinaryIO
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_QUEUE_BATCHES = 64  # directory batches buffered between walkers and the writer
+
+CSV_COLUMNS = [
+    "findingId",
+    "rootId",
+    "scanId",
+    "relativePath",
+    "entryType",
+    "name",
+    "hazardCodes",
+    "sizeBytes",
+    "isReparsePoint",
+    "volumeSerial",
+    "fileId",
+    "aggregateDescendants",
+]
+
+_DONE = object()
+
+
+class _HashingWriter(io.RawIOBase):
+    """Binary sink that hashes everything written through it."""
+
+    def __init__(self, raw: BinaryIO) -> None:
+        self._raw = raw
+        self.sha256 = hashlib.sha256()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        self.sha256.update(b)
+        return self._raw.write(b)
+
+
+def export_file_name(scan_id: str, fmt: str, use_gzip: bool, name: str | None = None) -> str:
+    """Return the export file name, validating a caller-supplied one.
+
+    Raises ValueError if name is not a plain file name.
+    """
+    if name is None:
+        name = f"{scan_id}.{fmt}" + (".gz" if use_gzip else "")
+    if not name or name in (".", "..") or os.path.basename(name) != name or "/" in name or "\\" in name:
+        raise ValueError(f"Export file name must be a plain file name: {name!r}")
+    return name
+
+
+def _csv_row(f: dict[str, Any]) -> list[Any]:
+    evidence = f.get("evidence", {})
+    fs = evidence.get("fs", {})
+    identity = evidence.get("identity", {})
+    aggregate = evidence.get("aggregate")
+    return [
+        f["findingId"],
+        f["rootId"],
+        f["scanId"],
+        f["relativePath"],
+        f["entryType"],
+        f["name"],
+        ";".join(h["code"] for h in f["hazards"]),
+        fs.get("sizeBytes"),
+        fs.get("isReparsePoint"),
+        identity.get("volumeSerial"),
+        identity.get("fileId"),
+        aggregate["descendants"] if aggregate else None,
+    ]
+
+
+class ExportWriter:
+    """Background writer for one export file."""
+
+    def __init__(self, path: str, fmt: str, use_gzip: bool = False) -> None:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt!r}")
+        self.path = path
+        self.format = fmt
+        self.gzip = use_gzip
+        self.rows = 0
+        self.checksum: str | None = None
+        self._partial = path + ".partial"
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=EXPORT_QUEUE_BATCHES)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="nullout-export", daemon=True)
+        self._thread.start()
+
+    def write(self, findings: list[dict[str, Any]]) -> None:
+        """Queue one batch of finding dicts; blocks while the buffer is full."""
+        if findings and self._error is None:
+            self._queue.put(findings)
+
+    def close(self) -> None:
+        """Flush, finalize the file and checksum. Re-raises writer errors."""
+        self._queue.put(_DONE)
+        self._thread.join()
+        if self._error is not None:
+            try:
+                os.remove(self._partial)
+            except OSError:
+                pass
+            raise self._error
+        os.replace(self._partial, self.path)
+
+    def abort(self) -> None:
+        """Stop the writer and discard the partial file."""
+        self._queue.put(_DONE)
+        self._thread.join()
+        try:
+            os.remove(self._partial)
+        except OSError:
+            pass
+
+    def _run(self) -> None:
+        done = False
+        try:
+            with open(self._partial, "wb") as raw:
+                hashing = _HashingWriter(raw)
+                binary: Any = (
+                    gzip.GzipFile(fileobj=hashing, mode="wb") if self.gzip else io.BufferedWriter(hashing)
+                )
+                text = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+                writer = csv.writer(text) if self.format == "csv" else None
+                if writer is not None:
+                    writer.writerow(CSV_COLUMNS)
+                while True:
+                    batch = self._queue.get()
+                    if batch is _DONE:
+                        done = True
+                        break
+                    for f in batch:
+                        if writer is not None:
+                            writer.writerow(_csv_row(f))
+                        else:
+                            text.write(json.dumps(f, separators=(",", ":")) + "\n")
+                    self.rows += len(batch)
+                text.close()  # flushes through gzip/buffer into the hashing writer
+                self.checksum = hashing.sha256.hexdigest()
+        except BaseException as e:  # surfaced from close()
+            self._error = e
+            # keep draining so scan workers blocked on put() can finish
+            while not done:
+                done = self._queue.get() is _DONE
@@ -12,6 +12,30 @@ RESERVED_NAMES: set[str] = (
 )
 
 
+MAX_PATH_LEGACY = 260  # Win32 MAX_PATH; longer canonical paths get WIN_PATH_TOO_LONG
+
+# Every code detect_hazards can emit, in a fixed order (used as counter-array index)
+HAZARD_CODES: tuple[str, ...] = (
+    "REPARSE_POINT_PRESENT",
+    "WIN_RESERVED_DEVICE_BASENAME",
+    "WIN_TRAILING_DOT_SPACE",
+    "WIN_PATH_TOO_LONG",
+)
+
+# Severity per code, as detect_hazards reports it (confidence is always high)
+HAZARD_SEVERITY: dict[str, str] = {
+    "REPARSE_POINT_PRESENT": "high",
+    "WIN_RESERVED_DEVICE_BASENAME": "high",
+    "WIN_TRAILING_DOT_SPACE": "medium",
+    "WIN_PATH_TOO_LONG": "medium",
+}
+
+
+def hazard_from_code(code: str) -> dict[str, Any]:
+    """Rebuild the hazard dict detect_hazards would emit for code."""
+    return {"code": code, "severity": HAZARD_SEVERITY[code], "confidence": "high"}
+
+
 def parse_basename(name: str) -> tuple[str, str]:
     """Split filename into (base, extension).
 
@@ -69,7 +93,7 @@ def detect_hazards(
             "confidence": "high",
         })
 
-    if canonical_path_len > 260:
+    if canonical_path_len > MAX_PATH_LEGACY:
         hazards.append({
             "code": "WIN_PATH_TOO_LONG",
             "severity": "medium",
@@ -0,0 +1,121 @@
+"""Hazard heat maps: where earlier scans of a root found hazards.
+
+A walk with prioritize=true, or any walk of a root that already has a map,
+notes how many entries it flagged in each directory, keeping at most
+2 * MAX_HOT_DIRECTORIES of them (the hottest). Other walks record nothing,
+so summary and streaming scans stay constant-memory. When a recording walk
+finishes, its counts become the root's heat map: a complete walk replaces
+the map, and a partial one (budgeted, resumed, cancelled, or a subtree)
+only updates the directories where it flagged something. Maps are kept per
+root path for the server's lifetime.
+
+A scan with prioritize=true orders each device lane's queue by
+TraversalHints.score. The score is the number of findings last seen in the
+subdirectory's subtree, plus HINT_SCORE when the name or path length
+suggests a dense pocket. Directories with equal scores keep the plain walk
+order. The walk still covers the same directories; only the order changes,
+so a page cut by maxFindings or timeBudgetMs reaches the hot pockets first.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import threading
+from typing import Mapping
+
+from nullout.hazards import MAX_PATH_LEGACY
+
+# Directory names that usually hold many hazardous names: WSL and container
+# root filesystems, and package trees deep enough to pass MAX_PATH.
+HINT_NAMES = frozenset({"rootfs", "lxss", "node_modules"})
+HINT_SCORE = 8  # a hint counts as much as this many findings from the last scan
+NEAR_MAX_PATH = 32  # a directory this close to MAX_PATH likely has too-long descendants
+MAX_HOT_DIRECTORIES = 50_000  # per root; the least-hot directories are dropped beyond this
+
+
+def hottest(own: Mapping[str, int]) -> dict[str, int]:
+    """The MAX_HOT_DIRECTORIES directories with the most findings."""
+    return dict(heapq.nlargest(MAX_HOT_DIRECTORIES, own.items(), key=lambda kv: kv[1]))
+
+
+class HeatMap:
+    """Findings per directory from earlier scans of one root, summed over subtrees."""
+
+    __slots__ = ("own", "subtree")
+
+    def __init__(self, own: Mapping[str, int]) -> None:
+        if len(own) > MAX_HOT_DIRECTORIES:
+            own = hottest(own)
+        self.own = dict(own)  # relative directory path -> flagged entries directly in it
+        subtree: dict[str, int] = {}
+        for rel, count in self.own.items():
+            subtree[""] = subtree.get("", 0) + count
+            parts = rel.split(os.sep) if rel else []
+            for i in range(1, len(parts) + 1):
+                key = os.sep.join(parts[:i])
+                subtree[key] = subtree.get(key, 0) + count
+        self.subtree = subtree
+
+    def merged(self, seen: Mapping[str, int]) -> HeatMap:
+        """This map with seen's counts written over it."""
+        return HeatMap({**self.own, **seen})
+
+
+class TraversalHints:
+    """Priority for queuing a directory in a prioritized walk."""
+
+    __slots__ = ("subtree",)
+
+    def __init__(self, heat: HeatMap | None) -> None:
+        self.subtree = heat.subtree if heat is not None else {}
+
+    def score(self, rel: str, name: str, path_len: int) -> int:
+        score = self.subtree.get(rel, 0)
+        if name.lower() in HINT_NAMES:
+            score += HINT_SCORE
+        if path_len >= MAX_PATH_LEGACY - NEAR_MAX_PATH:
+            score += HINT_SCORE
+        return score
+
+    def priority(self, rel: str, name: str, path_len: int) -> float:
+        """Scheduler priority: lower runs first, so hotter is more negative."""
+        return -self.score(rel, name, path_len)
+
+
+class HeatMaps:
+    """Heat maps keyed by normalized root path."""
+
+    def __init__(self) -> None:
+        self._maps: dict[str, HeatMap] = {}
+        self._lock = threading.Lock()
+
+    def has(self, root_abs: str) -> bool:
+        with self._lock:
+            return os.path.normcase(root_abs) in self._maps
+
+    def get(self, root_abs: str) -> HeatMap | None:
+        with self._lock:
+            return self._maps.get(os.path.normcase(root_abs))
+
+    def hints_for(self, root_abs: str) -> TraversalHints:
+        return TraversalHints(self.get(root_abs))
+
+    def learn(self, root_abs: str, seen: Mapping[str, int], complete: bool) -> None:
+        """Record one walk's per-directory flagged counts."""
+        key = os.path.normcase(root_abs)
+        with self._lock:
+            old = self._maps.get(key)
+            if complete or old is None:
+                if seen or old is not None:
+                    self._maps[key] = HeatMap(seen)
+            elif seen:
+                self._maps[key] = old.merged(seen)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._maps.clear()
+
+
+# Module-level heat maps shared by every walk in the process
+heat_ref: HeatMaps = HeatMaps()
@@ -0,0 +1,227 @@
+"""Streamable HTTP transport: one warm NullOut daemon shared by many clients.
+
+Serves the same JSON-RPC methods as the stdio loop on a single endpoint
+(/mcp) bound to loopback only:
+
+    POST   /mcp   JSON-RPC request, notification or batch
+    DELETE /mcp   end the session named by Mcp-Session-Id
+    GET    /mcp   405: no server-initiated stream is offered
+
+Every request must carry "Authorization: Bearer <NULLOUT_HTTP_TOKEN>";
+anything else gets 401 before it is read or dispatched. Binding to
+loopback keeps remote hosts out, and the token keeps out other local users
+and processes.
+
+Every client shares one NullOutServer, so findings, snapshots and scan
+results from one client are visible to the others. A request without
+Mcp-Session-Id starts a session and gets its ID back in that header;
+later requests must send it (unknown or expired IDs get 404, per the
+MCP spec, so the client re-initializes).
+
+Connections are HTTP/1.1 keep-alive. Responses are JSON, or a single
+SSE event when the client only accepts text/event-stream, and are
+gzip-compressed when the client accepts it and the body is large.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hmac
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import urlsplit
+
+ENDPOINT = "/mcp"
+SESSION_HEADER = "Mcp-Session-Id"
+SESSION_IDLE_SECONDS = 3600
+GZIP_MIN_BYTES = 1024
+MAX_REQUEST_BYTES = 10 * 1024 * 1024
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+class SessionTable:
+    """Issued session IDs with idle expiry."""
+
+    def __init__(self, idle_seconds: float = SESSION_IDLE_SECONDS) -> None:
+        self.idle_seconds = idle_seconds
+        self._last_seen: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def create(self) -> str:
+        session_id = secrets.token_hex(16)
+        with self._lock:
+            self._expire(time.monotonic())
+            self._last_seen[session_id] = time.monotonic()
+        return session_id
+
+    def touch(self, session_id: str) -> bool:
+        """Mark a session active; False if it is unknown or expired."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if session_id not in self._last_seen:
+                return False
+            self._last_seen[session_id] = now
+            return True
+
+    def end(self, session_id: str) -> bool:
+        with self._lock:
+            return self._last_seen.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._last_seen)
+
+    def _expire(self, now: float) -> None:
+        stale = [s for s, seen in self._last_seen.items() if now - seen > self.idle_seconds]
+        for s in stale:
+            del self._last_seen[s]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    server: NullOutHTTPServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # stdout/stderr stay quiet, as in the stdio loop
+
+    # --- Methods ---
+
+    def do_POST(self) -> None:
+        if not self._check_request():
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._send_json(413, _rpc_error(None, -32600, "Request too large."))
+            return
+        raw = self.rfile.read(length)  # always consumed, so the connection stays usable
+
+        session_id = self.headers.get(SESSION_HEADER)
+        if session_id is None:
+            session_id = self.server.sessions.create()
+        elif not self.server.sessions.touch(session_id):
+            self._send_json(404, _rpc_error(None, -32001, "Unknown or expired session."))
+            return
+        try:
+            message = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self._send_json(400, _rpc_error(None, -32700, "Parse error"), session_id)
+            return
+
+        batch = isinstance(message, list)
+        requests = message if batch else [message]
+        if not requests or not all(isinstance(r, dict) for r in requests):
+            self._send_json(400, _rpc_error(None, -32600, "Invalid Request"), session_id)
+            return
+
+        rpc = self.server.rpc
+        responses = [rpc.handle_rpc(r) for r in requests if "id" in r]
+        for r in requests:
+            if "id" not in r and r.get("method") != "notifications/initialized":
+                rpc.handle_rpc(r)  # notification: run it, send nothing back
+        if not responses:
+            self._send(202, b"", "application/json", session_id)
+            return
+        self._send_json(200, responses if batch else responses[0], session_id)
+
+    def do_DELETE(self) -> None:
+        if not self._check_request():
+            return
+        session_id = self.headers.get(SESSION_HEADER)
+        if session_id is None or not self.server.sessions.end(session_id):
+            self._send(404, b"", "application/json")
+            return
+        self._send(204, b"", "application/json")
+
+    def do_GET(self) -> None:
+        if not self._check_request():
+            return
+        self.send_response(405)
+        self.send_header("Allow", "POST, DELETE")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    # --- Helpers ---
+
+    def _check_request(self) -> bool:
+        """Endpoint path, Origin (DNS-rebinding guard) and bearer token checks.
+
+        A rejected request's body is left unread, so its connection is closed.
+        """
+        if urlsplit(self.path).path != ENDPOINT:
+            self.close_connection = True
+            self._send(404, b"", "application/json")
+            return False
+        origin = self.headers.get("Origin")
+        if origin is not None and urlsplit(origin).hostname not in LOOPBACK_HOSTS:
+            self.close_connection = True
+            self._send_json(403, _rpc_error(None, -32600, "Origin not allowed."))
+            return False
+        scheme, _, presented = self.headers.get("Authorization", "").partition(" ")
+        presented_token = presented.strip().encode("utf-8")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(presented_token, self.server.token):
+            self.close_connection = True
+            self.send_response(401)
+            self.send_header("WWW-Authenticate", "Bearer")
+            body = json.dumps(_rpc_error(None, -32600, "Missing or invalid bearer token.")).encode("utf-8")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return False
+        return True
+
+    def _send_json(self, status: int, payload: Any, session_id: str | None = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        accept = self.headers.get("Accept", "")
+        if "text/event-stream" in accept and "application/json" not in accept:
+            self._send(status, b"event: message\ndata: " + body + b"\n\n", "text/event-stream", session_id)
+        else:
+            self._send(status, body, "application/json", session_id)
+
+    def _send(self, status: int, body: bytes, content_type: str, session_id: str | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if session_id is not None:
+            self.send_header(SESSION_HEADER, session_id)
+        if len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+def _rpc_error(rpc_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": rpc_id, "error": {"code": code, "message": message}}
+
+
+class NullOutHTTPServer(ThreadingHTTPServer):
+    """Threaded loopback HTTP server routing to one shared NullOutServer."""
+
+    daemon_threads = True
+
+    def __init__(self, rpc: Any, token: bytes, host: str = "127.0.0.1", port: int = 0) -> None:
+        if host not in LOOPBACK_HOSTS:
+            raise ValueError(f"HTTP transport only binds to loopback, not {host!r}")
+        if not token:
+            raise ValueError("HTTP transport requires a bearer token")
+        if host == "::1":
+            import socket
+
+            self.address_family = socket.AF_INET6
+        self.rpc = rpc
+        self.token = token
+        self.sessions = SessionTable()
+        super().__init__((host, port), _Handler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        host = f"[{host}]" if ":" in host else host
+        return f"http://{host}:{port}{ENDPOINT}"
@@ -0,0 +1,113 @@
+"""Identity providers: where a scan gets volumeSerial + fileId for findings.
+
+The scanner asks for_directory() once per directory it enumerates and
+then asks the returned source for each flagged entry. Where the platform
+reports identity during enumeration the source uses that:
+
+- POSIX: fileId is DirEntry.inode() (d_ino from readdir) and volumeSerial
+  is the directory's st_dev, which the walk already knows. A flagged
+  subdirectory could be a mount point, so it uses its lstat st_dev.
+- Windows: one FileIdBothDirectoryInfo listing of the directory handle
+  gives every entry's file ID; it runs at most once per directory, the
+  first time an entry there needs identity.
+
+Opening each entry (get_identity) remains the fallback when enumeration
+cannot provide an identity, and is what delete_entry uses to re-verify.
+"""
+
+from __future__ import annotations
+
+import os
+
+from nullout.win_identity import get_identity, list_directory_ids
+
+Identity = tuple[str | None, str | None]
+
+
+def open_identity(path: str) -> Identity:
+    """Identity by opening the entry; (None, None) on failure."""
+    try:
+        return get_identity(path)
+    except Exception:
+        return None, None
+
+
+class OpenPerEntry:
+    """Fallback source: opens every entry by path.
+
+    Sources count how each identity was obtained, for scan stats.
+    """
+
+    def __init__(self) -> None:
+        self.enumerated = 0
+        self.opened = 0
+
+    def identity(self, entry: os.DirEntry[str], full: str) -> Identity:
+        self.opened += 1
+        return open_identity(full)
+
+
+class PosixEnumerated(OpenPerEntry):
+    """d_ino plus the directory's device: no syscall for plain entries.
+
+    Some filesystems (overlay, some FUSE) report a d_ino that differs from
+    st_ino, so the first entry asked about is checked against its lstat;
+    on a mismatch the rest of the directory uses lstat too.
+    """
+
+    def __init__(self, device: int) -> None:
+        super().__init__()
+        self._vol = f"0x{device:08X}"
+        self._trusted: bool | None = None
+
+    def identity(self, entry: os.DirEntry[str], full: str) -> Identity:
+        try:
+            if self._trusted is None and not entry.is_dir(follow_symlinks=False):
+                st = entry.stat(follow_symlinks=False)
+                self._trusted = st.st_ino == entry.inode() and f"0x{st.st_dev:08X}" == self._vol
+            if self._trusted is False or entry.is_dir(follow_symlinks=False):
+                # Also for subdirectories: a mount point's d_ino is the covered
+                # inode. The lstat is cached on the entry.
+                st = entry.stat(follow_symlinks=False)
+                ident = f"0x{st.st_dev:08X}", f"0x{st.st_ino:016X}"
+            else:
+                ident = self._vol, f"0x{entry.inode():016X}"
+        except OSError:
+            return super().identity(entry, full)
+        self.enumerated += 1
+        return ident
+
+
+class WindowsEnumerated(OpenPerEntry):
+    """File IDs for a whole directory from one handle, listed on first use."""
+
+    def __init__(self, directory: str) -> None:
+        super().__init__()
+        self._directory = directory
+        self._listing: tuple[str, dict[str, str]] | None = None
+        self._failed = False
+
+    def identity(self, entry: os.DirEntry[str], full: str) -> Identity:
+        if self._listing is None and not self._failed:
+            try:
+                self._listing = list_directory_ids(self._directory)
+            except OSError:
+                self._failed = True
+        if self._listing is not None:
+            vol, ids = self._listing
+            fid = ids.get(entry.name)
+            if fid is not None:
+                self.enumerated += 1
+                return vol, fid
+        # Created after the listing, or the listing failed
+        return super().identity(entry, full)
+
+
+def for_directory(path: str, device: int) -> OpenPerEntry:
+    """Identity source for the entries of one directory.
+
+    device is the directory's st_dev as tracked by the walk.
+    """
+    if os.name == "nt":
+        return WindowsEnumerated(path)
+    return PosixEnumerated(device)
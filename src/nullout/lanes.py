@@ -0,0 +1,150 @@
+"""Per-device I/O lanes: bounded directory-scan concurrency per volume.
+
+Directories are grouped by the device they live on (volume serial on
+Windows, st_dev elsewhere). Each device gets its own lane with a fixed
+number of workers, so a slow disk or network share is never flooded while
+lanes on other devices keep running in parallel.
+
+Within a lane, queued tasks run lowest priority value first, in submission
+order among equal values; without priorities a lane is plain FIFO.
+
+A task submitted with an owner (a rootId with its own worker limit) runs on
+that owner's lane for the device instead of the shared one, so one root's
+configured concurrency does not change another's.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from nullout.config import LaneLimits
+
+
+def device_of(path: str) -> int:
+    """Return the device id for path, or -1 if it cannot be stat'ed."""
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return -1
+
+
+@dataclass
+class Lane:
+    device: int
+    limit: int
+    pool: ThreadPoolExecutor
+    owner: str | None = None  # rootId of a per-root lane; None for the shared device lane
+    queue: list[tuple[float, int, Callable[..., int], tuple[Any, ...]]] = field(default_factory=list)  # heap
+    directories: int = 0
+    entries: int = 0
+    busy_s: float = 0.0
+    first_start: float = 0.0
+    last_end: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        wall_s = max(self.last_end - self.first_start, 0.0)
+        return {
+            "device": f"0x{self.device & 0xFFFFFFFFFFFFFFFF:X}",
+            **({"rootId": self.owner} if self.owner is not None else {}),
+            "workers": self.limit,
+            "directories": self.directories,
+            "entries": self.entries,
+            "busyMs": int(self.busy_s * 1000),
+            "wallMs": int(wall_s * 1000),
+            "entriesPerSec": int(self.entries / wall_s) if wall_s > 0 else None,
+        }
+
+
+class DeviceScheduler:
+    """Run directory tasks on per-device worker lanes until the walk drains.
+
+    A task returns the number of entries it enumerated (-1 if it deferred its
+    directory without enumerating it) and may submit more tasks (child
+    directories) before it returns; wait() blocks until no task is queued
+    or running.
+    """
+
+    def __init__(self, limits: LaneLimits, override: int | None = None) -> None:
+        self._limits = limits
+        self._override = override
+        self._lanes: dict[tuple[int, str | None], Lane] = {}
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._error: BaseException | None = None
+        self._seq = itertools.count()
+
+    def submit(
+        self, device: int, task: Callable[..., int], *args: Any, priority: float = 0.0,
+        owner: str | None = None, limit: int | None = None,
+    ) -> None:
+        """Queue task(*args) on the device's lane; lower priority values run first.
+
+        With owner and limit, the task goes to owner's own lane on the device,
+        limited to limit workers. A scheduler-wide override puts every task
+        back on the shared lanes.
+        """
+        if limit is None or self._override is not None:
+            owner = None
+        key = (device, owner)
+        with self._cond:
+            lane = self._lanes.get(key)
+            if lane is None:
+                if owner is not None:
+                    workers = limit
+                else:
+                    workers = self._override or self._limits.for_device(device)
+                pool = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix=f"nullout-lane-{device & 0xFFFFFFFF:x}",
+                )
+                lane = Lane(device=device, limit=workers, pool=pool, owner=owner)
+                self._lanes[key] = lane
+            self._pending += 1
+            heapq.heappush(lane.queue, (priority, next(self._seq), task, args))
+        lane.pool.submit(self._run, lane)
+
+    def _run(self, lane: Lane) -> None:
+        """Run the lane's best queued task (one pool job per submit)."""
+        with self._cond:
+            _, _, task, args = heapq.heappop(lane.queue)
+        start = time.perf_counter()
+        entries = 0
+        try:
+            if self._error is None:
+                entries = task(*args)
+        except BaseException as e:  # surfaced from wait()
+            with self._cond:
+                self._error = self._error or e
+        finally:
+            end = time.perf_counter()
+            with self._cond:
+                if not lane.first_start:
+                    lane.first_start = start
+                lane.last_end = max(lane.last_end, end)
+                if entries >= 0:
+                    lane.directories += 1
+                    lane.entries += entries
+                lane.busy_s += end - start
+                self._pending -= 1
+                if self._pending == 0:
+                    self._cond.notify_all()
+
+    def wait(self) -> None:
+        """Block until the walk drains, then shut down lanes and re-raise task errors."""
+        with self._cond:
+            while self._pending:
+                self._cond.wait()
+        for lane in self._lanes.values():
+            lane.pool.shutdown(wait=True)
+        if self._error is not None:
+            raise self._error
+
+    def lane_stats(self) -> list[dict[str, Any]]:
+        return [lane.to_dict() for lane in self._lanes.values()]
@@ -1,25 +1,157 @@
-"""Data models: Finding, PlanEntry, result shapes."""
+"""Data models: Finding, FindingRecord, PlanEntry, result shapes."""
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field, asdict
 from typing import Any
 
+from nullout.pathtrie import PathNode
+from nullout.win_paths import to_extended_path
+
+_FIELDS = (
+    "findingId",
+    "rootId",
+    "scanId",
+    "relativePath",
+    "observedPath",
+    "canonicalPath",
+    "entryType",
+    "name",
+    "baseName",
+    "extension",
+    "hazards",
+    "evidence",
+)
+
 
-@dataclass
 class Finding:
-    findingId: str
-    rootId: str
-    scanId: str
-    relativePath: str
-    observedPath: str
-    canonicalPath: str
-    entryType: str  # "file" | "dir"
-    name: str
-    baseName: str
-    extension: str
-    hazards: list[dict[str, Any]] = field(default_factory=list)
-    evidence: dict[str, Any] = field(default_factory=dict)
+    """A flagged entry.
+
+    Scans pass path (a PathNode shared with sibling findings); the three
+    path strings are then derived on access. Passing the strings directly
+    still works and stores them as given.
+
+    Not a dataclass: the constructor takes the former dataclass's
+    arguments, positionally or by keyword, plus keyword-only path, but
+    dataclasses.asdict/replace/fields do not apply; use to_dict().
+    entryType, name, baseName and extension are required.
+    """
+
+    __slots__ = (
+        "findingId", "rootId", "scanId", "path", "entryType", "name", "baseName", "extension",
+        "hazards", "evidence", "_relative", "_observed", "_canonical",
+    )
+
+    def __init__(
+        self,
+        findingId: str,
+        rootId: str,
+        scanId: str,
+        relativePath: str | None = None,
+        observedPath: str | None = None,
+        canonicalPath: str | None = None,
+        entryType: str | None = None,  # "file" | "dir"
+        name: str | None = None,
+        baseName: str | None = None,
+        extension: str | None = None,
+        hazards: list[dict[str, Any]] | None = None,
+        evidence: dict[str, Any] | None = None,
+        *,
+        path: PathNode | None = None,
+    ) -> None:
+        if path is None and observedPath is None:
+            raise TypeError("Finding needs either path or observedPath")
+        if entryType is None or name is None or baseName is None or extension is None:
+            raise TypeError("Finding needs entryType, name, baseName and extension")
+        self.findingId = findingId
+        self.rootId = rootId
+        self.scanId = scanId
+        self.path = path
+        self._relative = relativePath
+        self._observed = observedPath
+        self._canonical = canonicalPath
+        self.entryType = entryType
+        self.name = name
+        self.baseName = baseName
+        self.extension = extension
+        self.hazards = hazards if hazards is not None else []
+        self.evidence = evidence if evidence is not None else {}
+
+    @property
+    def relativePath(self) -> str:
+        return self._relative if self._relative is not None else self.path.relative()
+
+    @property
+    def observedPath(self) -> str:
+        return self._observed if self._observed is not None else self.path.full()
+
+    @property
+    def canonicalPath(self) -> str:
+        if self._canonical is not None:
+            return self._canonical
+        return to_extended_path(self.observedPath)
 
     def to_dict(self) -> dict[str, Any]:
-        return asdict(self)
+        d = {k: getattr(self, k) for k in _FIELDS}
+        # Same deep-copy semantics as dataclasses.asdict
+        d["hazards"] = [dict(h) for h in self.hazards]
+        d["evidence"] = _copy(self.evidence)
+        return d
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Finding):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Finding(findingId={self.findingId!r}, observedPath={self.observedPath!r})"
+
+
+class FindingRecord:
+    """A flagged entry as streamed by nullout.api.Scanner.iter_findings.
+
+    No findingId, evidence block or store registration; paths are built
+    from the shared PathNode on access.
+    """
+
+    __slots__ = ("node", "entry_type", "hazards", "size", "volume_serial", "file_id")
+
+    def __init__(
+        self,
+        node: PathNode,
+        entry_type: str,
+        hazards: tuple[str, ...],
+        size: int | None,
+        volume_serial: str | None = None,
+        file_id: str | None = None,
+    ) -> None:
+        self.node = node
+        self.entry_type = entry_type
+        self.hazards = hazards  # hazard codes, in detection order
+        self.size = size
+        self.volume_serial = volume_serial
+        self.file_id = file_id
+
+    @property
+    def name(self) -> str:
+        return self.node.name
+
+    @property
+    def path(self) -> str:
+        return self.node.full()
+
+    @property
+    def relative_path(self) -> str:
+        return self.node.relative()
+
+    def __repr__(self) -> str:
+        return f"FindingRecord(path={self.path!r}, hazards={self.hazards!r})"
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
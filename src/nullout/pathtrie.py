@@ -0,0 +1,62 @@
+"""Shared path nodes for findings.
+
+A walk hands every directory a PathNode (parent node + name), and each
+finding points at the node for its entry. Findings in the same directory
+share their ancestors, so the store keeps one small object per directory
+and per flagged name instead of three full path strings per finding.
+Path strings are rebuilt on demand, when a finding is serialized or
+re-verified.
+
+Nodes only reference their parent; a directory no finding points at is
+freed once its subtree has been walked.
+"""
+
+from __future__ import annotations
+
+import os
+
+
+class PathNode:
+    """One path segment. The root node's name is the absolute root path."""
+
+    __slots__ = ("parent", "name")
+
+    def __init__(self, parent: PathNode | None, name: str) -> None:
+        self.parent = parent
+        self.name = name
+
+    @classmethod
+    def root(cls, root_abs: str) -> PathNode:
+        return cls(None, root_abs)
+
+    def child(self, name: str) -> PathNode:
+        return PathNode(self, name)
+
+    def descend(self, rel_path: str) -> PathNode:
+        """Node for a path relative to this one (os.sep separated)."""
+        node = self
+        for seg in rel_path.split(os.sep) if rel_path else ():
+            node = PathNode(node, seg)
+        return node
+
+    def relative(self) -> str:
+        """Path below the root node, without a leading separator."""
+        parts: list[str] = []
+        node: PathNode | None = self
+        while node is not None and node.parent is not None:
+            parts.append(node.name)
+            node = node.parent
+        return os.sep.join(reversed(parts))
+
+    def full(self) -> str:
+        """Absolute path. Built by concatenation, never normalized, so
+        trailing dots and spaces survive."""
+        parts: list[str] = []
+        node: PathNode | None = self
+        while node is not None:
+            parts.append(node.name)
+            node = node.parent
+        return os.sep.join(reversed(parts))
+
+    def __repr__(self) -> str:
+        return f"PathNode({self.full()!r})"
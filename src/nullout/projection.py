@@ -0,0 +1,124 @@
+"""Response shaping for findings: field projection and columnar encoding.
+
+fields selects what each finding carries. A name is a top-level finding
+key, a dotted path into one (e.g. "evidence.identity.fileId"), or
+"hazardCodes" (just the codes from hazards). Projected findings keep the
+nesting of the full shape.
+
+format "columnar" returns one array per field instead of one object per
+finding, keyed by the field names as given. Hazards are dictionary-encoded
+in both "hazards" and "hazardCodes" columns: each row is a list of indexes
+into HAZARD_CODES (sent as dictionaries.hazardCodes); a hazard's severity
+and confidence follow from its code (hazards.hazard_from_code).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from nullout.hazards import HAZARD_CODES
+
+FINDING_FIELDS = (
+    "findingId",
+    "rootId",
+    "scanId",
+    "relativePath",
+    "observedPath",
+    "canonicalPath",
+    "entryType",
+    "name",
+    "baseName",
+    "extension",
+    "hazards",
+    "hazardCodes",
+    "evidence",
+)
+DEFAULT_COLUMNS = tuple(f for f in FINDING_FIELDS if f != "hazardCodes")  # full finding
+RESPONSE_FORMATS = ("objects", "columnar")
+
+_HAZARD_INDEX = {code: i for i, code in enumerate(HAZARD_CODES)}
+
+
+def invalid_field(fields: Iterable[str]) -> str | None:
+    """Return the first field whose top-level name is unknown, else None."""
+    for f in fields:
+        top, _, rest = f.partition(".")
+        if top not in FINDING_FIELDS or (rest and top in ("hazards", "hazardCodes")):
+            return f
+    return None
+
+
+def _get(finding: dict[str, Any], field: str) -> Any:
+    if field == "hazardCodes":
+        return [h["code"] for h in finding.get("hazards", ())]
+    value: Any = finding
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def project(finding: dict[str, Any], fields: list[str]) -> dict[str, Any]:
+    """Copy only the selected fields of one finding, keeping their nesting."""
+    out: dict[str, Any] = {}
+    for field in fields:
+        *parents, leaf = field.split(".")
+        target = out
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = _get(finding, field)
+    return out
+
+
+def columnar(findings: list[dict[str, Any]], fields: list[str]) -> dict[str, Any]:
+    """Encode findings as parallel per-field arrays."""
+    columns: dict[str, list[Any]] = {}
+    for field in fields:
+        if field in ("hazards", "hazardCodes"):
+            columns[field] = [
+                [_HAZARD_INDEX[h["code"]] for h in f.get("hazards", ())] for f in findings
+            ]
+        else:
+            columns[field] = [_get(f, field) for f in findings]
+    return {
+        "count": len(findings),
+        "fields": list(fields),
+        "columns": columns,
+        "dictionaries": {"hazardCodes": list(HAZARD_CODES)},
+    }
+
+
+class ResponseShape:
+    """A validated fields/format pair from tool args.
+
+    shape() returns the value to send in place of a findings list: the list
+    itself (default), projected objects, or a columnar block.
+    """
+
+    __slots__ = ("fields", "format")
+
+    def __init__(self, fields: list[str] | None, fmt: str) -> None:
+        self.fields = fields
+        self.format = fmt
+
+    def shape(self, findings: list[dict[str, Any]]) -> Any:
+        if self.format == "columnar":
+            return columnar(findings, self.fields or list(DEFAULT_COLUMNS))
+        if self.fields is None:
+            return findings
+        return [project(f, self.fields) for f in findings]
+
+
+def response_shape(args: dict[str, Any]) -> ResponseShape:
+    """Read fields/format from tool args. Raises ValueError if either is invalid."""
+    fields = args.get("fields")
+    fmt = args.get("format", "objects")
+    if fmt not in RESPONSE_FORMATS:
+        raise ValueError(f"Unknown response format: {fmt!r}")
+    if fields is not None:
+        bad = invalid_field(fields)
+        if bad is not None:
+            raise ValueError(f"Unknown finding field: {bad!r}")
+        fields = list(dict.fromkeys(fields))  # drop repeats, keep order
+    return ResponseShape(fields, fmt)
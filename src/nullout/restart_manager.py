@@ -10,7 +10,6 @@ from __future__ import annotations
 
 import ctypes
 import ctypes.wintypes as wintypes
-import os
 from typing import Any
 
 from nullout.config import Root, REPARSE_POLICY
@@ -19,7 +18,7 @@ from nullout.hazards import has_trailing_dot_or_space
 from nullout.models import Finding
 from nullout.store import Store
 from nullout.win_identity import get_identity
-from nullout.win_paths import is_under_root, is_reparse_point, safe_abspath
+from nullout.win_paths import is_reparse_point, safe_abspath
 
 # --- RM constants ---
 
@@ -230,12 +229,11 @@ def who_is_using(
         return err("E_ROOT_NOT_ALLOWED", "Root not allowlisted.", {"rootId": finding.rootId})
 
     target_abs = safe_abspath(finding.observedPath)
-    root_abs = os.path.abspath(root.path)  # Root paths never have trailing dots/spaces
-    if not is_under_root(target_abs, root_abs):
+    if not root.contains(target_abs):
         return err(
             "E_TRAVERSAL_REJECTED",
             "Target escapes allowlisted root.",
-            {"target": target_abs, "root": root_abs},
+            {"target": target_abs, "root": root.abs_path},
         )
 
     # --- deny_all reparse policy ---
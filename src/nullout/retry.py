@@ -0,0 +1,167 @@
+"""Background retries for deletions blocked by another process (E_IN_USE).
+
+delete_entry with deferOnInUse parks the entry here instead of returning
+E_IN_USE. A single worker thread retries each entry with exponential
+backoff and jitter. Every attempt re-runs the delete-time checks (root
+confinement, reparse policy, identity, empty directory); only the
+confirmation token is not checked again. An entry ends as "deleted", or as
+"failed" with the error that stopped it: E_IN_USE after the last attempt,
+or any other error on the first occurrence.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_BASE_DELAY_MS = 500  # first retry; doubles per attempt
+DEFAULT_MAX_DELAY_MS = 60_000
+FINISHED_LIMIT = 1000  # finished entries kept for get_pending_deletions
+
+Attempt = Callable[[], dict[str, Any]]
+
+
+class PendingDeletion:
+    """One parked delete_entry call and its retry state."""
+
+    __slots__ = (
+        "finding_id", "target", "attempt", "attempts", "status", "created", "next_at", "last_error", "finished",
+    )
+
+    def __init__(self, finding_id: str, target: str, attempt: Attempt) -> None:
+        self.finding_id = finding_id
+        self.target = target
+        self.attempt = attempt
+        self.attempts = 1  # the delete_entry call that hit E_IN_USE
+        self.status = "pending"
+        self.created = time.time()
+        self.next_at = 0.0  # monotonic
+        self.last_error: dict[str, Any] | None = None
+        self.finished: float | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        d: dict[str, Any] = {
+            "findingId": self.finding_id,
+            "target": self.target,
+            "status": self.status,
+            "attempts": self.attempts,
+            "createdAt": int(self.created * 1000),
+            "lastError": self.last_error,
+        }
+        if self.status == "pending":
+            d["nextAttemptInMs"] = max(0, int((self.next_at - time.monotonic()) * 1000))
+        else:
+            d["finishedAt"] = int(self.finished * 1000)
+        return d
+
+
+class RetryQueue:
+    """Pending deletions ordered by next attempt, served by one daemon thread."""
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay_ms: int = DEFAULT_BASE_DELAY_MS,
+        max_delay_ms: int = DEFAULT_MAX_DELAY_MS,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay_ms = base_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self._entries: dict[str, PendingDeletion] = {}  # findingId -> pending or finished entry
+        self._finished: deque[str] = deque()
+        self._heap: list[tuple[float, int, PendingDeletion]] = []
+        self._tie = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def delay_s(self, attempts: int) -> float:
+        """Backoff before attempt attempts + 1: exponential, capped, half of it jittered."""
+        delay = min(self.max_delay_ms, self.base_delay_ms * 2 ** (attempts - 1)) / 1000
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def add(self, finding_id: str, target: str, attempt: Attempt, last_error: dict[str, Any]) -> PendingDeletion:
+        """Park a deletion; a finding already pending keeps its existing entry."""
+        with self._cond:
+            entry = self._entries.get(finding_id)
+            if entry is not None and entry.status == "pending":
+                return entry
+            entry = PendingDeletion(finding_id, target, attempt)
+            entry.last_error = last_error
+            self._entries[finding_id] = entry
+            self._schedule(entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="nullout-retry", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return entry
+
+    def _schedule(self, entry: PendingDeletion) -> None:
+        entry.next_at = time.monotonic() + self.delay_s(entry.attempts)
+        heapq.heappush(self._heap, (entry.next_at, next(self._tie), entry))
+
+    def _finish(self, entry: PendingDeletion, status: str) -> None:
+        entry.status = status
+        entry.finished = time.time()
+        entry.attempt = None  # type: ignore[assignment]  # drop the closure
+        self._finished.append(entry.finding_id)
+        while len(self._finished) > FINISHED_LIMIT:
+            old = self._finished.popleft()
+            if self._entries.get(old) is not None and self._entries[old].status != "pending":
+                del self._entries[old]
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped and (not self._heap or self._heap[0][0] > time.monotonic()):
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                if self._stopped:
+                    return
+                _, _, entry = heapq.heappop(self._heap)
+            try:
+                result = entry.attempt()
+            except Exception as e:  # keep the worker alive; record and give up on this entry
+                result = {"ok": False, "error": {"code": "E_INTERNAL", "message": str(e)}}
+            with self._cond:
+                entry.attempts += 1
+                if result.get("ok"):
+                    entry.last_error = None
+                    self._finish(entry, "deleted")
+                    continue
+                entry.last_error = result["error"]
+                if entry.last_error["code"] == "E_IN_USE" and entry.attempts < self.max_attempts:
+                    self._schedule(entry)
+                else:
+                    self._finish(entry, "failed")
+
+    def entries(self, finding_ids: list[str] | None = None, status: str | None = None) -> list[dict[str, Any]]:
+        with self._cond:
+            chosen = (
+                [self._entries[i] for i in finding_ids if i in self._entries]
+                if finding_ids is not None else list(self._entries.values())
+            )
+            return [e.to_dict() for e in chosen if status is None or e.status == status]
+
+    def counts(self) -> dict[str, int]:
+        with self._cond:
+            out = {"pending": 0, "deleted": 0, "failed": 0}
+            for e in self._entries.values():
+                out[e.status] += 1
+            return out
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+
+# Module-level queue shared by delete_entry and get_pending_deletions
+queue_ref: RetryQueue = RetryQueue()
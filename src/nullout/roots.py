@@ -0,0 +1,192 @@
+"""Root registry: roots from a TOML/JSON file, reloaded without a restart.
+
+NULLOUT_ROOTS_FILE names the file. TOML needs Python 3.11+ (tomllib);
+JSON works everywhere. Either holds a list of roots:
+
+    [[roots]]
+    id = "tenant-a"            # optional, default root_<index>
+    path = 'D:\\tenants\\a'
+    name = "Tenant A"          # optional, default the directory name
+    excludes = ["node_modules"]
+    maxDepth = 20
+    maxWorkersPerDevice = 2
+
+    {"roots": [{"id": "tenant-a", "path": "D:\\tenants\\a", "maxDepth": 20}]}
+
+Paths are checked in parallel when the file is loaded. A reload that
+fails (bad syntax, missing directory) keeps the roots already loaded.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from collections.abc import ItemsView, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from nullout.config import Root, load_global_excludes
+
+RELOAD_POLL_S = 2.0  # how often the watcher compares the file's mtime
+VALIDATE_WORKERS = 32  # concurrent isdir checks while loading
+
+_ROOT_KEYS = {"id", "path", "name", "excludes", "maxDepth", "maxWorkersPerDevice"}
+
+
+def _read(path: str) -> list[Any]:
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.lower().endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            raise RuntimeError("TOML roots files need Python 3.11+; use a .json file") from None
+        try:
+            doc: Any = tomllib.loads(data.decode("utf-8"))
+        except tomllib.TOMLDecodeError as e:
+            raise RuntimeError(f"Invalid roots file {path}: {e}") from None
+    else:
+        try:
+            doc = json.loads(data)
+        except ValueError as e:
+            raise RuntimeError(f"Invalid roots file {path}: {e}") from None
+    entries = doc.get("roots") if isinstance(doc, dict) else doc
+    if not isinstance(entries, list):
+        raise RuntimeError(f"Roots file {path} must hold a list of roots")
+    return entries
+
+
+def _optional_int(entry: dict[str, Any], key: str, where: str) -> int | None:
+    value = entry.get(key)
+    if value is None:
+        return None
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise RuntimeError(f"{where}: {key} must be a positive integer")
+    return value
+
+
+def _parse_root(entry: Any, index: int, path: str, excludes: tuple[str, ...]) -> Root:
+    where = f"Roots file {path}, entry {index}"
+    if not isinstance(entry, dict) or not isinstance(entry.get("path"), str) or not entry["path"].strip():
+        raise RuntimeError(f"{where}: needs a path")
+    unknown = set(entry) - _ROOT_KEYS
+    if unknown:
+        raise RuntimeError(f"{where}: unknown keys {sorted(unknown)}")
+    own = entry.get("excludes", [])
+    if not isinstance(own, list) or not all(isinstance(p, str) for p in own):
+        raise RuntimeError(f"{where}: excludes must be a list of strings")
+    abs_path = os.path.abspath(entry["path"].strip())
+    return Root(
+        root_id=str(entry.get("id") or f"root_{index}"),
+        display_name=str(entry.get("name") or os.path.basename(abs_path) or abs_path),
+        path=abs_path,
+        excludes=excludes + tuple(own),
+        max_depth=_optional_int(entry, "maxDepth", where),
+        max_workers_per_device=_optional_int(entry, "maxWorkersPerDevice", where),
+    )
+
+
+def load_roots_file(path: str) -> dict[str, Root]:
+    """Parse and validate a roots file. NULLOUT_EXCLUDES applies to every root."""
+    excludes = load_global_excludes()
+    roots: dict[str, Root] = {}
+    for i, entry in enumerate(_read(path)):
+        root = _parse_root(entry, i, path, excludes)
+        if root.root_id in roots:
+            raise RuntimeError(f"Roots file {path}: duplicate root id {root.root_id!r}")
+        roots[root.root_id] = root
+    if not roots:
+        raise RuntimeError(f"Roots file {path} lists no roots.")
+
+    with ThreadPoolExecutor(min(VALIDATE_WORKERS, len(roots))) as pool:
+        found = list(pool.map(os.path.isdir, [r.abs_path for r in roots.values()]))
+    missing = [r.abs_path for r, ok in zip(roots.values(), found) if not ok]
+    if missing:
+        raise RuntimeError(
+            f"Configured root does not exist or is not a directory: {', '.join(missing[:5])}"
+            + (f" (+{len(missing) - 5} more)" if len(missing) > 5 else "")
+        )
+    return roots
+
+
+class RootRegistry(Mapping[str, Root]):
+    """rootId -> Root, swapped atomically when the roots file is reloaded.
+
+    Handlers take it wherever they take a roots dict. Each request reads
+    one consistent set of roots; a request already running keeps the Root
+    objects it looked up.
+    """
+
+    def __init__(self, roots: dict[str, Root], source: str | None = None) -> None:
+        self._roots = dict(roots)
+        self.source = source
+        self.generation = 0  # bumped by every successful reload
+        self._mtime = self._source_mtime()
+        self._lock = threading.Lock()  # one reload at a time
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_file(cls, path: str) -> RootRegistry:
+        return cls(load_roots_file(path), source=path)
+
+    def __getitem__(self, root_id: str) -> Root:
+        return self._roots[root_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._roots)
+
+    def __len__(self) -> int:
+        return len(self._roots)
+
+    def items(self) -> ItemsView[str, Root]:  # type: ignore[override]
+        """Items of one generation, even if a reload lands while iterating."""
+        return self._roots.items()
+
+    def _source_mtime(self) -> int | None:
+        if self.source is None:
+            return None
+        try:
+            return os.stat(self.source).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self) -> bool:
+        """Re-read the roots file; on any error keep the current roots."""
+        if self.source is None:
+            return False
+        with self._lock:
+            self._mtime = self._source_mtime()
+            try:
+                roots = load_roots_file(self.source)
+            except (OSError, RuntimeError) as e:
+                print(f"nullout: roots not reloaded: {e}", file=sys.stderr)
+                return False
+            self._roots = roots
+            self.generation += 1
+        return True
+
+    def reload_if_changed(self) -> bool:
+        if self._source_mtime() == self._mtime:
+            return False
+        return self.reload()
+
+    def start_watching(self, interval_s: float = RELOAD_POLL_S) -> None:
+        """Poll the file's mtime on a daemon thread and reload on change."""
+        if self.source is None or self._thread is not None:
+            return
+
+        def run() -> None:
+            while not self._stop.wait(interval_s):
+                self.reload_if_changed()
+
+        self._thread = threading.Thread(target=run, name="nullout-roots", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
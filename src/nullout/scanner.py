@@ -0,0 +1,800 @@
+"""Scan engine: directory walk, hazard classification, multi-root scheduling."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
+
+from nullout import dirfd, heat
+from nullout.config import LaneLimits, Root
+from nullout.excludes import MatchState, compile_excludes
+from nullout.hazards import MAX_PATH_LEGACY, detect_hazards, parse_basename, has_trailing_dot_or_space
+from nullout.lanes import DeviceScheduler, device_of
+from nullout.models import Finding, FindingRecord
+from nullout.pathtrie import PathNode
+from nullout.spill import ScanMemoryBudget
+from nullout.store import Store
+from nullout.summary import DirCounts, HazardHistogram
+from nullout.trace import ScanTrace
+from nullout import identity
+from nullout.win_paths import to_extended_path, is_reparse_point
+
+DEFAULT_MAX_DEPTH = 50
+_NO_MATCH: MatchState = MatchState()  # exclude state that can never match
+
+
+@dataclass(frozen=True)
+class ScanOptions:
+    recursive: bool
+    include_dirs: bool
+    max_depth: int = DEFAULT_MAX_DEPTH
+    excludes: tuple[str, ...] = ()  # per-request, added to the root's own excludes
+    collapse_long_paths: bool = False  # fold over-length subtrees into one aggregate finding
+    prioritize: bool = False  # queue directories hot in earlier scans first (nullout.heat)
+
+
+@dataclass
+class ScanStats:
+    visited: int = 0
+    flagged: int = 0
+    skipped_reparse: int = 0
+    pruned_dirs: int = 0
+    collapsed: int = 0  # entries folded into aggregate findings
+    identity_enumerated: int = 0  # identities taken from directory enumeration
+    identity_opened: int = 0  # identities that needed the entry opened (fallback)
+    spilled: int = 0  # findings written to a spill segment (NULLOUT_MAX_SCAN_MEMORY)
+    first_finding_ms: int | None = None  # time from the start of the call to the first flagged directory
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "visited": self.visited,
+            "flagged": self.flagged,
+            "skippedReparsePoints": self.skipped_reparse,
+            "prunedDirectories": self.pruned_dirs,
+            "collapsedEntries": self.collapsed,
+            "identityFromEnumeration": self.identity_enumerated,
+            "identityFileOpens": self.identity_opened,
+            "spilledFindings": self.spilled,
+            "firstFindingMs": self.first_finding_ms,
+        }
+
+
+@dataclass(frozen=True)
+class ScanBudget:
+    """Limits that end a scan call early. Checked between directories, so a
+    directory that has started enumerating always finishes."""
+
+    time_budget_ms: int | None = None
+    max_visited: int | None = None
+    max_findings: int | None = None
+
+    def exceeded(self, elapsed_s: float, visited: int, findings: int) -> str | None:
+        """Return the name of the limit that was hit, or None."""
+        if self.time_budget_ms is not None and elapsed_s * 1000 >= self.time_budget_ms:
+            return "timeBudgetMs"
+        if self.max_visited is not None and visited >= self.max_visited:
+            return "maxVisited"
+        if self.max_findings is not None and findings >= self.max_findings:
+            return "maxFindings"
+        return None
+
+
+@dataclass
+class ScanResult:
+    scan_id: str
+    root_id: str
+    findings: list[dict[str, Any]] = field(default_factory=list)
+    stats: ScanStats = field(default_factory=ScanStats)
+    pruned_roots: list[str] = field(default_factory=list)  # nested rootIds left to their own scan
+    frontier: list[tuple[str, int]] = field(default_factory=list)  # (relativePath, depth) not yet enumerated
+    stop_reason: str | None = None
+    summary: HazardHistogram | None = None  # summary mode: counts instead of findings
+    memory: ScanMemoryBudget | None = None  # set when NULLOUT_MAX_SCAN_MEMORY applies
+
+
+@dataclass(frozen=True)
+class RootLayout:
+    """Nesting relationships between configured roots.
+
+    scan_order: rootIds that get their own walk (duplicates removed).
+    prune: rootId -> {normcased inner root path: inner rootId}.
+    duplicates: rootId -> rootId of the identical root that is scanned instead.
+    """
+
+    scan_order: list[str]
+    prune: dict[str, dict[str, str]]
+    duplicates: dict[str, str]
+
+
+def layout_roots(roots: dict[str, Root]) -> RootLayout:
+    """Detect identical and nested roots so each directory is walked once.
+
+    A directory inside several roots is attributed to the innermost one:
+    outer roots stop at the inner root's directory and leave it to that
+    root's own walk.
+    """
+    canonical: dict[str, str] = {}  # normcased path -> first rootId
+    duplicates: dict[str, str] = {}
+    for root_id, root in roots.items():
+        key = os.path.dirname(root.prefix)  # drop the trailing separator
+        if key in canonical:
+            duplicates[root_id] = canonical[key]
+        else:
+            canonical[key] = root_id
+
+    # Each root looks up its ancestors by prefix: O(roots x depth), not O(roots^2)
+    prune: dict[str, dict[str, str]] = {root_id: {} for root_id in canonical.values()}
+    for inner_path, inner_id in canonical.items():
+        path, parent = inner_path, os.path.dirname(inner_path)
+        while parent != path:
+            outer_id = canonical.get(parent)
+            if outer_id is not None:
+                prune[outer_id][inner_path] = inner_id
+            path, parent = parent, os.path.dirname(parent)
+
+    return RootLayout(
+        scan_order=list(canonical.values()),
+        prune=prune,
+        duplicates=duplicates,
+    )
+
+
+class _RootWalk:
+    """Per-root walk state shared by the directory tasks of one scan."""
+
+    def __init__(
+        self,
+        root: Root,
+        scan_id: str,
+        opts: ScanOptions,
+        store: Store,
+        scheduler: DeviceScheduler,
+        prune: dict[str, str] | None,
+        budget: ScanBudget | None = None,
+        summary: HazardHistogram | None = None,
+        sink: Callable[[list[dict[str, Any]]], None] | None = None,
+        memory: ScanMemoryBudget | None = None,
+        trace: ScanTrace | None = None,
+        lane_limit: int | None = None,
+    ) -> None:
+        self.root = root
+        self.root_abs = root.abs_path
+        self.root_node = PathNode.root(self.root_abs)
+        self.opts = opts
+        self.store = store
+        self.scheduler = scheduler
+        self.prune = prune or {}
+        self.excludes = compile_excludes(root.excludes + opts.excludes)
+        self.budget = budget
+        self.result = ScanResult(scan_id=scan_id, root_id=root.root_id, summary=summary, memory=memory)
+        self.memory = memory
+        self.sink = sink
+        self.trace = trace
+        self.lane_limit = lane_limit  # own lane per device with this many workers (scan_roots)
+        self.hints = heat.heat_ref.hints_for(self.root_abs) if opts.prioritize else None
+        # Only prioritized walks, or walks of a root with a map, feed the heat map
+        self._learning = opts.prioritize or heat.heat_ref.has(self.root_abs)
+        self._seen: dict[str, int] = {}  # relative dir -> flagged entries, for the heat map
+        self._complete = False  # started at the root (not a frontier), so the map can be replaced
+        self.dir_fds = dirfd.limiter_ref
+        self._handed_fds: set[int] = set()  # opened for queued subdirectories, not yet taken
+        self._finding_ids: list[str] = []
+        self._pruned: set[str] = set()
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    def start(self, frontier: list[tuple[str, int]] | None = None) -> None:
+        """Queue the root directory, or a saved frontier when resuming."""
+        device = device_of(self.root_abs)
+        excludes = self.excludes
+        if frontier is None:
+            self._complete = True
+            state = excludes.start if excludes else _NO_MATCH
+            self._submit(device, self.root_node, 0, state)
+            return
+        for rel, depth in frontier:
+            node = self.root_node.descend(rel)
+            full = node.full()
+            # Same reasoning as _child_device: on Windows the whole root is one volume
+            dir_device = device if os.name == "nt" else device_of(full)
+            state = excludes.state_for(rel)[0] if excludes else _NO_MATCH
+            priority = 0.0
+            if self.hints is not None:
+                priority = self.hints.priority(rel, node.name, len(to_extended_path(full)))
+            self._submit(dir_device, node, depth, state, priority=priority)
+
+    def _submit(
+        self, device: int, node: PathNode, depth: int, state: MatchState, dir_fd: int | None = None,
+        priority: float = 0.0,
+    ) -> None:
+        self.scheduler.submit(
+            device, self.scan_dir, node, depth, device, state, dir_fd,
+            priority=priority, owner=self.root.root_id, limit=self.lane_limit,
+        )
+
+    def close_handed_fds(self) -> None:
+        """Close descriptors whose directory task never ran (scheduler error)."""
+        with self._lock:
+            fds, self._handed_fds = self._handed_fds, set()
+        for fd in fds:
+            self.dir_fds.close(fd)
+
+    def finish(self) -> ScanResult:
+        result = self.result
+        result.pruned_roots = sorted(self._pruned)
+        result.frontier.sort()
+        if result.summary is None:
+            self.store.extend_scan(result.scan_id, self._finding_ids)
+        self._learn()
+        return result
+
+    def _learn(self) -> None:
+        """Hand this walk's per-directory counts to the root's heat map."""
+        if not self._learning:
+            return
+        complete = self._complete and not self.result.frontier
+        heat.heat_ref.learn(self.root_abs, self._seen, complete)
+
+    def _should_defer(self) -> bool:
+        """True once the budget is spent; sticky for the rest of the call."""
+        if self.budget is None:
+            return False
+        with self._lock:
+            if self.result.stop_reason is None:
+                self.result.stop_reason = self.budget.exceeded(
+                    time.monotonic() - self._started,
+                    self.result.stats.visited,
+                    self.result.stats.flagged,
+                )
+            return self.result.stop_reason is not None
+
+    def scan_dir(
+        self, node: PathNode, depth: int, device: int, state: MatchState, dir_fd: int | None = None,
+    ) -> int:
+        """Enumerate one directory; queue subdirectories on their device lane.
+
+        node is the directory's path node; a flagged subdirectory and its
+        queued walk share one child node. state is the exclude-automaton
+        state of the directory; subdirectories that reach an excluded state
+        are counted and never queued.
+        dir_fd, when set, is an open descriptor for the directory (opened
+        relative to its parent's); the task owns and closes it. Entries are
+        then listed, stat'd and opened relative to it (see nullout.dirfd).
+        Returns the number of entries enumerated (for lane throughput), or -1
+        if the budget is spent and the directory went back onto the frontier.
+        """
+        fds = self.dir_fds
+        if dir_fd is not None:
+            with self._lock:
+                self._handed_fds.discard(dir_fd)
+        if self._should_defer():
+            with self._lock:
+                self.result.frontier.append((node.relative(), depth))
+            if dir_fd is not None:
+                fds.close(dir_fd)
+            return -1
+        tr = self.trace
+        traced_at = tr.begin() if tr is not None else 0
+        current = node.full()
+        if dir_fd is None and fds.enabled:
+            try:
+                dir_fd = fds.open(current)  # None at the cap: path-based below
+            except OSError:
+                pass  # let the path-based scandir report it as before
+        opts = self.opts
+        excludes = self.excludes
+        visited = skipped_reparse = pruned_dirs = collapsed = 0
+        findings: list[dict[str, Any]] = []
+        ids: identity.OpenPerEntry | None = None  # created on the first finding
+        # Summary mode counts hazards here and never opens or records entries
+        counts = DirCounts() if self.result.summary is not None else None
+        # Per-entry calls; timed wrappers when tracing (nullout.trace)
+        scandir, reparse_point, classify, record, collapse = (
+            os.scandir, is_reparse_point, detect_hazards, self._record, self._collapse,
+        )
+        if tr is not None:
+            scandir, reparse_point, classify, record, collapse = (
+                tr.timed("enumerate", scandir), tr.timed("reparse", reparse_point),
+                tr.timed("classify", classify), tr.timed("finding", record), tr.timed("collapse", collapse),
+            )
+        try:
+            # Use extended path for scandir — Win32 normalizes trailing
+            # dots/spaces which makes hazardous directories inaccessible.
+            scan_path = to_extended_path(current) if dir_fd is None else dir_fd
+            with scandir(scan_path) as it:
+                for entry in (it if tr is None else tr.timed_iter("enumerate", it)):
+                    visited += 1
+                    # Build regular path from parent + entry name to preserve
+                    # trailing chars that os.path.join might normalize.
+                    full = current + os.sep + entry.name
+                    name = entry.name
+                    child = node.child(name)
+                    is_dir = entry.is_dir(follow_symlinks=False)
+
+                    # deny_all: detect reparse points, don't traverse
+                    if (entry.is_symlink() if dir_fd is not None else reparse_point(full)):
+                        skipped_reparse += 1
+                        hazards = classify(name, len(to_extended_path(full)), is_reparse=True)
+                        if counts is not None:
+                            counts.add(hazards, is_dir)
+                        else:
+                            ids = ids or identity.for_directory(current, device)
+                            findings.append(record(child, full, entry, hazards, ids))
+                        continue
+
+                    # An excluded directory is skipped whole, even where the walk
+                    # would not enter it (maxDepth reached, recursive=false)
+                    child_state = _NO_MATCH
+                    if is_dir and state:
+                        child_state, excluded = excludes.step(state, name)
+                        if excluded:
+                            pruned_dirs += 1
+                            continue
+
+                    descend = opts.recursive and is_dir and depth < opts.max_depth
+                    if descend and self.prune:
+                        owner = self.prune.get(os.path.normcase(full))
+                        if owner is not None:
+                            with self._lock:
+                                self._pruned.add(owner)
+                            descend = False
+
+                    if (
+                        descend
+                        and opts.collapse_long_paths
+                        and counts is None
+                        and len(to_extended_path(full)) > MAX_PATH_LEGACY
+                    ):
+                        # Every descendant would be WIN_PATH_TOO_LONG: count the
+                        # subtree here and emit one aggregate finding instead.
+                        aggregate = collapse(full, depth + 1, child_state)
+                        visited += aggregate["descendants"]
+                        collapsed += aggregate["descendants"]
+                        skipped_reparse += aggregate["hazardCounts"].get("REPARSE_POINT_PRESENT", 0)
+                        pruned_dirs += aggregate.pop("prunedDirectories")
+                        hazards = classify(name, len(to_extended_path(full)), is_reparse=False)
+                        ids = ids or identity.for_directory(current, device)
+                        findings.append(record(child, full, entry, hazards, ids, aggregate))
+                        continue
+
+                    # Skip non-directory entries if includeDirs=False and it's a dir
+                    if not (is_dir and not opts.include_dirs):
+                        hazards = classify(name, len(to_extended_path(full)), is_reparse=False)
+                        if hazards:
+                            if counts is not None:
+                                counts.add(hazards, is_dir)
+                            else:
+                                ids = ids or identity.for_directory(current, device)
+                                findings.append(record(child, full, entry, hazards, ids))
+
+                    if descend:
+                        child_fd = None
+                        if dir_fd is not None:
+                            try:
+                                # O_NOFOLLOW: a directory swapped for a symlink is never entered
+                                child_fd = fds.open(name, dir_fd)
+                            except OSError:
+                                continue  # inaccessible or gone since enumeration
+                            if child_fd is not None:
+                                with self._lock:
+                                    self._handed_fds.add(child_fd)
+                        child_device = _child_device(entry, device)
+                        priority = 0.0
+                        if self.hints is not None:
+                            priority = self.hints.priority(child.relative(), name, len(to_extended_path(full)))
+                        self._submit(child_device, child, depth + 1, child_state, child_fd, priority)
+        except PermissionError:
+            pass  # non-fatal: skip inaccessible directories
+        finally:
+            with self._lock:
+                stats = self.result.stats
+                stats.visited += visited
+                stats.skipped_reparse += skipped_reparse
+                stats.pruned_dirs += pruned_dirs
+                stats.collapsed += collapsed
+                if ids is not None:
+                    stats.identity_enumerated += ids.enumerated
+                    stats.identity_opened += ids.opened
+                flagged = counts.flagged if counts is not None else len(findings)
+                if flagged:
+                    rel = node.relative()
+                    if self._learning:
+                        seen = self._seen
+                        seen[rel] = flagged
+                        if len(seen) >= 2 * heat.MAX_HOT_DIRECTORIES:
+                            self._seen = heat.hottest(seen)
+                    if stats.first_finding_ms is None:
+                        stats.first_finding_ms = int((time.monotonic() - self._started) * 1000)
+                if counts is not None:
+                    stats.flagged += counts.flagged
+                    if counts.flagged:
+                        self.result.summary.merge(counts, depth, rel)
+                else:
+                    stats.flagged += len(findings)
+                    self._collect(findings)
+            if dir_fd is not None:
+                fds.close(dir_fd)
+            if self.sink is not None and findings:
+                self.sink(findings)  # may block: bounded export buffer
+            if tr is not None:
+                tr.end(
+                    "walk", traced_at, name=node.relative() or ".", cat="directory", always=True,
+                    args={"entries": visited, "flagged": len(findings), "depth": depth},
+                )
+        return visited
+
+    def _collect(self, findings: list[dict[str, Any]]) -> None:
+        """Add one directory's findings to the result. Called under the lock."""
+        self._finding_ids.extend(f["findingId"] for f in findings)
+        kept = findings
+        if self.memory is not None and self.memory.segment is not None:
+            kept = [f for f in findings if not self.store.is_spilled(f["findingId"])]
+            self.result.stats.spilled += len(findings) - len(kept)
+        if self.sink is None:
+            self.result.findings.extend(kept)
+
+    def _record(
+        self,
+        path: PathNode,
+        full: str,
+        entry: os.DirEntry[str],
+        hazards: list[dict[str, Any]],
+        ids: identity.OpenPerEntry,
+        aggregate: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        identify = ids.identity if self.trace is None else self.trace.timed("identity", ids.identity)
+        vol, fid = identify(entry, full)
+        f = make_finding(
+            self.store, self.root.root_id, self.result.scan_id, path, entry, hazards, vol, fid, aggregate,
+        )
+        record = f.to_dict()
+        memory = self.memory
+        if memory is None or memory.charge(record):
+            self.store.put_finding(f)
+        else:
+            self.store.spill_finding(record, memory.segment)
+        return record
+
+    def _collapse(self, top: str, top_depth: int, top_state: MatchState) -> dict[str, Any]:
+        """Count an over-length subtree without opening or recording entries.
+
+        Runs inside the discovering directory task, so budgets and
+        continuation frontiers treat the whole subtree as one unit. Applies
+        the same deny_all, maxDepth, includeDirs and exclude rules as the walk,
+        and like it does not enter nested roots (prune).
+        """
+        opts = self.opts
+        excludes = self.excludes
+        prune = self.prune
+        hazard_counts: dict[str, int] = {}
+        descendants = files = dirs = flagged = size = pruned = 0
+        stack = [(top, top_depth, top_state)]
+        while stack:
+            current, depth, state = stack.pop()
+            try:
+                with os.scandir(to_extended_path(current)) as it:
+                    for entry in it:
+                        descendants += 1
+                        full = current + os.sep + entry.name
+                        reparse = is_reparse_point(full)
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if is_dir and not reparse:
+                            dirs += 1
+                            child_state = _NO_MATCH
+                            if state:
+                                child_state, excluded = excludes.step(state, entry.name)
+                                if excluded:
+                                    pruned += 1
+                                    continue
+                            if opts.recursive and depth < opts.max_depth:
+                                owner = prune.get(os.path.normcase(full)) if prune else None
+                                if owner is None:
+                                    stack.append((full, depth + 1, child_state))
+                                else:
+                                    with self._lock:
+                                        self._pruned.add(owner)
+                        elif not is_dir:
+                            files += 1
+                            size += _safe_size(entry, "file") or 0
+                        if is_dir and not reparse and not opts.include_dirs:
+                            continue
+                        hazards = detect_hazards(entry.name, len(to_extended_path(full)), is_reparse=reparse)
+                        if hazards:
+                            flagged += 1
+                            for h in hazards:
+                                hazard_counts[h["code"]] = hazard_counts.get(h["code"], 0) + 1
+            except PermissionError:
+                pass  # non-fatal: same as the main walk
+
+        return {
+            "descendants": descendants,
+            "files": files,
+            "dirs": dirs,
+            "sizeBytes": size,
+            "flaggedDescendants": flagged,
+            "hazardCounts": hazard_counts,
+            "depth": top_depth,
+            "includeDirs": opts.include_dirs,
+            "maxDepth": opts.max_depth,
+            "excludes": list(opts.excludes),
+            "prunedDirectories": pruned,
+            "nestedRootsPruned": bool(prune),  # scan_all_roots: nested roots were left to their own walk
+        }
+
+
+class _RecordWalk(_RootWalk):
+    """Walk that hands FindingRecords to its sink instead of registering
+    Findings in a store. Stops early (leaving the rest on the frontier)
+    once cancel is set."""
+
+    def __init__(
+        self,
+        root: Root,
+        opts: ScanOptions,
+        scheduler: DeviceScheduler,
+        sink: Callable[[list[FindingRecord]], None],
+        cancel: threading.Event,
+        capture_identity: bool = True,
+    ) -> None:
+        super().__init__(root, "", opts, Store(), scheduler, None, sink=sink)
+        self.cancel = cancel
+        self.capture_identity = capture_identity
+
+    def _should_defer(self) -> bool:
+        return self.cancel.is_set()
+
+    def _collect(self, findings: list[Any]) -> None:
+        pass  # everything went to the sink
+
+    def _record(
+        self,
+        path: PathNode,
+        full: str,
+        entry: os.DirEntry[str],
+        hazards: list[dict[str, Any]],
+        ids: identity.OpenPerEntry,
+        aggregate: dict[str, Any] | None = None,
+    ) -> FindingRecord:
+        vol = fid = None
+        if self.capture_identity:
+            vol, fid = ids.identity(entry, full)
+        entry_type = "dir" if entry.is_dir(follow_symlinks=False) else "file"
+        codes = tuple(h["code"] for h in hazards)
+        return FindingRecord(path, entry_type, codes, _safe_size(entry, entry_type), vol, fid)
+
+    def finish(self) -> ScanResult:
+        self._learn()
+        return self.result
+
+
+def stream_root(
+    root: Root,
+    opts: ScanOptions,
+    sink: Callable[[list[FindingRecord]], None],
+    cancel: threading.Event,
+    capture_identity: bool = True,
+    workers_per_device: int | None = None,
+) -> ScanStats:
+    """Walk one root, handing each directory's FindingRecords to sink.
+
+    Nothing is registered in a store. Setting cancel stops the walk at the
+    next directory. Returns the walk's stats.
+    """
+    scheduler = DeviceScheduler(lane_limits_ref, override=workers_per_device)
+    walk = _RecordWalk(root, opts, scheduler, sink, cancel, capture_identity)
+    walk.start()
+    try:
+        scheduler.wait()
+    finally:
+        walk.close_handed_fds()
+    return walk.finish().stats
+
+
+def _child_device(entry: os.DirEntry[str], parent_device: int) -> int:
+    """Device of a subdirectory about to be queued.
+
+    On Windows volume mount points are reparse points, which deny_all never
+    enters, so a subdirectory always shares its parent's volume. Elsewhere a
+    mount can sit on a plain directory, so ask lstat (cheap via DirEntry).
+    """
+    if os.name == "nt":
+        return parent_device
+    try:
+        return entry.stat(follow_symlinks=False).st_dev
+    except OSError:
+        return parent_device
+
+
+def walk_root(
+    root: Root,
+    scan_id: str,
+    opts: ScanOptions,
+    store: Store,
+    prune: dict[str, str] | None = None,
+    workers_per_device: int | None = None,
+    budget: ScanBudget | None = None,
+    frontier: list[tuple[str, int]] | None = None,
+    summary: HazardHistogram | None = None,
+    sink: Callable[[list[dict[str, Any]]], None] | None = None,
+    trace: ScanTrace | None = None,
+) -> tuple[ScanResult, list[dict[str, Any]]]:
+    """Walk one root, register its findings in the store, and return them.
+
+    prune maps normcased directory paths to the rootId that owns them;
+    those directories are still classified but never entered.
+    When budget runs out, directories not yet enumerated are returned in
+    result.frontier; passing that frontier back continues the same walk
+    without revisiting finished directories.
+    With summary, hazards are only counted into the histogram: no identity
+    opens, no Finding objects, nothing registered in the store.
+    With sink, each directory's findings are handed to it as they are
+    produced instead of being collected in result.findings.
+    Under a scan memory limit (set_scan_memory_limit), findings past it are
+    spilled to disk and left out of result.findings.
+    With trace, phase timings and per-directory spans are recorded in it.
+    Returns the result plus per-device lane stats.
+    """
+    scheduler = DeviceScheduler(lane_limits_ref, override=workers_per_device)
+    memory = _memory_budget() if summary is None else None
+    walk = _RootWalk(root, scan_id, opts, store, scheduler, prune, budget, summary, sink, memory, trace)
+    walk.start(frontier)
+    try:
+        scheduler.wait()
+    finally:
+        walk.close_handed_fds()
+        if memory is not None:
+            memory.close()
+    return walk.finish(), scheduler.lane_stats()
+
+
+def scan_roots(
+    roots: dict[str, Root],
+    opts: ScanOptions,
+    store: Store,
+    workers_per_device: int | None = None,
+    trace: ScanTrace | None = None,
+    root_opts: Mapping[str, ScanOptions] | None = None,
+) -> tuple[list[ScanResult], RootLayout, list[dict[str, Any]]]:
+    """Scan every configured root concurrently, walking shared subtrees once.
+
+    All roots share one scheduler, so roots on the same device share that
+    device's lane while roots on different devices proceed in parallel.
+    root_opts overrides opts per rootId (the roots file's maxDepth). Without
+    workers_per_device, a root with max_workers_per_device walks on its own
+    lane per device with that many workers.
+    """
+    layout = layout_roots(roots)
+    scheduler = DeviceScheduler(lane_limits_ref, override=workers_per_device)
+    memory = _memory_budget()  # one budget for the whole call
+    walks = [
+        _RootWalk(
+            roots[root_id], store.new_id("scan"), (root_opts or {}).get(root_id, opts), store, scheduler,
+            layout.prune[root_id], memory=memory, trace=trace, lane_limit=roots[root_id].max_workers_per_device,
+        )
+        for root_id in layout.scan_order
+    ]
+    for walk in walks:
+        walk.start()
+    try:
+        scheduler.wait()
+    finally:
+        for walk in walks:
+            walk.close_handed_fds()
+        if memory is not None:
+            memory.close()
+    return [walk.finish() for walk in walks], layout, scheduler.lane_stats()
+
+
+# --- Finding construction ---
+
+
+def make_finding(
+    store: Store,
+    root_id: str,
+    scan_id: str,
+    path: PathNode,
+    entry: os.DirEntry[str],
+    hazards: list[dict[str, Any]],
+    vol: str | None,
+    fid: str | None,
+    aggregate: dict[str, Any] | None = None,
+) -> Finding:
+    """Build a Finding from scan data.
+
+    The finding keeps path (shared with its siblings) rather than path
+    strings. aggregate, when set, holds the descendant counts of a collapsed
+    over-length subtree (see expand_finding).
+    """
+    full_path = path.full()
+    name = path.name
+    base, ext = parse_basename(name)
+    entry_type = "dir" if entry.is_dir(follow_symlinks=False) else "file"
+    evidence = build_evidence(full_path, entry_type, _safe_size(entry, entry_type), hazards, vol, fid)
+    if aggregate is not None:
+        evidence["aggregate"] = aggregate
+
+    return Finding(
+        findingId=store.new_id("fnd"),
+        rootId=root_id,
+        scanId=scan_id,
+        path=path,
+        entryType=entry_type,
+        name=name,
+        baseName=base,
+        extension=ext,
+        hazards=hazards,
+        evidence=evidence,
+    )
+
+
+def build_evidence(
+    full_path: str,
+    entry_type: str,
+    size: int | None,
+    hazards: list[dict[str, Any]],
+    vol: str | None,
+    fid: str | None,
+) -> dict[str, Any]:
+    """Build a finding's evidence block; everything but size and identity
+    is derived from the path and hazards."""
+    name = os.path.basename(full_path)
+    canonical = to_extended_path(full_path)
+    return {
+        "fs": {
+            "existsAtScan": True,
+            "sizeBytes": size,
+            "attributes": [],
+            "isDirectory": entry_type == "dir",
+            "isReparsePoint": any(h["code"] == "REPARSE_POINT_PRESENT" for h in hazards),
+        },
+        "win32": {
+            "requiresExtendedPath": True,
+            "hasTrailingDotOrSpace": has_trailing_dot_or_space(name),
+            "exceedsMaxPathLegacy": len(canonical) > MAX_PATH_LEGACY,
+            "isUncPath": full_path.startswith("\\\\"),
+            "isDevicePath": False,
+            "isAdsSuspected": ":" in name[2:] if len(name) > 2 else False,
+        },
+        "identity": {
+            "volumeSerial": vol,
+            "fileId": fid,
+            "fingerprintVersion": 1,
+        },
+    }
+
+
+def _safe_size(entry: os.DirEntry[str], entry_type: str) -> int | None:
+    """Get file size, returning None for directories or on failure."""
+    if entry_type == "dir":
+        return None
+    try:
+        return entry.stat(follow_symlinks=False).st_size
+    except Exception:
+        return None
+
+
+# Module-level lane limits — set by server.py at startup
+lane_limits_ref: LaneLimits = LaneLimits()
+
+
+def set_lane_limits(limits: LaneLimits) -> None:
+    """Set the per-device scan concurrency. Called by server.py at init."""
+    global lane_limits_ref
+    lane_limits_ref = limits
+
+
+# Module-level scan memory limit in bytes (0 = unlimited) — set by server.py at startup
+scan_memory_limit_ref: int = 0
+
+
+def set_scan_memory_limit(limit: int) -> None:
+    """Set the per-call scan memory budget. Called by server.py at init."""
+    global scan_memory_limit_ref
+    scan_memory_limit_ref = limit
+
+
+def _memory_budget() -> ScanMemoryBudget | None:
+    return ScanMemoryBudget(scan_memory_limit_ref) if scan_memory_limit_ref > 0 else None
@@ -1,27 +1,79 @@
-"""NullOut MCP server — stdio JSON-RPC 2.0 loop."""
+"""NullOut MCP server — stdio JSON-RPC 2.0 loop, or localhost HTTP (nullout.http_transport)."""
 
 from __future__ import annotations
 
 import json
+import os
+import signal
 import sys
+from collections.abc import Mapping
 from typing import Any
 
-from nullout.config import Root, load_roots, get_token_secret
+from nullout import __version__, retry, watch
+from nullout.config import (
+    Root,
+    load_audit_max_bytes,
+    load_http_address,
+    load_roots,
+    load_lane_limits,
+    load_max_dir_fds,
+    load_max_scan_memory,
+    load_trace_all,
+    get_audit_dir,
+    get_export_dir,
+    get_http_token,
+    get_roots_file,
+    get_snapshot_dir,
+    get_token_secret,
+    get_trace_dir,
+)
+from nullout.audit import AuditJournal, set_audit_journal
+from nullout.dirfd import set_dir_fd_limit
+from nullout.scanner import set_lane_limits, set_scan_memory_limit
 from nullout.errors import err
+from nullout.roots import RootRegistry
+from nullout.snapshot import SNAPSHOT_SUFFIX
 from nullout.store import Store
 from nullout.tools import (
     handle_list_allowed_roots,
     handle_scan_reserved_names,
+    handle_scan_all_roots,
+    handle_export_scan,
+    handle_save_snapshot,
+    handle_resume_scan,
     handle_get_finding,
+    handle_get_scan_findings,
+    handle_expand_finding,
     handle_plan_cleanup,
     handle_delete_entry,
+    handle_watch_root,
+    handle_get_watch_changes,
+    handle_get_pending_deletions,
     handle_who_is_using,
     handle_get_server_info,
+    set_export_dir,
+    set_snapshot_dir,
     set_store,
+    set_trace_config,
 )
 
+PROTOCOL_VERSION = "2025-03-26"
+
 # --- MCP tools/list schema (paste-ready from spec) ---
 
+EXPORT_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "format": {"type": "string", "enum": ["ndjson", "csv"]},
+        "gzip": {"type": "boolean"},
+        "fileName": {"type": "string"},
+    },
+    "additionalProperties": False,
+}
+
+FIELDS_SCHEMA: dict[str, Any] = {"type": "array", "items": {"type": "string"}, "minItems": 1}
+FORMAT_SCHEMA: dict[str, Any] = {"type": "string", "enum": ["objects", "columnar"]}
+
 TOOLS_LIST: list[dict[str, Any]] = [
     {
         "name": "list_allowed_roots",
@@ -42,18 +94,163 @@ TOOLS_LIST: list[dict[str, Any]] = [
                 "recursive": {"type": "boolean"},
                 "maxDepth": {"type": "integer", "minimum": 0},
                 "includeDirs": {"type": "boolean"},
+                "maxWorkersPerDevice": {"type": "integer", "minimum": 1},
+                "trace": {"type": "boolean"},
+                "exclude": {"type": "array", "items": {"type": "string"}},
+                "collapseLongPaths": {"type": "boolean"},
+                "prioritize": {"type": "boolean"},
+                "timeBudgetMs": {"type": "integer", "minimum": 1},
+                "maxVisited": {"type": "integer", "minimum": 1},
+                "maxFindings": {"type": "integer", "minimum": 1},
+                "mode": {"type": "string", "enum": ["full", "summary", "estimate"]},
+                "targetPrecision": {"type": "number", "exclusiveMinimum": 0, "maximum": 1},
+                "maxProbes": {"type": "integer", "minimum": 1},
+                "topDirectories": {"type": "integer", "minimum": 0},
+                "export": EXPORT_SCHEMA,
+                "fields": FIELDS_SCHEMA,
+                "format": FORMAT_SCHEMA,
             },
             "required": ["rootId", "recursive", "includeDirs"],
             "additionalProperties": False,
         },
         "annotations": {"readOnlyHint": True},
     },
+    {
+        "name": "resume_scan",
+        "description": (
+            "Continue a scan that stopped at timeBudgetMs/maxVisited/maxFindings. "
+            "Pass the continuationToken; only directories not yet enumerated are walked."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "continuationToken": {"type": "string"},
+                "maxWorkersPerDevice": {"type": "integer", "minimum": 1},
+                "trace": {"type": "boolean"},
+                "timeBudgetMs": {"type": "integer", "minimum": 1},
+                "maxVisited": {"type": "integer", "minimum": 1},
+                "maxFindings": {"type": "integer", "minimum": 1},
+                "fields": FIELDS_SCHEMA,
+                "format": FORMAT_SCHEMA,
+            },
+            "required": ["continuationToken"],
+            "additionalProperties": False,
+        },
+        "annotations": {"readOnlyHint": True},
+    },
+    {
+        "name": "scan_all_roots",
+        "description": (
+            "Scan every allowlisted root concurrently. Nested roots are walked once "
+            "and findings are attributed to the innermost root. Returns a scanId per root."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "recursive": {"type": "boolean"},
+                "maxDepth": {"type": "integer", "minimum": 0},
+                "includeDirs": {"type": "boolean"},
+                "maxWorkersPerDevice": {"type": "integer", "minimum": 1},
+                "trace": {"type": "boolean"},
+                "exclude": {"type": "array", "items": {"type": "string"}},
+                "collapseLongPaths": {"type": "boolean"},
+                "prioritize": {"type": "boolean"},
+                "fields": FIELDS_SCHEMA,
+                "format": FORMAT_SCHEMA,
+            },
+            "required": ["recursive", "includeDirs"],
+            "additionalProperties": False,
+        },
+        "annotations": {"readOnlyHint": True},
+    },
+    {
+        "name": "export_scan",
+        "description": (
+            "Scan an allowlisted root and stream findings to an NDJSON or CSV file "
+            "(optionally gzipped) inside NULLOUT_EXPORT_DIR. Returns path, row count and sha256."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "rootId": {"type": "string"},
+                "recursive": {"type": "boolean"},
+                "maxDepth": {"type": "integer", "minimum": 0},
+                "includeDirs": {"type": "boolean"},
+                "maxWorkersPerDevice": {"type": "integer", "minimum": 1},
+                "trace": {"type": "boolean"},
+                "exclude": {"type": "array", "items": {"type": "string"}},
+                "collapseLongPaths": {"type": "boolean"},
+                "prioritize": {"type": "boolean"},
+                **EXPORT_SCHEMA["properties"],
+            },
+            "required": ["rootId", "recursive", "includeDirs"],
+            "additionalProperties": False,
+        },
+        "annotations": {"readOnlyHint": True},
+    },
+    {
+        "name": "save_snapshot",
+        "description": (
+            "Write a scan's findings to a memory-mapped columnar snapshot in "
+            "NULLOUT_SNAPSHOT_DIR. Snapshots are reloaded at startup, so findingIds "
+            "stay resolvable across server restarts."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {"scanId": {"type": "string"}},
+            "required": ["scanId"],
+            "additionalProperties": False,
+        },
+    },
     {
         "name": "get_finding",
-        "description": "Return full details for a findingId returned by scan.",
+        "description": "Return full details (or only the listed fields) for a findingId returned by scan.",
         "inputSchema": {
             "type": "object",
-            "properties": {"findingId": {"type": "string"}},
+            "properties": {"findingId": {"type": "string"}, "fields": FIELDS_SCHEMA},
+            "required": ["findingId"],
+            "additionalProperties": False,
+        },
+        "annotations": {"readOnlyHint": True},
+    },
+    {
+        "name": "get_scan_findings",
+        "description": (
+            "Page through every finding of a scanId, including findings a "
+            "memory-budgeted scan spilled to disk and left out of its response."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "scanId": {"type": "string"},
+                "offset": {"type": "integer", "minimum": 0},
+                "limit": {"type": "integer", "minimum": 1},
+                "fields": FIELDS_SCHEMA,
+                "format": FORMAT_SCHEMA,
+            },
+            "required": ["scanId"],
+            "additionalProperties": False,
+        },
+        "annotations": {"readOnlyHint": True},
+    },
+    {
+        "name": "expand_finding",
+        "description": (
+            "Drill into an aggregate finding from a collapseLongPaths scan: walk its "
+            "subtree and return individual findings (with identity) under the same scanId."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "findingId": {"type": "string"},
+                "maxWorkersPerDevice": {"type": "integer", "minimum": 1},
+                "trace": {"type": "boolean"},
+                "timeBudgetMs": {"type": "integer", "minimum": 1},
+                "maxVisited": {"type": "integer", "minimum": 1},
+                "maxFindings": {"type": "integer", "minimum": 1},
+                "fields": FIELDS_SCHEMA,
+                "format": FORMAT_SCHEMA,
+            },
             "required": ["findingId"],
             "additionalProperties": False,
         },
@@ -84,19 +281,82 @@ TOOLS_LIST: list[dict[str, Any]] = [
         "name": "delete_entry",
         "description": (
             "Delete a file or an EMPTY directory only. "
-            "Requires confirmToken. No raw paths accepted."
+            "Requires confirmToken. No raw paths accepted. "
+            "deferOnInUse=true retries an in-use target in the background "
+            "(see get_pending_deletions) instead of returning E_IN_USE."
         ),
         "inputSchema": {
             "type": "object",
             "properties": {
                 "findingId": {"type": "string"},
                 "confirmToken": {"type": "string"},
+                "deferOnInUse": {"type": "boolean"},
             },
             "required": ["findingId", "confirmToken"],
             "additionalProperties": False,
         },
         "annotations": {"destructiveHint": True},
     },
+    {
+        "name": "watch_root",
+        "description": (
+            "Keep a root's findings live: walk it once, then re-classify only entries "
+            "created or renamed (inotify on Linux, directory mtime polling elsewhere). "
+            "Read changes with get_watch_changes. stop=true ends the watch."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "rootId": {"type": "string"},
+                "recursive": {"type": "boolean"},
+                "maxDepth": {"type": "integer", "minimum": 0},
+                "includeDirs": {"type": "boolean"},
+                "exclude": {"type": "array", "items": {"type": "string"}},
+                "pollIntervalMs": {"type": "integer", "minimum": 10},
+                "stop": {"type": "boolean"},
+                "fields": FIELDS_SCHEMA,
+                "format": FORMAT_SCHEMA,
+            },
+            "required": ["rootId"],
+            "additionalProperties": False,
+        },
+        "annotations": {"readOnlyHint": True},
+    },
+    {
+        "name": "get_watch_changes",
+        "description": (
+            "Findings added and removed by watch_root watchers after sinceSeq. "
+            "Pass the returned nextSeq on the next call."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "sinceSeq": {"type": "integer", "minimum": 0},
+                "rootId": {"type": "string"},
+                "maxChanges": {"type": "integer", "minimum": 1},
+                "fields": FIELDS_SCHEMA,
+            },
+            "required": ["sinceSeq"],
+            "additionalProperties": False,
+        },
+        "annotations": {"readOnlyHint": True},
+    },
+    {
+        "name": "get_pending_deletions",
+        "description": (
+            "Status of deletions deferred by delete_entry with deferOnInUse: "
+            "pending, deleted, or failed with the error that stopped the retries."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "findingIds": {"type": "array", "items": {"type": "string"}},
+                "status": {"type": "string", "enum": ["pending", "deleted", "failed"]},
+            },
+            "additionalProperties": False,
+        },
+        "annotations": {"readOnlyHint": True},
+    },
     {
         "name": "who_is_using",
         "description": (
@@ -126,7 +386,7 @@ TOOLS_LIST: list[dict[str, Any]] = [
 class NullOutServer:
     """MCP server with tool routing over stdio JSON-RPC."""
 
-    def __init__(self, roots: dict[str, Root], store: Store, token_secret: bytes) -> None:
+    def __init__(self, roots: Mapping[str, Root], store: Store, token_secret: bytes) -> None:
         self.roots = roots
         self.store = store
         self.token_secret = token_secret
@@ -137,15 +397,34 @@ class NullOutServer:
         method = req.get("method", "")
         params = req.get("params") or {}
 
+        if method == "initialize":
+            return self._rpc_ok(rpc_id, {
+                "protocolVersion": params.get("protocolVersion", PROTOCOL_VERSION),
+                "capabilities": {"tools": {}},
+                "serverInfo": {"name": "nullout-mcp", "version": __version__},
+            })
         if method == "tools/list":
             return self._rpc_ok(rpc_id, {"tools": TOOLS_LIST})
 
         handlers = {
             "list_allowed_roots": lambda p: handle_list_allowed_roots(p, self.roots),
-            "scan_reserved_names": lambda p: handle_scan_reserved_names(p, self.roots, self.store),
+            "scan_reserved_names": lambda p: handle_scan_reserved_names(
+                p, self.roots, self.store, self.token_secret,
+            ),
+            "resume_scan": lambda p: handle_resume_scan(p, self.roots, self.store, self.token_secret),
+            "scan_all_roots": lambda p: handle_scan_all_roots(p, self.roots, self.store),
+            "export_scan": lambda p: handle_export_scan(p, self.roots, self.store),
+            "save_snapshot": lambda p: handle_save_snapshot(p, self.roots, self.store),
             "get_finding": lambda p: handle_get_finding(p, self.store),
+            "get_scan_findings": lambda p: handle_get_scan_findings(p, self.store),
+            "expand_finding": lambda p: handle_expand_finding(
+                p, self.roots, self.store, self.token_secret,
+            ),
             "plan_cleanup": lambda p: handle_plan_cleanup(p, self.store, self.token_secret),
             "delete_entry": lambda p: handle_delete_entry(p, self.roots, self.store, self.token_secret),
+            "watch_root": lambda p: handle_watch_root(p, self.roots, self.store),
+            "get_watch_changes": lambda p: handle_get_watch_changes(p),
+            "get_pending_deletions": lambda p: handle_get_pending_deletions(p),
             "who_is_using": lambda p: handle_who_is_using(p, self.roots, self.store),
             "get_server_info": lambda p: handle_get_server_info(p),
         }
@@ -171,15 +450,91 @@ class NullOutServer:
         return {"jsonrpc": "2.0", "id": rpc_id, "result": result}
 
 
+def load_snapshots(store: Store, snapshot_dir: str | None) -> int:
+    """Map every snapshot in snapshot_dir into the store (warm restart).
+
+    Unreadable files are reported on stderr and skipped. Returns the count loaded.
+    """
+    if snapshot_dir is None:
+        return 0
+    loaded = 0
+    for name in sorted(os.listdir(snapshot_dir)):
+        if not name.endswith(SNAPSHOT_SUFFIX):
+            continue
+        try:
+            store.open_snapshot(os.path.join(snapshot_dir, name))
+            loaded += 1
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"nullout: skipping snapshot {name}: {e}\n")
+    return loaded
+
+
+def serve_http(server: NullOutServer, token: bytes, host: str, port: int) -> None:
+    """Serve every client from this one process until interrupted."""
+    from nullout.http_transport import NullOutHTTPServer
+
+    httpd = NullOutHTTPServer(server, token, host, port)
+    sys.stderr.write(f"nullout: listening on {httpd.url}\n")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
 def main() -> None:
-    """Entry point: load config, run stdio JSON-RPC loop."""
-    roots = load_roots()
+    """Entry point: load config, run the HTTP server or the stdio JSON-RPC loop."""
+    roots_file = get_roots_file()
+    if roots_file is not None:
+        roots = RootRegistry.from_file(roots_file)
+        roots.start_watching()
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda _sig, _frame: roots.reload())
+    else:
+        roots = RootRegistry(load_roots())
     token_secret = get_token_secret()
+    http_address = load_http_address()
+    http_token = get_http_token() if http_address is not None else None
     store = Store()
     set_store(store)
+    set_lane_limits(load_lane_limits())
+    set_dir_fd_limit(load_max_dir_fds())
+    set_scan_memory_limit(load_max_scan_memory())
+    set_export_dir(get_export_dir())
+    set_trace_config(load_trace_all(), get_trace_dir())
+    snapshot_dir = get_snapshot_dir()
+    set_snapshot_dir(snapshot_dir)
+    load_snapshots(store, snapshot_dir)
+    audit_dir = get_audit_dir()
+    journal = AuditJournal(audit_dir, load_audit_max_bytes()) if audit_dir is not None else None
+    set_audit_journal(journal)
 
     server = NullOutServer(roots, store, token_secret)
+    try:
+        if http_address is not None:
+            serve_http(server, http_token, *http_address)
+        else:
+            serve_stdio(server)
+    finally:
+        shutdown(store, journal)
+
+
+def shutdown(store: Store, journal: AuditJournal | None) -> None:
+    """Stop background work, then release what it used.
+
+    Watchers and the retry queue go first: a deferred delete still running
+    reads the store and appends to the journal.
+    """
+    watch.registry_ref.stop_all()
+    retry.queue_ref.stop()
+    store.close()
+    if journal is not None:
+        journal.close()  # commit what is still queued
+
 
+def serve_stdio(server: NullOutServer) -> None:
+    """Answer JSON-RPC requests line by line on stdin/stdout until EOF."""
     for line in sys.stdin:
         line = line.strip()
         if not line:
@@ -0,0 +1,369 @@
+"""Columnar scan snapshots, memory-mapped for warm restarts and queries.
+
+A snapshot stores one scan as fixed-width columns plus byte heaps, so it
+can be opened with mmap and queried without building Python objects for
+rows that are never touched.
+
+Rows form a path tree: every finding and each of its ancestor directories
+is a row with a name (offset/length into the name heap) and a parent row
+index. A finding's relativePath is rebuilt by following parents.
+
+Layout (native byte order, recorded in the header):
+
+    b"NULLSNAP" | u32 version | u32 header length | header JSON | pad to 8
+    sections, each 8-byte aligned, at offsets relative to the data start
+
+Sections are the columns in _COLUMNS, the "names", "ids" and "extras"
+heaps, and "idIndex" (finding rows sorted by findingId, for binary search).
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Iterator
+
+from nullout.hazards import HAZARD_CODES, hazard_from_code, parse_basename
+from nullout.models import Finding
+from nullout.win_paths import to_extended_path
+
+MAGIC = b"NULLSNAP"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".nosnap"
+
+_COLUMNS: dict[str, str] = {
+    "nameOffset": "Q",
+    "nameLength": "I",
+    "parent": "q",  # -1 for rows directly under the root
+    "flags": "B",
+    "entryType": "B",  # 0 file, 1 dir
+    "hazardMask": "I",  # bit i set = HAZARD_CODES[i]
+    "size": "q",
+    "volume": "Q",
+    "fileId": "Q",
+    "idOffset": "Q",
+    "idLength": "I",
+    "extraOffset": "q",  # -1 when the row has no extra evidence
+    "extraLength": "I",
+}
+
+FLAG_FINDING = 0x1
+FLAG_IDENTITY = 0x2
+FLAG_SIZE = 0x4
+
+_STANDARD_EVIDENCE = ("fs", "win32", "identity")
+_PREFIX = struct.Struct("<8sII")
+
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _encode(text: str) -> bytes:
+    # Windows names can hold unpaired surrogates; keep them round-trippable
+    return text.encode("utf-8", "surrogatepass")
+
+
+def _decode(data: bytes | memoryview) -> str:
+    return bytes(data).decode("utf-8", "surrogatepass")
+
+
+def _identity_ints(identity: dict[str, Any]) -> tuple[int, int] | None:
+    """Parse identity hex strings, or None if they would not round-trip exactly."""
+    vol, fid = identity.get("volumeSerial"), identity.get("fileId")
+    if not isinstance(vol, str) or not isinstance(fid, str):
+        return None
+    try:
+        v, f = int(vol, 16), int(fid, 16)
+    except ValueError:
+        return None
+    if f"0x{v:08X}" != vol or f"0x{f:016X}" != fid or f > 0xFFFFFFFFFFFFFFFF:
+        return None
+    return v, f
+
+
+def write_snapshot(
+    path: str,
+    scan_id: str,
+    root_id: str,
+    root_abs: str,
+    findings: list[Finding],
+) -> dict[str, Any]:
+    """Write findings of one scan as a columnar snapshot. Returns size info."""
+    cols = {name: array(tc) for name, tc in _COLUMNS.items()}
+    names = bytearray()
+    ids = bytearray()
+    extras = bytearray()
+    nodes: dict[tuple[int, str], int] = {}
+
+    def node(parent: int, name: str) -> int:
+        idx = nodes.get((parent, name))
+        if idx is None:
+            idx = len(cols["parent"])
+            nodes[(parent, name)] = idx
+            b = _encode(name)
+            cols["nameOffset"].append(len(names))
+            cols["nameLength"].append(len(b))
+            names.extend(b)
+            cols["parent"].append(parent)
+            cols["flags"].append(0)
+            cols["entryType"].append(1)  # ancestors are directories
+            cols["hazardMask"].append(0)
+            cols["size"].append(-1)
+            for name_ in ("volume", "fileId", "idOffset", "idLength", "extraLength"):
+                cols[name_].append(0)
+            cols["extraOffset"].append(-1)
+        return idx
+
+    code_bits = {code: 1 << i for i, code in enumerate(HAZARD_CODES)}
+    finding_rows: list[tuple[bytes, int]] = []
+    for f in findings:
+        parts = f.relativePath.split(os.sep)
+        parent = -1
+        for part in parts[:-1]:
+            parent = node(parent, part)
+        row = node(parent, parts[-1])
+
+        flags = FLAG_FINDING
+        extra = {k: v for k, v in f.evidence.items() if k not in _STANDARD_EVIDENCE}
+        identity = f.evidence.get("identity", {})
+        ints = _identity_ints(identity)
+        if ints is not None:
+            flags |= FLAG_IDENTITY
+            cols["volume"][row], cols["fileId"][row] = ints
+        elif identity:
+            extra["identity"] = identity
+        size = f.evidence.get("fs", {}).get("sizeBytes")
+        if size is not None:
+            flags |= FLAG_SIZE
+            cols["size"][row] = size
+
+        cols["flags"][row] = flags
+        cols["entryType"][row] = 1 if f.entryType == "dir" else 0
+        cols["hazardMask"][row] = sum(code_bits[h["code"]] for h in f.hazards)
+
+        fid_bytes = f.findingId.encode("ascii")
+        cols["idOffset"][row] = len(ids)
+        cols["idLength"][row] = len(fid_bytes)
+        ids.extend(fid_bytes)
+        finding_rows.append((fid_bytes, row))
+
+        if extra:
+            blob = json.dumps(extra, separators=(",", ":")).encode("utf-8")
+            cols["extraOffset"][row] = len(extras)
+            cols["extraLength"][row] = len(blob)
+            extras.extend(blob)
+
+    finding_rows.sort()
+    sections: dict[str, bytes] = {name: col.tobytes() for name, col in cols.items()}
+    sections["idIndex"] = array("I", [row for _, row in finding_rows]).tobytes()
+    sections["names"] = bytes(names)
+    sections["ids"] = bytes(ids)
+    sections["extras"] = bytes(extras)
+
+    layout: dict[str, list[int]] = {}
+    offset = 0
+    for name, data in sections.items():
+        layout[name] = [offset, len(data)]
+        offset = _align8(offset + len(data))
+
+    header = json.dumps({
+        "scanId": scan_id,
+        "rootId": root_id,
+        "rootPath": root_abs,
+        "rows": len(cols["parent"]),
+        "findings": len(finding_rows),
+        "hazardCodes": list(HAZARD_CODES),
+        "byteorder": sys.byteorder,
+        "sections": layout,
+    }).encode("utf-8")
+    data_start = _align8(_PREFIX.size + len(header))
+
+    partial = path + ".partial"
+    with open(partial, "wb") as out:
+        out.write(_PREFIX.pack(MAGIC, SNAPSHOT_VERSION, len(header)))
+        out.write(header)
+        for name, data in sections.items():
+            out.seek(data_start + layout[name][0])
+            out.write(data)
+        out.truncate(data_start + offset)
+    os.replace(partial, path)
+    return {"path": path, "rows": len(cols["parent"]), "findings": len(finding_rows), "bytes": data_start + offset}
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    Only the header is parsed on open; column reads go straight to the
+    mapping, and Finding objects are built per row on demand.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"Not a NullOut snapshot: {path}")
+        try:
+            magic, version, header_len = _PREFIX.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f"Not a NullOut snapshot (v{SNAPSHOT_VERSION}): {path}")
+            header = json.loads(self._mm[_PREFIX.size:_PREFIX.size + header_len])
+            if header["byteorder"] != sys.byteorder or header["hazardCodes"] != list(HAZARD_CODES):
+                raise ValueError(f"Snapshot was written for a different platform or version: {path}")
+        except (struct.error, KeyError, json.JSONDecodeError) as e:
+            self.close()
+            raise ValueError(f"Corrupt snapshot header: {path}") from e
+        except ValueError:
+            self.close()
+            raise
+
+        self.scan_id: str = header["scanId"]
+        self.root_id: str = header["rootId"]
+        self.root_path: str = header["rootPath"]
+        self.rows: int = header["rows"]
+        self.findings: int = header["findings"]
+
+        data_start = _align8(_PREFIX.size + header_len)
+        view = memoryview(self._mm)
+        self._views: list[memoryview] = [view]
+
+        def section(name: str, typecode: str | None = None) -> memoryview:
+            start, length = header["sections"][name]
+            mv = view[data_start + start:data_start + start + length]
+            if typecode is not None:
+                mv = mv.cast(typecode)
+            self._views.append(mv)
+            return mv
+
+        self._cols = {name: section(name, tc) for name, tc in _COLUMNS.items()}
+        self._id_index = section("idIndex", "I")
+        self._names = section("names")
+        self._ids = section("ids")
+        self._extras = section("extras")
+
+    def close(self) -> None:
+        for mv in reversed(getattr(self, "_views", [])):
+            mv.release()
+        self._views = []
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> Snapshot:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # --- Row access ---
+
+    def finding_id(self, row: int) -> str:
+        off, length = self._cols["idOffset"][row], self._cols["idLength"][row]
+        return self._ids[off:off + length].tobytes().decode("ascii")
+
+    def name(self, row: int) -> str:
+        off, length = self._cols["nameOffset"][row], self._cols["nameLength"][row]
+        return _decode(self._names[off:off + length])
+
+    def relative_path(self, row: int) -> str:
+        parts: list[str] = []
+        parent = self._cols["parent"]
+        while row >= 0:
+            parts.append(self.name(row))
+            row = parent[row]
+        return os.sep.join(reversed(parts))
+
+    def find_row(self, finding_id: str) -> int | None:
+        """Binary search the id index; no rows are decoded besides the probes."""
+        target = finding_id.encode("ascii", "replace")
+        index, ids = self._id_index, self._ids
+        id_off, id_len = self._cols["idOffset"], self._cols["idLength"]
+        lo, hi = 0, len(index)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = index[mid]
+            probe = ids[id_off[row]:id_off[row] + id_len[row]].tobytes()
+            if probe < target:
+                lo = mid + 1
+            elif probe > target:
+                hi = mid
+            else:
+                return row
+        return None
+
+    def finding(self, row: int) -> Finding:
+        """Materialize one row as a Finding (same shape the scan produced)."""
+        from nullout.scanner import build_evidence  # scanner imports the store, which imports us
+
+        cols = self._cols
+        flags = cols["flags"][row]
+        rel = self.relative_path(row)
+        observed = self.root_path + os.sep + rel
+        name = self.name(row)
+        base, ext = parse_basename(name)
+        entry_type = "dir" if cols["entryType"][row] else "file"
+        mask = cols["hazardMask"][row]
+        hazards = [hazard_from_code(code) for i, code in enumerate(HAZARD_CODES) if mask & (1 << i)]
+
+        vol = fid = None
+        if flags & FLAG_IDENTITY:
+            vol = f"0x{cols['volume'][row]:08X}"
+            fid = f"0x{cols['fileId'][row]:016X}"
+        size = cols["size"][row] if flags & FLAG_SIZE else None
+        evidence = build_evidence(observed, entry_type, size, hazards, vol, fid)
+
+        extra_off = cols["extraOffset"][row]
+        if extra_off >= 0:
+            blob = self._extras[extra_off:extra_off + cols["extraLength"][row]].tobytes()
+            evidence.update(json.loads(blob))
+
+        return Finding(
+            findingId=self.finding_id(row),
+            rootId=self.root_id,
+            scanId=self.scan_id,
+            relativePath=rel,
+            observedPath=observed,
+            canonicalPath=to_extended_path(observed),
+            entryType=entry_type,
+            name=name,
+            baseName=base,
+            extension=ext,
+            hazards=hazards,
+            evidence=evidence,
+        )
+
+    def get_finding(self, finding_id: str) -> Finding | None:
+        row = self.find_row(finding_id)
+        return None if row is None else self.finding(row)
+
+    # --- Column queries ---
+
+    def finding_ids(self) -> list[str]:
+        """Finding ids in the order the scan recorded them (the id index is only for lookups)."""
+        flags, id_off = self._cols["flags"], self._cols["idOffset"]
+        rows = [row for row in range(self.rows) if flags[row] & FLAG_FINDING]
+        rows.sort(key=id_off.__getitem__)  # ids were appended in recorded order; ancestor rows come earlier
+        return [self.finding_id(row) for row in rows]
+
+    def rows_with_hazard(self, code: str) -> Iterator[int]:
+        """Yield rows flagged with code, scanning only the hazard column."""
+        bit = 1 << HAZARD_CODES.index(code)
+        for row, mask in enumerate(self._cols["hazardMask"]):
+            if mask & bit:
+                yield row
+
+    def hazard_counts(self) -> dict[str, int]:
+        counts = [0] * len(HAZARD_CODES)
+        for mask in self._cols["hazardMask"]:
+            if mask:
+                for i in range(len(HAZARD_CODES)):
+                    if mask & (1 << i):
+                        counts[i] += 1
+        return {code: n for code, n in zip(HAZARD_CODES, counts) if n}
@@ -0,0 +1,111 @@
+"""Memory-budgeted scans: findings past the budget go to a disk segment.
+
+A scan call charges each finding it keeps in memory (its Finding in the
+store plus its response record) against NULLOUT_MAX_SCAN_MEMORY. Once the
+budget is spent, further findings are appended to an anonymous temporary
+file as JSON lines and the store keeps only findingId -> (segment, offset,
+length). get_finding, plan_cleanup, delete_entry, snapshots and
+get_scan_findings paging read spilled findings back one at a time.
+Spilled findings are left out of the scan response's findings list.
+
+A segment stays open while the store still serves findings from it. It is
+closed (and its file removed) when the store drops the last of them or is
+closed itself, or at the end of the scan call if nothing was written to it.
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+from typing import Any
+
+# A finding held in memory (Finding object + response dict) costs roughly
+# this many bytes per byte of its JSON form.
+IN_MEMORY_FACTOR = 3
+
+
+class SpillSegment:
+    """Append-only JSON-lines file of finding records; removed when closed."""
+
+    def __init__(self) -> None:
+        self._file = tempfile.TemporaryFile(prefix="nullout-spill-")
+        self._end = 0
+        self._lock = threading.Lock()
+        self.records = 0
+        self.live = 0  # findings the store still serves from this segment, plus reads in progress
+
+    def append(self, record: dict[str, Any]) -> tuple[int, int]:
+        """Write one record; return its (offset, length)."""
+        data = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        with self._lock:
+            offset = self._end
+            self._file.seek(offset)
+            self._file.write(data)
+            self._end += len(data)
+            self.records += 1
+        return offset, len(data)
+
+    def read(self, offset: int, length: int) -> dict[str, Any]:
+        with self._lock:
+            self._file.seek(offset)
+            data = self._file.read(length)
+        return json.loads(data)
+
+    @property
+    def size(self) -> int:
+        return self._end
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ScanMemoryBudget:
+    """Bytes of findings one scan call may keep in memory before spilling.
+
+    Once a charge fails the budget stays spent for the rest of the call, so
+    every later finding spills. The segment is created on first spill.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+        self.segment: SpillSegment | None = None
+        self._lock = threading.Lock()
+
+    def charge(self, record: dict[str, Any]) -> bool:
+        """Account for keeping record in memory; False means spill it."""
+        if self.segment is not None:
+            return False
+        cost = len(json.dumps(record)) * IN_MEMORY_FACTOR
+        with self._lock:
+            if self.segment is not None:
+                return False
+            if self.used + cost > self.limit:
+                self.segment = SpillSegment()
+                return False
+            self.used += cost
+            return True
+
+    def close(self) -> None:
+        """End of the scan call: close the segment if the store holds nothing in it."""
+        with self._lock:
+            segment = self.segment
+        if segment is not None and segment.live == 0:
+            segment.close()
+
+    @property
+    def spilled(self) -> int:
+        return self.segment.records if self.segment is not None else 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "limitBytes": self.limit,
+            "inMemoryBytes": self.used,
+            "spilledFindings": self.spilled,
+            "spillBytes": self.segment.size if self.segment is not None else 0,
+        }
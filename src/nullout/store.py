@@ -3,9 +3,13 @@
 from __future__ import annotations
 
 import os
+import threading
 import time
+from typing import Any
 
 from nullout.models import Finding
+from nullout.snapshot import Snapshot
+from nullout.spill import SpillSegment
 
 
 class Store:
@@ -15,19 +19,130 @@ class Store:
         self._findings: dict[str, Finding] = {}
         self._scan_index: dict[str, list[str]] = {}  # scanId -> findingIds
         self._counter = 0
+        self._lock = threading.Lock()  # scans may run on several threads
+        self._snapshots: dict[str, Snapshot] = {}  # scanId -> mapped snapshot
+        self._spilled: dict[str, tuple[SpillSegment, int, int]] = {}  # findingId -> record location
+        self._expanded: set[str] = set()  # aggregate findingIds already expanded
 
     def new_id(self, prefix: str) -> str:
-        self._counter += 1
-        return f"{prefix}_{int(time.time() * 1000)}_{os.getpid()}_{self._counter}"
+        with self._lock:
+            self._counter += 1
+            n = self._counter
+        return f"{prefix}_{int(time.time() * 1000)}_{os.getpid()}_{n}"
 
     def put_finding(self, finding: Finding) -> None:
         self._findings[finding.findingId] = finding
 
+    def spill_finding(self, record: dict[str, Any], segment: SpillSegment) -> None:
+        """Keep a finding on disk (memory-budgeted scans); only its location stays here."""
+        offset, length = segment.append(record)
+        with self._lock:
+            segment.live += 1
+            self._spilled[record["findingId"]] = (segment, offset, length)
+
+    def is_spilled(self, finding_id: str) -> bool:
+        return finding_id in self._spilled
+
     def get_finding(self, finding_id: str) -> Finding | None:
-        return self._findings.get(finding_id)
+        finding = self._findings.get(finding_id)
+        if finding is None:
+            with self._lock:
+                spilled = self._spilled.get(finding_id)
+                if spilled is not None:
+                    spilled[0].live += 1  # pin: remove_findings must not close it under the read
+            if spilled is not None:
+                segment, offset, length = spilled
+                try:
+                    return Finding(**segment.read(offset, length))
+                finally:
+                    self._release(segment)
+        if finding is None:
+            for snapshot in self._snapshots.values():
+                finding = snapshot.get_finding(finding_id)
+                if finding is not None:
+                    break
+        return finding
+
+    def mark_expanded(self, finding_id: str) -> bool:
+        """Claim an aggregate for expansion; False if it was already claimed."""
+        with self._lock:
+            if finding_id in self._expanded:
+                return False
+            self._expanded.add(finding_id)
+            return True
 
     def register_scan(self, scan_id: str, finding_ids: list[str]) -> None:
         self._scan_index[scan_id] = finding_ids
 
+    def extend_scan(self, scan_id: str, finding_ids: list[str]) -> None:
+        """Append findings to a scan, creating it if needed (resumed scans)."""
+        with self._lock:
+            self._scan_index.setdefault(scan_id, []).extend(finding_ids)
+
+    def remove_findings(self, scan_id: str, finding_ids: list[str]) -> None:
+        """Drop findings whose entries are gone (watch mode)."""
+        drop = set(finding_ids)
+        emptied: list[SpillSegment] = []
+        with self._lock:
+            for finding_id in drop:
+                self._findings.pop(finding_id, None)
+                spilled = self._spilled.pop(finding_id, None)
+                if spilled is not None:
+                    segment = spilled[0]
+                    segment.live -= 1
+                    if segment.live == 0:
+                        emptied.append(segment)
+            ids = self._scan_index.get(scan_id)
+            if ids is not None:
+                self._scan_index[scan_id] = [i for i in ids if i not in drop]
+        for segment in emptied:
+            segment.close()
+
+    def _release(self, segment: SpillSegment) -> None:
+        """Drop one reference to a segment; close it when it was the last."""
+        with self._lock:
+            segment.live -= 1
+            last = segment.live == 0
+        if last:
+            segment.close()
+
     def get_scan_findings(self, scan_id: str) -> list[str]:
-        return self._scan_index.get(scan_id, [])
+        ids = self._scan_index.get(scan_id)
+        if ids is None and scan_id in self._snapshots:
+            return self._snapshots[scan_id].finding_ids()
+        return ids or []
+
+    def open_snapshot(self, path: str) -> Snapshot:
+        """Map a snapshot file and serve its findings (warm restart).
+
+        In-memory findings for the same scan take precedence.
+        """
+        snapshot = Snapshot(path)
+        with self._lock:
+            old = self._snapshots.pop(snapshot.scan_id, None)
+            self._snapshots[snapshot.scan_id] = snapshot
+        if old is not None:
+            old.close()
+        return snapshot
+
+    def close_snapshot(self, scan_id: str) -> None:
+        """Stop serving a scan's snapshot and unmap it, so its file can be replaced."""
+        with self._lock:
+            old = self._snapshots.pop(scan_id, None)
+        if old is not None:
+            old.close()
+
+    def get_snapshot(self, scan_id: str) -> Snapshot | None:
+        return self._snapshots.get(scan_id)
+
+    def close(self) -> None:
+        """Close spill segments and unmap snapshots (server shutdown)."""
+        with self._lock:
+            segments = {id(s): s for s, _, _ in self._spilled.values()}.values()
+            snapshots = list(self._snapshots.values())
+            self._spilled.clear()
+            self._snapshots.clear()
+        for segment in segments:
+            segment.close()
+        for snapshot in snapshots:
+            snapshot.close()
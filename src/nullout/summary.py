@@ -0,0 +1,83 @@
+"""Summary-mode scan counters: hazard histograms in fixed-size arrays.
+
+Summary scans never build Finding objects. Each directory task counts its
+hazards into a small DirCounts scratch, which is merged into the scan-wide
+HazardHistogram under the walk lock. Memory depends on the number of hazard
+codes, the deepest level reached and the top-N size — not on how many
+entries are flagged.
+"""
+
+from __future__ import annotations
+
+import heapq
+from array import array
+from typing import Any
+
+from nullout.hazards import HAZARD_CODES
+
+_N = len(HAZARD_CODES)
+_CODE_INDEX: dict[str, int] = {code: i for i, code in enumerate(HAZARD_CODES)}
+DEFAULT_TOP_DIRECTORIES = 20
+
+
+def _zeros(n: int) -> array:
+    return array("q", bytes(8 * n))
+
+
+class DirCounts:
+    """Per-directory scratch counters: [file codes..., dir codes...]."""
+
+    __slots__ = ("by_type", "flagged")
+
+    def __init__(self) -> None:
+        self.by_type = _zeros(2 * _N)
+        self.flagged = 0
+
+    def add(self, hazards: list[dict[str, Any]], is_dir: bool) -> None:
+        base = _N if is_dir else 0
+        by_type = self.by_type
+        for h in hazards:
+            by_type[base + _CODE_INDEX[h["code"]]] += 1
+        self.flagged += 1
+
+
+class HazardHistogram:
+    """Scan-wide hazard counts by code, depth, entry type and directory."""
+
+    def __init__(self, top_n: int = DEFAULT_TOP_DIRECTORIES) -> None:
+        self.top_n = top_n
+        self.by_type = _zeros(2 * _N)
+        self.by_depth: list[array] = []  # depth of the containing directory; 0 = root
+        self._top: list[tuple[int, str]] = []  # min-heap of (flagged, relativePath)
+
+    def merge(self, counts: DirCounts, depth: int, rel_dir: str) -> None:
+        """Fold one directory's counts in. Caller holds the walk lock."""
+        while len(self.by_depth) <= depth:
+            self.by_depth.append(_zeros(_N))
+        row = self.by_depth[depth]
+        src = counts.by_type
+        for i in range(_N):
+            row[i] += src[i] + src[_N + i]
+        for i in range(2 * _N):
+            self.by_type[i] += src[i]
+        if self.top_n > 0:
+            item = (counts.flagged, rel_dir)
+            if len(self._top) < self.top_n:
+                heapq.heappush(self._top, item)
+            elif item > self._top[0]:
+                heapq.heapreplace(self._top, item)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Compact form: arrays are indexed like hazardCodes."""
+        files = list(self.by_type[:_N])
+        dirs = list(self.by_type[_N:])
+        return {
+            "hazardCodes": list(HAZARD_CODES),
+            "byCode": [f + d for f, d in zip(files, dirs)],
+            "byEntryType": {"file": files, "dir": dirs},
+            "byDepth": [list(row) for row in self.by_depth],
+            "topDirectories": [
+                {"relativePath": rel, "flagged": n}
+                for n, rel in sorted(self._top, key=lambda t: (-t[0], t[1]))
+            ],
+        }
@@ -1,4 +1,4 @@
-"""HMAC-SHA256 confirm tokens with bindings + TTL."""
+"""HMAC-SHA256 confirm and continuation tokens with bindings + TTL."""
 
 from __future__ import annotations
 
@@ -7,6 +7,7 @@ import hashlib
 import hmac
 import json
 import time
+import zlib
 from typing import Any
 
 
@@ -19,10 +20,7 @@ def make_confirm_token(payload: dict[str, Any], secret: bytes) -> str:
     so it can never collide with encoded content.
     """
     body = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
-    sig = hmac.new(secret, body, hashlib.sha256).digest()
-    body_b64 = base64.urlsafe_b64encode(body).decode("ascii")
-    sig_b64 = base64.urlsafe_b64encode(sig).decode("ascii")
-    return f"{body_b64}.{sig_b64}"
+    return _sign(body, secret)
 
 
 def verify_confirm_token(token: str, secret: bytes) -> dict[str, Any]:
@@ -31,6 +29,52 @@ def verify_confirm_token(token: str, secret: bytes) -> dict[str, Any]:
     Raises ValueError if signature is invalid.
     Raises TimeoutError if token is expired.
     """
+    body = _unsign(token, secret)
+    payload: dict[str, Any] = json.loads(body.decode("utf-8"))
+
+    if time.time() > payload.get("exp", 0):
+        raise TimeoutError("Token has expired")
+
+    return payload
+
+
+def make_continuation_token(payload: dict[str, Any], secret: bytes) -> str:
+    """Create an HMAC-signed, zlib-compressed scan continuation token.
+
+    Same format and 'exp' rule as confirm tokens, but the body is
+    compressed because it carries a directory frontier that can be large.
+    """
+    body = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return _sign(zlib.compress(body), secret)
+
+
+def verify_continuation_token(token: str, secret: bytes) -> dict[str, Any]:
+    """Verify and decode a continuation token.
+
+    Raises ValueError if signature or body is invalid.
+    Raises TimeoutError if token is expired.
+    """
+    body = _unsign(token, secret)
+    try:
+        payload: dict[str, Any] = json.loads(zlib.decompress(body).decode("utf-8"))
+    except (zlib.error, ValueError) as exc:
+        raise ValueError("Token body is not a valid continuation") from exc
+
+    if time.time() > payload.get("exp", 0):
+        raise TimeoutError("Token has expired")
+
+    return payload
+
+
+def _sign(body: bytes, secret: bytes) -> str:
+    sig = hmac.new(secret, body, hashlib.sha256).digest()
+    body_b64 = base64.urlsafe_b64encode(body).decode("ascii")
+    sig_b64 = base64.urlsafe_b64encode(sig).decode("ascii")
+    return f"{body_b64}.{sig_b64}"
+
+
+def _unsign(token: str, secret: bytes) -> bytes:
+    """Check the signature and return the raw body. Raises ValueError."""
     parts = token.split(".", 1)
     if len(parts) != 2:
         raise ValueError("Token has no signature separator")
@@ -51,9 +95,4 @@ def verify_confirm_token(token: str, secret: bytes) -> dict[str, Any]:
     if not hmac.compare_digest(sig, expected):
         raise ValueError("Token signature is invalid")
 
-    payload: dict[str, Any] = json.loads(body.decode("utf-8"))
-
-    if time.time() > payload.get("exp", 0):
-        raise TimeoutError("Token has expired")
-
-    return payload
+    return body
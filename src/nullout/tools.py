@@ -2,21 +2,49 @@
 
 from __future__ import annotations
 
+import errno
 import os
 import sys
 import time
 from typing import Any
 
-from nullout import __version__
-from nullout.config import Root, REPARSE_POLICY, TOKEN_TTL_SECONDS, STRATEGY_V1
+from nullout import __version__, audit, dirfd, retry, watch
+from nullout.api import Scanner
+from nullout.config import (
+    Root,
+    REPARSE_POLICY,
+    TOKEN_TTL_SECONDS,
+    CONTINUATION_TTL_SECONDS,
+    STRATEGY_V1,
+)
+from nullout.dirfd import EntryChangedError, PathEntry, open_entry
 from nullout.errors import err, ok
-from nullout.hazards import detect_hazards, parse_basename, has_trailing_dot_or_space
+from nullout.estimate import DEFAULT_MAX_PROBES, DEFAULT_TARGET_PRECISION
+from nullout.export import ExportWriter, export_file_name
 from nullout.models import Finding
+from nullout.projection import ResponseShape, project, response_shape
 from nullout.restart_manager import who_is_using
+from nullout.snapshot import SNAPSHOT_SUFFIX, write_snapshot
+from nullout.scanner import (
+    DEFAULT_MAX_DEPTH,
+    ScanBudget,
+    ScanOptions,
+    ScanResult,
+    layout_roots,
+)
 from nullout.store import Store
-from nullout.tokens import make_confirm_token, verify_confirm_token
-from nullout.win_identity import get_identity
-from nullout.win_paths import to_extended_path, is_under_root, is_reparse_point, safe_abspath
+from nullout.summary import DEFAULT_TOP_DIRECTORIES, HazardHistogram
+from nullout.trace import ScanTrace, trace_file_name
+from nullout.tokens import (
+    make_confirm_token,
+    verify_confirm_token,
+    make_continuation_token,
+    verify_continuation_token,
+)
+from nullout.watch import DEFAULT_MAX_CHANGES, DEFAULT_POLL_INTERVAL_MS, RootWatcher
+from nullout.win_paths import to_extended_path, safe_abspath
+
+DEFAULT_PAGE_SIZE = 1000  # get_scan_findings
 
 
 def handle_list_allowed_roots(
@@ -31,6 +59,9 @@ def handle_list_allowed_roots(
                 "displayName": r.display_name,
                 "path": r.path,
                 "canonicalPath": to_extended_path(r.path),
+                "excludes": list(r.excludes),
+                "maxDepth": _root_max_depth(r),
+                "maxWorkersPerDevice": r.max_workers_per_device,
                 "reparsePolicy": REPARSE_POLICY,
             }
             for r in roots.values()
@@ -42,96 +73,432 @@ def handle_scan_reserved_names(
     args: dict[str, Any],
     roots: dict[str, Root],
     store: Store,
+    token_secret: bytes,
 ) -> dict[str, Any]:
-    """Scan an allowlisted root for reserved-name / Win32-hostile entries."""
+    """Scan an allowlisted root for reserved-name / Win32-hostile entries.
+
+    With timeBudgetMs / maxVisited / maxFindings the scan may stop early and
+    return a continuationToken for resume_scan. mode="summary" returns hazard
+    histograms instead of findings; mode="estimate" samples random directory
+    paths and returns estimated counts with confidence intervals
+    (nullout.estimate). An export object streams findings to a file like
+    export_scan. fields / format="columnar" shape the findings
+    (nullout.projection). trace=true adds per-phase timings (nullout.trace).
+    """
     root_id = args["rootId"]
-    recursive = args["recursive"]
-    max_depth = args.get("maxDepth", 50)
-    include_dirs = args["includeDirs"]
+    mode = args.get("mode", "full")
 
     if root_id not in roots:
         return err("E_ROOT_NOT_ALLOWED", "Unknown or not allowlisted root.", {"rootId": root_id})
 
+    try:
+        shape = response_shape(args)
+    except ValueError as e:
+        return _shape_error(e, args)
+
+    budget = _scan_budget(args)
+    if mode == "summary" and budget is not None:
+        return err(
+            "E_INVALID_REQUEST",
+            "Summary scans cannot be budgeted or resumed.",
+            {"mode": mode},
+        )
+    if mode == "estimate" and (args.get("maxVisited") is not None or args.get("maxFindings") is not None):
+        return err(
+            "E_INVALID_REQUEST",
+            "Estimate scans take timeBudgetMs, maxProbes and targetPrecision, not maxVisited or maxFindings.",
+            {"mode": mode},
+        )
+
+    if "export" in args:
+        if mode in ("summary", "estimate"):
+            return err("E_INVALID_REQUEST", f"{mode.capitalize()} scans have no findings to export.", {"mode": mode})
+        export_args = {k: v for k, v in args.items() if k not in ("export", "fields", "format")}
+        return handle_export_scan({**export_args, **args["export"]}, roots, store)
+
     root = roots[root_id]
-    root_abs = os.path.abspath(root.path)
-    scan_id = store.new_id("scan")
+    opts = _scan_options(args, root)
 
-    findings: list[dict[str, Any]] = []
-    skipped_reparse = 0
-    visited = 0
+    if mode == "estimate":
+        start = time.time()
+        est = Scanner(store).estimate(
+            root, opts,
+            target_precision=args.get("targetPrecision", DEFAULT_TARGET_PRECISION),
+            time_budget_ms=args.get("timeBudgetMs"),
+            max_probes=args.get("maxProbes", DEFAULT_MAX_PROBES),
+            workers=_workers(args, root),
+            top_n=args.get("topDirectories", DEFAULT_TOP_DIRECTORIES),
+        )
+        return ok({
+            "rootId": root_id,
+            "mode": "estimate",
+            "estimate": est.to_dict(),
+            "stats": {
+                "directoriesListed": est.listed,
+                "entriesListed": est.entries_listed,
+                "durationMs": int((time.time() - start) * 1000),
+            },
+        })
 
-    def walk(current: str, depth: int) -> None:
-        nonlocal skipped_reparse, visited
-        if depth > max_depth:
-            return
-        try:
-            # Use extended path for scandir — Win32 normalizes trailing
-            # dots/spaces which makes hazardous directories inaccessible.
-            scan_path = to_extended_path(current)
-            with os.scandir(scan_path) as it:
-                for entry in it:
-                    visited += 1
-                    # Build regular path from parent + entry name to preserve
-                    # trailing chars that os.path.join might normalize.
-                    full = current + os.sep + entry.name
-                    name = entry.name
-                    is_dir = entry.is_dir(follow_symlinks=False)
-
-                    # deny_all: detect reparse points, don't traverse
-                    if is_reparse_point(full):
-                        skipped_reparse += 1
-                        hazards = detect_hazards(name, len(to_extended_path(full)), is_reparse=True)
-                        vol, fid = _safe_get_identity(full)
-                        f = _make_finding(root_id, scan_id, root_abs, full, entry, hazards, vol, fid)
-                        store.put_finding(f)
-                        findings.append(f.to_dict())
-                        continue
-
-                    # Skip non-directory entries if includeDirs=False and it's a dir
-                    if is_dir and not include_dirs:
-                        if recursive:
-                            walk(full, depth + 1)
-                        continue
-
-                    hazards = detect_hazards(name, len(to_extended_path(full)), is_reparse=False)
-
-                    if hazards:
-                        vol, fid = _safe_get_identity(full)
-                        f = _make_finding(root_id, scan_id, root_abs, full, entry, hazards, vol, fid)
-                        store.put_finding(f)
-                        findings.append(f.to_dict())
-
-                    if recursive and is_dir:
-                        walk(full, depth + 1)
-        except PermissionError:
-            pass  # non-fatal: skip inaccessible directories
+    trace = _scan_trace(args)
+    if mode == "summary":
+        result, lanes = Scanner(store).scan(
+            root, opts,
+            workers_per_device=_workers(args, root),
+            summary=HazardHistogram(args.get("topDirectories", DEFAULT_TOP_DIRECTORIES)),
+            trace=trace,
+        )
+        return ok({
+            "scanId": result.scan_id,
+            "rootId": root_id,
+            "mode": "summary",
+            "summary": result.summary.to_dict(),
+            "stats": {**result.stats.to_dict(), "lanes": lanes, **_trace_stats(trace, result.scan_id)},
+        })
+
+    result, lanes = Scanner(store).scan(
+        root, opts,
+        workers_per_device=_workers(args, root),
+        budget=budget,
+        trace=trace,
+    )
+    return _scan_response(result, opts, lanes, token_secret, shape, trace)
+
+
+def handle_resume_scan(
+    args: dict[str, Any],
+    roots: dict[str, Root],
+    store: Store,
+    token_secret: bytes,
+) -> dict[str, Any]:
+    """Continue a budget-limited scan from its continuationToken.
 
-    walk(root_abs, 0)
-    finding_ids = [f["findingId"] for f in findings]
-    store.register_scan(scan_id, finding_ids)
+    Only directories left on the frontier are enumerated, so resuming until
+    no token is returned covers the root exactly once under the same scanId.
+    """
+    try:
+        shape = response_shape(args)
+    except ValueError as e:
+        return _shape_error(e, args)
+
+    try:
+        payload = verify_continuation_token(args["continuationToken"], token_secret)
+    except TimeoutError:
+        return err("E_CONTINUATION_TOKEN_EXPIRED", "Continuation token expired; rescan the root.", {})
+    except ValueError:
+        return err("E_CONTINUATION_TOKEN_INVALID", "Continuation token invalid.", {})
+
+    root_id = payload.get("rootId")
+    if payload.get("kind") != "scan_continuation" or root_id not in roots:
+        return err("E_ROOT_NOT_ALLOWED", "Unknown or not allowlisted root.", {"rootId": root_id})
+
+    opts = ScanOptions(
+        recursive=payload["recursive"],
+        include_dirs=payload["includeDirs"],
+        max_depth=payload["maxDepth"],
+        excludes=tuple(payload.get("exclude", ())),
+        collapse_long_paths=payload.get("collapseLongPaths", False),
+        prioritize=payload.get("prioritize", False),
+    )
+    frontier = [(rel, depth) for rel, depth in payload["frontier"]]
+    trace = _scan_trace(args)
+    result, lanes = Scanner(store).scan(
+        roots[root_id], opts, payload["scanId"],
+        workers_per_device=_workers(args, roots[root_id]),
+        budget=_scan_budget(args),
+        frontier=frontier,
+        trace=trace,
+    )
+    return _scan_response(result, opts, lanes, token_secret, shape, trace)
+
+
+def handle_scan_all_roots(
+    args: dict[str, Any],
+    roots: dict[str, Root],
+    store: Store,
+) -> dict[str, Any]:
+    """Scan every allowlisted root concurrently on per-device I/O lanes.
+
+    Nested roots are walked once and their findings attributed to the
+    innermost root; roots configured twice are scanned under the first rootId.
+    Each root keeps its configured maxDepth and maxWorkersPerDevice unless
+    the request sets them.
+    """
+    try:
+        shape = response_shape(args)
+    except ValueError as e:
+        return _shape_error(e, args)
+
+    roots = dict(roots.items())  # one set of roots for options, layout and walks, across a reload
+    opts = _scan_options(args)
+    root_opts = {root_id: _scan_options(args, root) for root_id, root in roots.items()}
+    trace = _scan_trace(args)
+    start = time.time()
+    results, layout, lanes = Scanner(store).scan_all(
+        roots, opts, workers_per_device=args.get("maxWorkersPerDevice"), trace=trace, root_opts=root_opts,
+    )
+    dur_ms = int((time.time() - start) * 1000)
+    shape_findings = shape.shape if trace is None else trace.timed("serialize", shape.shape)
+
+    totals = {
+        "visited": 0, "flagged": 0, "skippedReparsePoints": 0, "prunedDirectories": 0, "spilledFindings": 0,
+    }
+    scans: list[dict[str, Any]] = []
+    for result in results:
+        stats = result.stats.to_dict()
+        for key in totals:
+            totals[key] += stats[key]
+        scans.append({
+            "scanId": result.scan_id,
+            "rootId": result.root_id,
+            "findings": shape_findings(result.findings),
+            "stats": stats,
+            "nestedRoots": result.pruned_roots,
+        })
+
+    return ok({
+        "scans": scans,
+        "duplicateRoots": [
+            {"rootId": root_id, "scannedAs": canonical_id}
+            for root_id, canonical_id in layout.duplicates.items()
+        ],
+        "stats": {
+            "roots": len(scans), **totals, "durationMs": dur_ms, "lanes": lanes,
+            **_trace_stats(trace, "all_roots"),
+        },
+    })
+
+
+def handle_export_scan(
+    args: dict[str, Any],
+    roots: dict[str, Root],
+    store: Store,
+) -> dict[str, Any]:
+    """Scan a root and stream its findings to an NDJSON or CSV file.
+
+    Rows are written by a background writer while the walk runs; the
+    response carries only the file path, row count and SHA-256 checksum.
+    Findings are still registered in the store, so exported findingIds
+    can be planned and deleted as usual.
+    """
+    root_id = args["rootId"]
+    if root_id not in roots:
+        return err("E_ROOT_NOT_ALLOWED", "Unknown or not allowlisted root.", {"rootId": root_id})
+
+    if _scan_budget(args) is not None:
+        return err("E_INVALID_REQUEST", "Exports cannot be budgeted or resumed.", {})
+
+    export_dir = export_dir_ref
+    if export_dir is None:
+        return err(
+            "E_EXPORT_NOT_CONFIGURED",
+            "Exports are disabled; set NULLOUT_EXPORT_DIR to an existing directory.",
+            {},
+        )
+
+    fmt = args.get("format", "ndjson")
+    use_gzip = args.get("gzip", False)
+    scan_id = store.new_id("scan")
+    try:
+        name = export_file_name(scan_id, fmt, use_gzip, args.get("fileName"))
+        writer = ExportWriter(os.path.join(export_dir, name), fmt, use_gzip)
+    except ValueError as e:
+        return err("E_INVALID_REQUEST", str(e), {"format": fmt, "fileName": args.get("fileName")})
+
+    trace = _scan_trace(args)
+    try:
+        result, lanes = Scanner(store).scan(
+            roots[root_id], _scan_options(args, roots[root_id]), scan_id,
+            workers_per_device=_workers(args, roots[root_id]),
+            sink=writer.write,
+            trace=trace,
+        )
+    except BaseException:
+        writer.abort()
+        raise
+
+    try:
+        writer.close()
+    except OSError as e:
+        return err(
+            "E_IO_ERROR",
+            "Failed to write export file.",
+            {"path": writer.path, "errno": e.errno},
+        )
 
     return ok({
         "scanId": scan_id,
         "rootId": root_id,
-        "findings": findings,
-        "stats": {
-            "visited": visited,
-            "flagged": len(findings),
-            "skippedReparsePoints": skipped_reparse,
+        "export": {
+            "path": writer.path,
+            "format": fmt,
+            "gzip": use_gzip,
+            "rows": writer.rows,
+            "sha256": writer.checksum,
         },
+        "stats": {**result.stats.to_dict(), "lanes": lanes, **_trace_stats(trace, scan_id)},
     })
 
 
+def handle_save_snapshot(
+    args: dict[str, Any],
+    roots: dict[str, Root],
+    store: Store,
+) -> dict[str, Any]:
+    """Write a scan's findings to a memory-mappable columnar snapshot.
+
+    The snapshot is written to NULLOUT_SNAPSHOT_DIR as <scanId>.nosnap and
+    mapped straight away, so it is served again after a server restart.
+    Saving a scan again unmaps its old snapshot before the file is replaced.
+    """
+    scan_id = args["scanId"]
+    snapshot_dir = snapshot_dir_ref
+    if snapshot_dir is None:
+        return err(
+            "E_SNAPSHOT_NOT_CONFIGURED",
+            "Snapshots are disabled; set NULLOUT_SNAPSHOT_DIR to an existing directory.",
+            {},
+        )
+
+    findings = [f for f in map(store.get_finding, store.get_scan_findings(scan_id)) if f is not None]
+    if not findings:
+        return err("E_NOT_FOUND", "Scan not found or has no findings.", {"scanId": scan_id})
+    root_id = findings[0].rootId
+    if root_id not in roots:
+        return err("E_ROOT_NOT_ALLOWED", "Unknown or not allowlisted root.", {"rootId": root_id})
+
+    path = os.path.join(snapshot_dir, scan_id + SNAPSHOT_SUFFIX)
+    store.close_snapshot(scan_id)  # findings are in memory now; the old mapping must not outlive its file
+    try:
+        info = write_snapshot(path, scan_id, root_id, roots[root_id].abs_path, findings)
+        store.open_snapshot(path)
+    except OSError as e:
+        return err("E_IO_ERROR", "Failed to write snapshot file.", {"path": path, "errno": e.errno})
+
+    return ok({"scanId": scan_id, "rootId": root_id, "snapshot": info})
+
+
 def handle_get_finding(
     args: dict[str, Any],
     store: Store,
 ) -> dict[str, Any]:
-    """Return full details for a finding by ID."""
+    """Return details for a finding by ID, all of them unless fields is given."""
+    try:
+        shape = response_shape(args)
+    except ValueError as e:
+        return _shape_error(e, args)
+    finding_id = args["findingId"]
+    finding = store.get_finding(finding_id)
+    if not finding:
+        return err("E_NOT_FOUND", "Finding not found.", {"findingId": finding_id})
+    if shape.fields is None:
+        return ok({"finding": finding.to_dict()})
+    return ok({"finding": project(finding.to_dict(), shape.fields)})
+
+
+def handle_get_scan_findings(
+    args: dict[str, Any],
+    store: Store,
+) -> dict[str, Any]:
+    """Return one page of a scan's findings, in the order they were recorded.
+
+    Spilled and snapshot findings are read back one at a time, so a page
+    costs memory in proportion to limit, not to the scan.
+    """
+    try:
+        shape = response_shape(args)
+    except ValueError as e:
+        return _shape_error(e, args)
+    scan_id = args["scanId"]
+    finding_ids = store.get_scan_findings(scan_id)
+    if not finding_ids:
+        return err("E_NOT_FOUND", "Scan not found or has no findings.", {"scanId": scan_id})
+
+    offset = args.get("offset", 0)
+    limit = args.get("limit", DEFAULT_PAGE_SIZE)
+    page = finding_ids[offset:offset + limit]
+    findings = [f.to_dict() for f in map(store.get_finding, page) if f is not None]
+    end = offset + len(page)
+    return ok({
+        "scanId": scan_id,
+        "total": len(finding_ids),
+        "offset": offset,
+        "findings": shape.shape(findings),
+        "nextOffset": end if end < len(finding_ids) else None,
+    })
+
+
+def handle_expand_finding(
+    args: dict[str, Any],
+    roots: dict[str, Root],
+    store: Store,
+    token_secret: bytes,
+) -> dict[str, Any]:
+    """Drill into an aggregate (collapsed long-path) finding.
+
+    Walks the aggregate's subtree with the original scan options, capturing
+    identity and registering a normal finding per flagged descendant under
+    the same scanId. Accepts the same budgets and response shaping as
+    scan_reserved_names. Nested roots that the aggregate's scan_all_roots
+    walk left out stay out. An aggregate is expanded once; a budgeted
+    expansion continues with resume_scan.
+    """
+    try:
+        shape = response_shape(args)
+    except ValueError as e:
+        return _shape_error(e, args)
+
     finding_id = args["findingId"]
     finding = store.get_finding(finding_id)
     if not finding:
         return err("E_NOT_FOUND", "Finding not found.", {"findingId": finding_id})
-    return ok({"finding": finding.to_dict()})
+
+    aggregate = finding.evidence.get("aggregate")
+    if not aggregate:
+        return err(
+            "E_INVALID_REQUEST",
+            "Finding is not an aggregate; nothing to expand.",
+            {"findingId": finding_id},
+        )
+
+    root = roots.get(finding.rootId)
+    if not root:
+        return err("E_ROOT_NOT_ALLOWED", "Root not allowlisted.", {"rootId": finding.rootId})
+
+    target_abs = safe_abspath(finding.observedPath)
+    if not root.contains(target_abs):
+        return err(
+            "E_TRAVERSAL_REJECTED",
+            "Target escapes allowlisted root.",
+            {"target": target_abs, "root": root.abs_path},
+        )
+
+    if not store.mark_expanded(finding_id):
+        return err(
+            "E_INVALID_REQUEST",
+            "Aggregate was already expanded; its findings are in the scan.",
+            {"findingId": finding_id, "scanId": finding.scanId},
+        )
+
+    prune = None
+    if aggregate.get("nestedRootsPruned"):
+        prune = layout_roots(dict(roots.items())).prune.get(finding.rootId)
+    opts = ScanOptions(
+        recursive=True,
+        include_dirs=aggregate["includeDirs"],
+        max_depth=aggregate["maxDepth"],
+        excludes=tuple(aggregate["excludes"]),
+    )
+    trace = _scan_trace(args)
+    result, lanes = Scanner(store).scan(
+        root, opts, finding.scanId,
+        prune=prune,
+        workers_per_device=_workers(args, root),
+        budget=_scan_budget(args),
+        frontier=[(finding.relativePath, aggregate["depth"])],
+        trace=trace,
+    )
+    return _scan_response(result, opts, lanes, token_secret, shape, trace)
 
 
 def handle_plan_cleanup(
@@ -164,6 +531,7 @@ def handle_plan_cleanup(
             "fileId": identity.get("fileId"),
             "strategy": STRATEGY_V1,
             "reparsePolicy": REPARSE_POLICY,
+            "planId": plan_id,
             "exp": exp,
         }
         ctok = make_confirm_token(token_payload, token_secret)
@@ -183,9 +551,14 @@ def handle_plan_cleanup(
             ],
         })
 
+    expires = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(exp))
+    audit.record(
+        "plan", planId=plan_id, expiresUtc=expires,
+        entries=[{"findingId": e["findingId"], **e["bindings"]} for e in entries],
+    )
     return ok({
         "planId": plan_id,
-        "expiresUtc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(exp)),
+        "expiresUtc": expires,
         "entries": entries,
     })
 
@@ -205,6 +578,11 @@ def handle_delete_entry(
     4. Re-check identity (TOCTOU)
     5. If directory: ensure empty
     6. Delete using extended namespace
+
+    Steps 3-6 run against one open target (see open_entry): a single
+    Win32 handle, or a pinned parent directory descriptor elsewhere.
+    With deferOnInUse, E_IN_USE parks the entry in the retry queue
+    (nullout.retry), which repeats steps 2-6 until the delete goes through.
     """
     finding_id = args["findingId"]
     token = args["confirmToken"]
@@ -241,22 +619,99 @@ def handle_delete_entry(
                 {"findingId": finding_id},
             )
 
+    plan_id = payload.get("planId")
+    result = _journaled_delete(finding, roots, plan_id)
+    if args.get("deferOnInUse") and not result["ok"] and result["error"]["code"] == "E_IN_USE":
+        pending = retry.queue_ref.add(
+            finding_id,
+            result["error"]["details"]["target"],
+            lambda: _retry_delete(finding_id, roots, store, plan_id),
+            result["error"],
+        )
+        return ok({
+            "findingId": finding_id,
+            "deleted": False,
+            "deferred": True,
+            "pending": pending.to_dict(),
+        })
+    return result
+
+
+def _retry_delete(
+    finding_id: str, roots: dict[str, Root], store: Store, plan_id: str | None,
+) -> dict[str, Any]:
+    """One retry-queue attempt: steps 2-6 against the current roots."""
+    finding = store.get_finding(finding_id)
+    if not finding:
+        return err("E_NOT_FOUND", "Finding not found.", {"findingId": finding_id})
+    return _journaled_delete(finding, roots, plan_id, is_retry=True)
+
+
+def _journaled_delete(
+    finding: Finding, roots: dict[str, Root], plan_id: str | None, is_retry: bool = False,
+) -> dict[str, Any]:
+    """_confined_delete between an audit intent and outcome record.
+
+    The target is not touched until the intent is on disk.
+    """
+    identity = finding.evidence.get("identity", {})
+    if audit.record_committed(
+        "delete_intent", planId=plan_id, findingId=finding.findingId, rootId=finding.rootId,
+        scanId=finding.scanId, target=finding.observedPath, entryType=finding.entryType,
+        volumeSerial=identity.get("volumeSerial"), fileId=identity.get("fileId"), retry=is_retry,
+    ):
+        result = _confined_delete(finding, roots)
+    else:
+        result = err(
+            "E_IO_ERROR",
+            "Audit journal did not commit the delete intent; target left untouched.",
+            {"findingId": finding.findingId},
+        )
+    audit.record(
+        "delete_outcome", planId=plan_id, findingId=finding.findingId, ok=result["ok"],
+        code=None if result["ok"] else result["error"]["code"],
+    )
+    return result
+
+
+def _confined_delete(finding: Finding, roots: dict[str, Root]) -> dict[str, Any]:
+    """Steps 2-6 of delete_entry for a finding whose token was verified."""
+    finding_id = finding.findingId
+    identity = finding.evidence.get("identity", {})
+
     # --- 2. Root confinement ---
     root = roots.get(finding.rootId)
     if not root:
         return err("E_ROOT_NOT_ALLOWED", "Root not allowlisted.", {"rootId": finding.rootId})
 
     target_abs = safe_abspath(finding.observedPath)
-    root_abs = os.path.abspath(root.path)  # Root paths never have trailing dots/spaces
-    if not is_under_root(target_abs, root_abs):
+    if not root.contains(target_abs):
         return err(
             "E_TRAVERSAL_REJECTED",
             "Target escapes allowlisted root.",
-            {"target": target_abs, "root": root_abs},
+            {"target": target_abs, "root": root.abs_path},
         )
 
+    # Open the target once; steps 3-6 all read from and act on that open
+    try:
+        target = open_entry(target_abs, dirfd.limiter_ref, finding.entryType == "dir")
+    except FileNotFoundError:
+        return err("E_NOT_FOUND", "Target no longer exists.", {"target": target_abs})
+    except OSError as e:
+        return _delete_error(e, finding_id, target_abs)
+    try:
+        return _verify_and_delete(finding, target, identity)
+    finally:
+        target.close()
+
+
+def _verify_and_delete(finding: Finding, target: PathEntry, identity: dict[str, Any]) -> dict[str, Any]:
+    """Steps 3-6 of delete_entry against an already-confined target."""
+    finding_id = finding.findingId
+    target_abs = target.path
+
     # --- 3. deny_all reparse policy ---
-    if is_reparse_point(target_abs):
+    if target.is_reparse():
         return err(
             "E_REPARSE_POLICY_BLOCKED",
             "Reparse points are blocked by policy (deny_all).",
@@ -265,7 +720,7 @@ def handle_delete_entry(
 
     # --- 4. Re-check identity (TOCTOU) ---
     try:
-        vol_now, fid_now = get_identity(target_abs)
+        vol_now, fid_now = target.identity()
     except FileNotFoundError:
         return err("E_NOT_FOUND", "Target no longer exists.", {"target": target_abs})
     except OSError as e:
@@ -289,64 +744,31 @@ def handle_delete_entry(
     # --- 5. Empty-only directory rule ---
     if finding.entryType == "dir":
         try:
-            with os.scandir(to_extended_path(target_abs)) as it:
-                if any(True for _ in it):
-                    return err(
-                        "E_DIR_NOT_EMPTY",
-                        "Directory is not empty; v1 only deletes empty directories.",
-                        {"target": target_abs},
-                    )
+            if not target.is_empty_dir():
+                return err(
+                    "E_DIR_NOT_EMPTY",
+                    "Directory is not empty; v1 only deletes empty directories.",
+                    {"target": target_abs},
+                )
         except PermissionError:
             return err(
                 "E_ACCESS_DENIED",
                 "Access denied while checking directory contents.",
                 {"target": target_abs},
             )
+        except EntryChangedError:
+            return err(
+                "E_CHANGED_SINCE_SCAN",
+                "Target changed since scan (replaced during verification).",
+                {"target": target_abs, "expected": identity},
+            )
 
-    # --- 6. Delete using extended namespace ---
-    ext_path = to_extended_path(target_abs)
+    # --- 6. Delete using extended namespace (or relative to the parent fd) ---
     start = time.time()
     try:
-        if finding.entryType == "dir":
-            os.rmdir(ext_path)
-        else:
-            os.remove(ext_path)
-    except PermissionError:
-        return err(
-            "E_ACCESS_DENIED",
-            "Access denied while deleting target.",
-            {"target": target_abs, "strategy": STRATEGY_V1},
-        )
+        target.remove(finding.entryType == "dir")
     except OSError as e:
-        win_err = getattr(e, "winerror", None)
-        if win_err == 32:
-            return err(
-                "E_IN_USE",
-                "Target is in use by another process.",
-                {"target": target_abs, "strategy": STRATEGY_V1, "win32LastError": 32},
-                next_steps=[{
-                    "action": "WHO_IS_USING",
-                    "tool": "who_is_using",
-                    "args": {"findingId": finding_id},
-                }],
-            )
-        if win_err in (23, 1117, 1392):
-            return err(
-                "E_IO_ERROR",
-                "I/O error or corruption suspected.",
-                {"target": target_abs, "win32LastError": win_err},
-            )
-        if win_err == 145:  # ERROR_DIR_NOT_EMPTY
-            return err(
-                "E_DIR_NOT_EMPTY",
-                "Directory is not empty.",
-                {"target": target_abs, "win32LastError": 145},
-            )
-        return err(
-            "E_INTERNAL",
-            "Delete failed.",
-            {"target": target_abs, "win32LastError": win_err, "errno": e.errno},
-        )
+        return _delete_error(e, finding_id, target_abs)
 
     dur_ms = int((time.time() - start) * 1000)
     return ok({
@@ -354,11 +776,150 @@ def handle_delete_entry(
         "deleted": True,
         "strategy": STRATEGY_V1,
         "entryType": finding.entryType,
-        "telemetry": {"durationMs": dur_ms, "usedExtendedNamespace": True},
+        "telemetry": {
+            "durationMs": dur_ms,
+            "usedExtendedNamespace": not target.relative_to_dir_fd,
+            "relativeToDirFd": target.relative_to_dir_fd,
+            "singleHandle": target.single_handle,
+        },
         "warnings": [],
     })
 
 
+def _delete_error(e: OSError, finding_id: str, target_abs: str) -> dict[str, Any]:
+    """Map an open or delete failure onto the delete error codes."""
+    if isinstance(e, PermissionError):
+        return err(
+            "E_ACCESS_DENIED",
+            "Access denied while deleting target.",
+            {"target": target_abs, "strategy": STRATEGY_V1},
+        )
+    win_err = getattr(e, "winerror", None)
+    if win_err == 32:
+        return err(
+            "E_IN_USE",
+            "Target is in use by another process.",
+            {"target": target_abs, "strategy": STRATEGY_V1, "win32LastError": 32},
+            next_steps=[{
+                "action": "WHO_IS_USING",
+                "tool": "who_is_using",
+                "args": {"findingId": finding_id},
+            }],
+        )
+    if win_err in (23, 1117, 1392):
+        return err(
+            "E_IO_ERROR",
+            "I/O error or corruption suspected.",
+            {"target": target_abs, "win32LastError": win_err},
+        )
+    if win_err == 145 or (win_err is None and e.errno == errno.ENOTEMPTY):  # ERROR_DIR_NOT_EMPTY
+        return err(
+            "E_DIR_NOT_EMPTY",
+            "Directory is not empty.",
+            {"target": target_abs, "win32LastError": win_err},
+        )
+    return err(
+        "E_INTERNAL",
+        "Delete failed.",
+        {"target": target_abs, "win32LastError": win_err, "errno": e.errno},
+    )
+
+
+def handle_watch_root(
+    args: dict[str, Any],
+    roots: dict[str, Root],
+    store: Store,
+) -> dict[str, Any]:
+    """Start (or with stop=true, stop) a background watcher for a root.
+
+    The first call walks the root and returns its findings under a new
+    scanId; afterwards only changed directories are re-listed and the
+    differences are reported by get_watch_changes. Calling it again for a
+    watched root returns the current live findings.
+    """
+    root_id = args["rootId"]
+    if root_id not in roots:
+        return err("E_ROOT_NOT_ALLOWED", "Unknown or not allowlisted root.", {"rootId": root_id})
+
+    registry = watch.registry_ref
+    if args.get("stop", False):
+        return ok({"rootId": root_id, "stopped": registry.stop(root_id)})
+
+    try:
+        shape = response_shape(args)
+    except ValueError as e:
+        return _shape_error(e, args)
+
+    def make() -> RootWatcher:
+        opts = ScanOptions(
+            recursive=args.get("recursive", True),
+            include_dirs=args.get("includeDirs", False),
+            max_depth=args.get("maxDepth", _root_max_depth(roots[root_id])),
+            excludes=tuple(args.get("exclude", ())),
+        )
+        return RootWatcher(
+            roots[root_id], store.new_id("scan"), opts, store, registry,
+            poll_interval_ms=args.get("pollIntervalMs", DEFAULT_POLL_INTERVAL_MS),
+        )
+
+    watcher, findings = registry.watch(root_id, make)
+
+    return ok({
+        **watcher.info(),
+        "latestSeq": registry.latest_seq,
+        "findings": shape.shape(findings),
+    })
+
+
+def handle_get_watch_changes(
+    args: dict[str, Any],
+) -> dict[str, Any]:
+    """Return findings added and removed by watchers since sinceSeq.
+
+    Pass the returned nextSeq as sinceSeq on the next call. truncated means
+    changes after sinceSeq have already left the bounded log.
+    """
+    try:
+        shape = response_shape(args)
+    except ValueError as e:
+        return _shape_error(e, args)
+
+    registry = watch.registry_ref
+    since = args["sinceSeq"]
+    limit = args.get("maxChanges", DEFAULT_MAX_CHANGES)
+    changes, truncated = registry.changes(since, args.get("rootId"), limit + 1)
+    more = len(changes) > limit
+    changes = changes[:limit]
+    if shape.fields is not None:
+        changes = [
+            {**c, "finding": project(c["finding"], shape.fields)} if "finding" in c else c
+            for c in changes
+        ]
+    return ok({
+        "changes": changes,
+        "nextSeq": changes[-1]["seq"] if changes else since,
+        "latestSeq": registry.latest_seq,
+        "more": more,
+        "truncated": truncated,
+        "watches": [w.info() for w in list(registry.watchers.values())],
+    })
+
+
+def handle_get_pending_deletions(
+    args: dict[str, Any],
+) -> dict[str, Any]:
+    """Status of deletions parked by delete_entry with deferOnInUse.
+
+    Entries are pending, deleted or failed (with the error that stopped
+    them); finished entries are kept for a while for the host to read.
+    """
+    queue = retry.queue_ref
+    return ok({
+        "deletions": queue.entries(args.get("findingIds"), args.get("status")),
+        "counts": queue.counts(),
+    })
+
+
 def handle_who_is_using(
     args: dict[str, Any],
     roots: dict[str, Root],
@@ -387,6 +948,7 @@ def handle_get_server_info(
         },
         "capabilities": {
             "restartManager": rm_available(),
+            "auditJournal": audit.journal_ref is not None,
         },
         "registryName": "nullout-mcp",
     })
@@ -395,79 +957,107 @@ def handle_get_server_info(
 # --- Internal helpers ---
 
 
-def _safe_get_identity(path: str) -> tuple[str | None, str | None]:
-    """Get file identity, returning (None, None) on failure."""
-    try:
-        return get_identity(path)
-    except Exception:
-        return None, None
-
-
-def _make_finding(
-    root_id: str,
-    scan_id: str,
-    root_abs: str,
-    full_path: str,
-    entry: os.DirEntry[str],
-    hazards: list[dict[str, Any]],
-    vol: str | None,
-    fid: str | None,
-) -> Finding:
-    """Build a Finding from scan data."""
-    # Don't use os.path.relpath — it normalizes trailing dots/spaces via abspath
-    rel = full_path[len(root_abs):].lstrip(os.sep)
-    name = os.path.basename(full_path)
-    base, ext = parse_basename(name)
-    entry_type = "dir" if entry.is_dir(follow_symlinks=False) else "file"
-    canonical = to_extended_path(full_path)
-
-    evidence = {
-        "fs": {
-            "existsAtScan": True,
-            "sizeBytes": _safe_size(entry, entry_type),
-            "attributes": [],
-            "isDirectory": entry_type == "dir",
-            "isReparsePoint": any(h["code"] == "REPARSE_POINT_PRESENT" for h in hazards),
-        },
-        "win32": {
-            "requiresExtendedPath": True,
-            "hasTrailingDotOrSpace": has_trailing_dot_or_space(name),
-            "exceedsMaxPathLegacy": len(canonical) > 260,
-            "isUncPath": full_path.startswith("\\\\"),
-            "isDevicePath": False,
-            "isAdsSuspected": ":" in name[2:] if len(name) > 2 else False,
-        },
-        "identity": {
-            "volumeSerial": vol,
-            "fileId": fid,
-            "fingerprintVersion": 1,
-        },
-    }
+def _scan_options(args: dict[str, Any], root: Root | None = None) -> ScanOptions:
+    """Build ScanOptions from scan tool args; root supplies the maxDepth default."""
+    return ScanOptions(
+        recursive=args["recursive"],
+        include_dirs=args["includeDirs"],
+        max_depth=args.get("maxDepth", _root_max_depth(root)),
+        excludes=tuple(args.get("exclude", ())),
+        collapse_long_paths=args.get("collapseLongPaths", False),
+        prioritize=args.get("prioritize", False),
+    )
+
+
+def _root_max_depth(root: Root | None) -> int:
+    if root is None or root.max_depth is None:
+        return DEFAULT_MAX_DEPTH
+    return root.max_depth
 
-    return Finding(
-        findingId=store_ref.new_id("fnd"),
-        rootId=root_id,
-        scanId=scan_id,
-        relativePath=rel,
-        observedPath=full_path,
-        canonicalPath=canonical,
-        entryType=entry_type,
-        name=name,
-        baseName=base,
-        extension=ext,
-        hazards=hazards,
-        evidence=evidence,
+
+def _workers(args: dict[str, Any], root: Root) -> int | None:
+    """maxWorkersPerDevice from the request, else the root's configured default."""
+    return args.get("maxWorkersPerDevice", root.max_workers_per_device)
+
+
+def _shape_error(e: ValueError, args: dict[str, Any]) -> dict[str, Any]:
+    return err("E_INVALID_REQUEST", str(e), {"fields": args.get("fields"), "format": args.get("format")})
+
+
+def _scan_budget(args: dict[str, Any]) -> ScanBudget | None:
+    """Build a ScanBudget from tool args, or None if no limit was requested."""
+    budget = ScanBudget(
+        time_budget_ms=args.get("timeBudgetMs"),
+        max_visited=args.get("maxVisited"),
+        max_findings=args.get("maxFindings"),
     )
+    return budget if budget != ScanBudget() else None
 
 
-def _safe_size(entry: os.DirEntry[str], entry_type: str) -> int | None:
-    """Get file size, returning None for directories or on failure."""
-    if entry_type == "dir":
-        return None
-    try:
-        return entry.stat(follow_symlinks=False).st_size
-    except Exception:
-        return None
+def _scan_trace(args: dict[str, Any]) -> ScanTrace | None:
+    """A ScanTrace when the request asks for trace or NULLOUT_TRACE=1, else None."""
+    if args.get("trace", False) or trace_all_ref:
+        return ScanTrace()
+    return None
+
+
+def _trace_stats(trace: ScanTrace | None, label: str) -> dict[str, Any]:
+    """phasesMs, plus the written trace file when NULLOUT_TRACE_DIR is set."""
+    if trace is None:
+        return {}
+    stats: dict[str, Any] = {"phasesMs": trace.phases_ms()}
+    trace_dir = trace_dir_ref
+    if trace_dir is not None:
+        path = os.path.join(trace_dir, trace_file_name(label))
+        try:
+            stats["trace"] = trace.write(path)
+        except OSError as e:
+            stats["trace"] = {"path": path, "errno": e.errno}
+    return stats
+
+
+def _scan_response(
+    result: ScanResult,
+    opts: ScanOptions,
+    lanes: list[dict[str, Any]],
+    token_secret: bytes,
+    shape: ResponseShape,
+    trace: ScanTrace | None = None,
+) -> dict[str, Any]:
+    """Shape a single-root scan result, adding a continuationToken if unfinished."""
+    shape_findings = shape.shape if trace is None else trace.timed("serialize", shape.shape)
+    findings = shape_findings(result.findings)
+    continuation = None
+    if result.frontier:
+        continuation = make_continuation_token({
+            "kind": "scan_continuation",
+            "rootId": result.root_id,
+            "scanId": result.scan_id,
+            "recursive": opts.recursive,
+            "includeDirs": opts.include_dirs,
+            "maxDepth": opts.max_depth,
+            "exclude": list(opts.excludes),
+            "collapseLongPaths": opts.collapse_long_paths,
+            "prioritize": opts.prioritize,
+            "frontier": result.frontier,
+            "exp": time.time() + CONTINUATION_TTL_SECONDS,
+        }, token_secret)
+
+    return ok({
+        "scanId": result.scan_id,
+        "rootId": result.root_id,
+        "findings": findings,
+        "stats": {
+            **result.stats.to_dict(),
+            "lanes": lanes,
+            "complete": not result.frontier,
+            "stopReason": result.stop_reason if result.frontier else None,
+            "pendingDirectories": len(result.frontier),
+            **({"memory": result.memory.to_dict()} if result.memory is not None else {}),
+            **_trace_stats(trace, result.scan_id),
+        },
+        "continuationToken": continuation,
+    })
 
 
 # Module-level store reference — set by server.py at startup
@@ -478,3 +1068,29 @@ def set_store(store: Store) -> None:
     """Set the module-level store reference. Called by server.py at init."""
     global store_ref
     store_ref = store
+
+
+# Module-level export, snapshot and trace settings — set by server.py at startup
+export_dir_ref: str | None = None  # NULLOUT_EXPORT_DIR
+snapshot_dir_ref: str | None = None  # NULLOUT_SNAPSHOT_DIR
+trace_all_ref: bool = False  # NULLOUT_TRACE=1
+trace_dir_ref: str | None = None  # NULLOUT_TRACE_DIR
+
+
+def set_export_dir(path: str | None) -> None:
+    """Set the export directory (None disables export_scan). Called by server.py at init."""
+    global export_dir_ref
+    export_dir_ref = path
+
+
+def set_snapshot_dir(path: str | None) -> None:
+    """Set the snapshot directory (None disables save_snapshot). Called by server.py at init."""
+    global snapshot_dir_ref
+    snapshot_dir_ref = path
+
+
+def set_trace_config(trace_all: bool, trace_dir: str | None) -> None:
+    """Set whether every scan is traced and where trace files go. Called by server.py at init."""
+    global trace_all_ref, trace_dir_ref
+    trace_all_ref = trace_all
+    trace_dir_ref = trace_dir
@@ -0,0 +1,148 @@
+"""Scan tracing: per-phase timings and Chrome/Perfetto trace-event output.
+
+A ScanTrace is handed to the walk only when tracing is on (trace: true on a
+scan, or NULLOUT_TRACE=1). The walk then swaps the functions it calls per
+entry for timed wrappers (timed, timed_iter); untraced scans call the plain
+functions and pay nothing but one None check per directory.
+
+Time is split into exclusive phases, per worker thread:
+  enumerate  scandir open and iteration
+  reparse    reparse-point checks that touch the filesystem (Win32 attributes)
+  classify   detect_hazards
+  identity   volume serial / file id capture
+  finding    Finding construction, to_dict, store registration or spill
+  collapse   counting an over-length subtree (collapseLongPaths)
+  walk       everything else inside a directory task (excludes, scheduling)
+  serialize  shaping the response findings (fields / columnar)
+
+Every directory becomes a complete ("X") event on its worker's thread; a
+single phase call of SPAN_MIN_US or longer (a slow identity open, say) gets
+its own event nested inside it. Load the written file in ui.perfetto.dev or
+chrome://tracing.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+PHASES = ("enumerate", "reparse", "classify", "identity", "finding", "collapse", "walk", "serialize")
+SPAN_MIN_US = 1000  # phase calls at least this long get their own event
+MAX_EVENTS = 500_000  # later events are counted, not kept
+
+
+class _ThreadState(threading.local):
+    def __init__(self) -> None:
+        self.totals: dict[str, int] | None = None  # phase -> exclusive ns
+        self.stack: list[int] = []  # child ns per open span, innermost last
+
+
+class ScanTrace:
+    """Trace events and phase totals for one scan call (any number of roots)."""
+
+    def __init__(self) -> None:
+        self._t0 = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._state = _ThreadState()
+        self._totals: list[dict[str, int]] = []  # one dict per thread that recorded anything
+        self._threads: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.events: list[dict[str, Any]] = []
+        self.dropped = 0
+
+    def _thread_totals(self) -> dict[str, int]:
+        totals = self._state.totals
+        if totals is None:
+            totals = self._state.totals = dict.fromkeys(PHASES, 0)
+            thread = threading.current_thread()
+            with self._lock:
+                self._totals.append(totals)
+                self._threads[thread.ident or 0] = thread.name
+        return totals
+
+    def _event(self, name: str, cat: str, start_ns: int, dur_ns: int, args: dict[str, Any] | None) -> None:
+        if len(self.events) >= MAX_EVENTS:
+            self.dropped += 1
+            return
+        event = {
+            "name": name, "cat": cat, "ph": "X", "pid": self._pid, "tid": threading.get_ident(),
+            "ts": (start_ns - self._t0) / 1000, "dur": dur_ns / 1000,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)  # list.append is atomic; workers share the list
+
+    # --- spans ---
+
+    def begin(self) -> int:
+        """Open a span on this thread; returns its start for end()."""
+        self._thread_totals()
+        self._state.stack.append(0)
+        return time.perf_counter_ns()
+
+    def end(self, phase: str, start_ns: int, name: str | None = None, cat: str = "phase",
+            args: dict[str, Any] | None = None, always: bool = False) -> None:
+        """Close the innermost span: add its exclusive time to phase, maybe emit an event."""
+        dur = time.perf_counter_ns() - start_ns
+        stack = self._state.stack
+        child = stack.pop()
+        self._state.totals[phase] += dur - child  # type: ignore[index]
+        if stack:
+            stack[-1] += dur
+        if always or dur >= SPAN_MIN_US * 1000:
+            self._event(name or phase, cat, start_ns, dur, args)
+
+    def timed(self, phase: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """fn, with each call's exclusive time added to phase."""
+        def call(*args: Any, **kwargs: Any) -> Any:
+            start = self.begin()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.end(phase, start)
+        return call
+
+    def timed_iter(self, phase: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Iterate, timing each step (not the loop body) as phase."""
+        it = iter(iterable)
+        while True:
+            start = self.begin()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.end(phase, start)
+                return
+            self.end(phase, start)
+            yield item
+
+    # --- results ---
+
+    def phases_ms(self) -> dict[str, float]:
+        with self._lock:
+            totals = list(self._totals)
+        return {p: round(sum(t[p] for t in totals) / 1e6, 3) for p in PHASES}
+
+    def to_chrome(self) -> dict[str, Any]:
+        """Trace-event JSON object, with thread names as metadata events."""
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in sorted(self._threads.items())
+        ]
+        return {
+            "traceEvents": meta + self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"phasesMs": self.phases_ms(), "droppedEvents": self.dropped},
+        }
+
+    def write(self, path: str) -> dict[str, Any]:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome(), f, separators=(",", ":"))
+        return {"path": path, "events": len(self.events), "droppedEvents": self.dropped}
+
+
+def trace_file_name(label: str) -> str:
+    """<scanId>-<epoch ms>.trace.json; resumed pages of one scan get one file each."""
+    return f"{label}-{time.time_ns() // 1_000_000}.trace.json"
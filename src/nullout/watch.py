@@ -0,0 +1,500 @@
+"""Watch mode: keep a root's findings live between scans.
+
+watch_root walks a root once, then a background thread per root notices
+directories whose contents changed and re-lists only those. Names that
+appeared (created or renamed in) are classified like a scan would; names
+that disappeared retire their findings. Both update the Store under the
+watch's scanId and are appended to a change log read by get_watch_changes.
+
+Change notification:
+- Linux: inotify, one watch per directory (IN_CREATE / IN_DELETE /
+  IN_MOVED_*). An event queue overflow re-lists every directory.
+- Elsewhere, and for directories inotify could not watch (e.g. the
+  max_user_watches limit): one stat per directory per poll interval,
+  re-listing those whose mtime changed.
+
+Watches use the scan rules (deny_all, maxDepth, includeDirs, excludes)
+but not collapseLongPaths or nested-root pruning.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import itertools
+import os
+import select
+import struct
+import sys
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from nullout import identity
+from nullout.config import Root
+from nullout.excludes import MatchState, compile_excludes
+from nullout.hazards import detect_hazards
+from nullout.pathtrie import PathNode
+from nullout.scanner import ScanOptions, make_finding
+from nullout.store import Store
+from nullout.win_paths import is_reparse_point, to_extended_path
+
+DEFAULT_POLL_INTERVAL_MS = 2000
+CHANGE_LOG_LIMIT = 10_000  # changes kept for get_watch_changes
+DEFAULT_MAX_CHANGES = 1000
+
+# --- inotify (Linux) ---
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK
+)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then len bytes of name
+_READ_BYTES = 64 * 1024
+
+
+class Inotify:
+    """Minimal ctypes binding: one inotify instance, watches by path."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm = libc.inotify_rm_watch
+        self._rm.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e))
+
+    def add(self, path: str) -> int:
+        """Watch a directory; raises OSError (ENOSPC at the watch limit)."""
+        wd = self._add(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e), path)
+        return wd
+
+    def remove(self, wd: int) -> None:
+        self._rm(self.fd, wd)
+
+    def read(self, timeout: float) -> list[tuple[int, int, str]]:
+        """Wait up to timeout seconds; return (wd, mask, name) events."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buf = os.read(self.fd, _READ_BYTES)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _cookie, length = _EVENT.unpack_from(buf, offset)
+            start = offset + _EVENT.size
+            name = os.fsdecode(buf[start:start + length].rstrip(b"\0"))
+            events.append((wd, mask, name))
+            offset = start + length
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def inotify_available() -> bool:
+    return sys.platform.startswith("linux") and ctypes.util.find_library("c") is not None
+
+
+# --- Watcher ---
+
+
+@dataclass
+class _DirState:
+    node: PathNode
+    depth: int
+    state: MatchState  # exclude-automaton state, as in the scan walk
+    entries: dict[str, tuple[int, bool]]  # name -> (inode, is_dir) at the last listing
+    device: int
+    mtime_ns: int
+    wd: int | None = None  # inotify watch; None means polled
+
+
+def _entry_key(entry: os.DirEntry[str]) -> tuple[int, bool]:
+    """What identifies an entry across listings: a name reused by a new file or directory differs."""
+    try:
+        return entry.inode(), entry.is_dir(follow_symlinks=False)
+    except OSError:
+        return -1, False
+
+
+class RootWatcher:
+    """Live findings for one root, kept current by a background thread."""
+
+    def __init__(
+        self,
+        root: Root,
+        scan_id: str,
+        opts: ScanOptions,
+        store: Store,
+        registry: WatchRegistry,
+        poll_interval_ms: int = DEFAULT_POLL_INTERVAL_MS,
+        native: bool = True,
+    ) -> None:
+        self.root = root
+        self.scan_id = scan_id
+        self.opts = opts
+        self.store = store
+        self.registry = registry
+        self.poll_interval_ms = poll_interval_ms
+        self.root_node = PathNode.root(root.abs_path)
+        self.excludes = compile_excludes(root.excludes + opts.excludes)
+        self.live: dict[str, str] = {}  # relativePath -> findingId
+        self.dirs: dict[str, _DirState] = {}  # relativePath ("" = root) -> state
+        self._by_wd: dict[int, str] = {}
+        self._inotify: Inotify | None = None
+        if native and inotify_available():
+            try:
+                self._inotify = Inotify()
+            except OSError:
+                pass  # e.g. max_user_instances reached: poll instead
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify is not None else "poll"
+
+    def start(self) -> list[dict[str, Any]]:
+        """Walk the root, start the watcher thread; return the initial findings."""
+        findings = self._add_tree(self.root_node, 0, self.excludes.start if self.excludes else MatchState())
+        self._thread = threading.Thread(target=self._run, name=f"nullout-watch-{self.root.root_id}", daemon=True)
+        self._thread.start()
+        return findings
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def live_findings(self) -> list[dict[str, Any]]:
+        out = []
+        for fid in list(self.live.values()):
+            finding = self.store.get_finding(fid)
+            if finding is not None:
+                out.append(finding.to_dict())
+        return out
+
+    def info(self) -> dict[str, Any]:
+        return {
+            "rootId": self.root.root_id,
+            "scanId": self.scan_id,
+            "backend": self.backend,
+            "watchedDirectories": len(self.dirs),
+            "polledDirectories": sum(1 for d in list(self.dirs.values()) if d.wd is None),
+            "pollIntervalMs": self.poll_interval_ms,
+            "liveFindings": len(self.live),
+        }
+
+    # --- Background loop ---
+
+    def _run(self) -> None:
+        interval = self.poll_interval_ms / 1000
+        while not self._stop.is_set():
+            if self._inotify is not None:
+                dirty = self._read_events(interval)
+            else:
+                self._stop.wait(interval)
+                dirty = set()
+            if self._stop.is_set():
+                return
+            dirty |= self._poll()
+            # Parents first: a removed subtree drops its own entries from dirs
+            for rel in sorted(dirty, key=len):
+                self._refresh(rel)
+
+    def _read_events(self, timeout: float) -> set[str]:
+        dirty: set[str] = set()
+        for wd, mask, _name in self._inotify.read(timeout):
+            if mask & IN_Q_OVERFLOW:
+                return set(self.dirs)  # events were lost: re-list everything
+            rel = self._by_wd.get(wd)
+            if rel is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._by_wd[wd]  # directory gone; its parent's event removes it
+                if rel in self.dirs and self.dirs[rel].wd == wd:
+                    self.dirs[rel].wd = None
+                continue
+            dirty.add(rel)
+        return dirty
+
+    def _poll(self) -> set[str]:
+        """Directories without a native watch whose mtime changed."""
+        dirty = set()
+        for rel, ds in list(self.dirs.items()):
+            if ds.wd is not None:
+                continue
+            try:
+                mtime_ns = os.stat(to_extended_path(ds.node.full())).st_mtime_ns
+            except OSError:
+                mtime_ns = -1
+            if mtime_ns != ds.mtime_ns:
+                dirty.add(rel)
+        return dirty
+
+    # --- Directory bookkeeping ---
+
+    def _add_tree(self, node: PathNode, depth: int, state: MatchState) -> list[dict[str, Any]]:
+        """Watch and classify a directory and everything under it."""
+        findings: list[dict[str, Any]] = []
+        stack = [(node, depth, state)]
+        while stack:
+            node, depth, state = stack.pop()
+            ds = self._watch_dir(node, depth, state)
+            if ds is None:
+                continue
+            try:
+                with os.scandir(to_extended_path(node.full())) as it:
+                    entries = list(it)
+            except OSError:
+                continue  # inaccessible or gone: same as a scan
+            ds.entries = {e.name: _entry_key(e) for e in entries}
+            findings.extend(self._classify(ds, entries, stack))
+        return findings
+
+    def _watch_dir(self, node: PathNode, depth: int, state: MatchState) -> _DirState | None:
+        path = node.full()
+        # Watch before listing, so nothing created in between is missed
+        wd = None
+        if self._inotify is not None:
+            try:
+                wd = self._inotify.add(path)
+            except OSError as e:
+                if e.errno not in (errno.ENOSPC, errno.EACCES):
+                    return None  # gone or not a directory any more
+        try:
+            st = os.stat(to_extended_path(path), follow_symlinks=False)
+        except OSError:
+            return None
+        rel = node.relative()
+        ds = _DirState(node, depth, state, {}, st.st_dev, st.st_mtime_ns, wd)
+        self.dirs[rel] = ds
+        if wd is not None:
+            self._by_wd[wd] = rel  # a moved directory keeps its wd: remap it
+        return ds
+
+    def _refresh(self, rel: str) -> None:
+        """Re-list one directory; classify new entries, retire missing ones.
+
+        A name now held by a different entry (recreated, or a file replaced
+        by a directory) is both: the old one is retired, the new one added.
+        """
+        ds = self.dirs.get(rel)
+        if ds is None:
+            return
+        path = ds.node.full()
+        try:
+            ds.mtime_ns = os.stat(to_extended_path(path)).st_mtime_ns
+            with os.scandir(to_extended_path(path)) as it:
+                entries = {e.name: e for e in it}
+        except FileNotFoundError:
+            ds.mtime_ns, entries = -1, {}
+        except OSError:
+            return
+        keys = {name: _entry_key(e) for name, e in entries.items()}
+        gone = [name for name, key in ds.entries.items() if keys.get(name) != key]
+        new = [e for name, e in entries.items() if ds.entries.get(name) != keys[name]]
+        ds.entries = keys
+        for name in gone:
+            self._retire(ds.node.child(name).relative())
+        if new:
+            stack: list[tuple[PathNode, int, MatchState]] = []
+            added = self._classify(ds, new, stack)
+            while stack:
+                added.extend(self._add_tree(*stack.pop()))
+            for finding in added:
+                self.registry.emit(self.root.root_id, "added", finding=finding)
+
+    def _retire(self, rel: str) -> None:
+        """Forget an entry that disappeared, and its subtree if it was a directory."""
+        removed = []
+        if rel in self.live:
+            removed.append((rel, self.live.pop(rel)))
+        if rel in self.dirs:
+            prefix = rel + os.sep
+            for sub in [d for d in self.dirs if d == rel or d.startswith(prefix)]:
+                ds = self.dirs.pop(sub)
+                if ds.wd is not None and self._by_wd.get(ds.wd) == sub:
+                    del self._by_wd[ds.wd]
+                    self._inotify.remove(ds.wd)
+            removed.extend((r, self.live.pop(r)) for r in [r for r in self.live if r.startswith(prefix)])
+        if removed:
+            self.store.remove_findings(self.scan_id, [fid for _, fid in removed])
+        for r, fid in removed:
+            self.registry.emit(self.root.root_id, "removed", findingId=fid, relativePath=r)
+
+    def _classify(
+        self,
+        ds: _DirState,
+        entries: list[os.DirEntry[str]],
+        stack: list[tuple[PathNode, int, MatchState]],
+    ) -> list[dict[str, Any]]:
+        """Apply the scan rules to entries of one directory.
+
+        Records findings and pushes subdirectories to descend onto stack.
+        """
+        opts = self.opts
+        current = ds.node.full()
+        ids: identity.OpenPerEntry | None = None
+        findings = []
+        for entry in entries:
+            name = entry.name
+            full = current + os.sep + name
+            child = ds.node.child(name)
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_reparse_point(full):
+                hazards = detect_hazards(name, len(to_extended_path(full)), is_reparse=True)
+            else:
+                child_state = MatchState()
+                if is_dir and ds.state:
+                    child_state, excluded = self.excludes.step(ds.state, name)
+                    if excluded:
+                        continue
+                descend = opts.recursive and is_dir and ds.depth < opts.max_depth
+                if descend:
+                    stack.append((child, ds.depth + 1, child_state))
+                if is_dir and not opts.include_dirs:
+                    continue
+                hazards = detect_hazards(name, len(to_extended_path(full)), is_reparse=False)
+            if not hazards:
+                continue
+            if ids is None:
+                ids = identity.for_directory(current, ds.device)
+            vol, fid = ids.identity(entry, full)
+            f = make_finding(self.store, self.root.root_id, self.scan_id, child, entry, hazards, vol, fid)
+            self.store.put_finding(f)
+            self.live[child.relative()] = f.findingId
+            findings.append(f.to_dict())
+        if findings:
+            self.store.extend_scan(self.scan_id, [f["findingId"] for f in findings])
+        return findings
+
+
+class WatchRegistry:
+    """Active watchers and the change log they append to."""
+
+    def __init__(self, limit: int = CHANGE_LOG_LIMIT) -> None:
+        self.watchers: dict[str, RootWatcher] = {}
+        self._log: deque[dict[str, Any]] = deque(maxlen=limit)
+        self._seq = itertools.count(1)
+        self._latest = 0
+        self._lock = threading.Lock()
+        self._watch_lock = threading.Lock()  # guards watchers and _starting
+        self._starting: dict[str, threading.Event] = {}  # root_id -> set once its start ends
+
+    @property
+    def latest_seq(self) -> int:
+        return self._latest
+
+    def emit(self, root_id: str, kind: str, **data: Any) -> None:
+        with self._lock:
+            self._latest = next(self._seq)
+            self._log.append({"seq": self._latest, "rootId": root_id, "kind": kind, **data})
+
+    def changes(
+        self, since_seq: int, root_id: str | None = None, limit: int = DEFAULT_MAX_CHANGES,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """Changes after since_seq, oldest first.
+
+        Also returns whether changes after since_seq were already dropped
+        from the log (the caller should rescan or re-watch).
+        """
+        with self._lock:
+            log = list(self._log)
+        truncated = bool(log) and log[0]["seq"] > since_seq + 1
+        out = []
+        for change in log:
+            if change["seq"] <= since_seq or (root_id is not None and change["rootId"] != root_id):
+                continue
+            out.append(change)
+            if len(out) >= limit:
+                break
+        return out, truncated
+
+    def watch(
+        self, root_id: str, make: Callable[[], RootWatcher],
+    ) -> tuple[RootWatcher, list[dict[str, Any]]]:
+        """The root's watcher and its live findings, starting one with make() if none runs.
+
+        The first caller reserves the root under the lock and walks it
+        outside; concurrent calls for that root wait for it, calls for other
+        roots do not.
+        """
+        while True:
+            with self._watch_lock:
+                watcher = self.watchers.get(root_id)
+                starting = self._starting.get(root_id)
+                if watcher is None and starting is None:
+                    starting = self._starting[root_id] = threading.Event()
+                    break
+            if watcher is not None:
+                return watcher, watcher.live_findings()
+            starting.wait()  # then re-check: that start may have failed
+        try:
+            watcher = make()
+            findings = watcher.start()
+            with self._watch_lock:
+                self.watchers[root_id] = watcher
+        finally:
+            with self._watch_lock:
+                del self._starting[root_id]
+            starting.set()
+        return watcher, findings
+
+    def stop(self, root_id: str) -> bool:
+        while True:
+            with self._watch_lock:
+                starting = self._starting.get(root_id)
+                if starting is None:
+                    watcher = self.watchers.pop(root_id, None)
+                    break
+            starting.wait()  # stop what that start inserts, not miss it
+        if watcher is None:
+            return False
+        watcher.stop()
+        return True
+
+    def stop_all(self) -> None:
+        while True:
+            with self._watch_lock:
+                pending = list(self._starting.values())
+                if not pending:
+                    watchers, self.watchers = list(self.watchers.values()), {}
+                    break
+            for starting in pending:
+                starting.wait()
+        for watcher in watchers:
+            watcher.stop()
+
+
+# Module-level registry shared by the watch tools
+registry_ref: WatchRegistry = WatchRegistry()
@@ -0,0 +1,148 @@
+"""Single-handle verify-and-delete via Win32.
+
+The target is opened once with DELETE access and FILE_FLAG_OPEN_REPARSE_POINT.
+Attributes, volume serial and file index come from that handle
+(GetFileInformationByHandle), emptiness from enumerating it
+(GetFileInformationByHandleEx), and the delete is a disposition set on it
+(SetFileInformationByHandle) that takes effect when the handle closes.
+The entry checked is therefore the entry deleted.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.wintypes as wintypes
+import os
+import struct
+
+from nullout.dirfd import PathEntry
+from nullout.win_identity import BY_HANDLE_FILE_INFORMATION
+from nullout.win_paths import to_extended_path
+
+# --- Win32 constants ---
+DELETE = 0x00010000
+FILE_READ_ATTRIBUTES = 0x00000080
+FILE_LIST_DIRECTORY = 0x00000001
+SYNCHRONIZE = 0x00100000
+FILE_SHARE_ALL = 0x00000001 | 0x00000002 | 0x00000004
+OPEN_EXISTING = 3
+FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+FILE_FLAG_OPEN_REPARSE_POINT = 0x00200000
+FILE_ATTRIBUTE_REPARSE_POINT = 0x00000400
+
+_FILE_DISPOSITION_INFO = 4  # FILE_INFO_BY_HANDLE_CLASS
+_FILE_FULL_DIRECTORY_INFO = 14
+_FILE_FULL_DIRECTORY_RESTART_INFO = 15
+_ERROR_NO_MORE_FILES = 18
+_DIR_BUFFER_BYTES = 64 * 1024
+
+# FILE_FULL_DIR_INFO: NextEntryOffset, FileIndex, 4 times, EndOfFile,
+# AllocationSize, FileAttributes, FileNameLength, EaSize, FileName[]
+_DIR_INFO = struct.Struct("<II6qIII")
+
+if os.name == "nt":
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+    _CreateFileW = _kernel32.CreateFileW
+    _CreateFileW.argtypes = [
+        wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+        wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE,
+    ]
+    _CreateFileW.restype = wintypes.HANDLE
+
+    _GetFileInformationByHandle = _kernel32.GetFileInformationByHandle
+    _GetFileInformationByHandle.argtypes = [wintypes.HANDLE, wintypes.LPVOID]
+    _GetFileInformationByHandle.restype = wintypes.BOOL
+
+    _GetFileInformationByHandleEx = _kernel32.GetFileInformationByHandleEx
+    _GetFileInformationByHandleEx.argtypes = [wintypes.HANDLE, ctypes.c_int, wintypes.LPVOID, wintypes.DWORD]
+    _GetFileInformationByHandleEx.restype = wintypes.BOOL
+
+    _SetFileInformationByHandle = _kernel32.SetFileInformationByHandle
+    _SetFileInformationByHandle.argtypes = [wintypes.HANDLE, ctypes.c_int, wintypes.LPVOID, wintypes.DWORD]
+    _SetFileInformationByHandle.restype = wintypes.BOOL
+
+    _CloseHandle = _kernel32.CloseHandle
+    _CloseHandle.argtypes = [wintypes.HANDLE]
+    _CloseHandle.restype = wintypes.BOOL
+
+INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+
+def _last_error(path: str) -> OSError:
+    """OSError carrying winerror, so callers can map sharing violations etc."""
+    code = ctypes.get_last_error()
+    return ctypes.WinError(code, f"{ctypes.FormatError(code)}: {path}")  # type: ignore[attr-defined]
+
+
+class HandleEntry(PathEntry):
+    """A delete target held open by one Win32 handle from check to delete.
+
+    Raises OSError (with winerror) from the constructor if the target
+    cannot be opened, e.g. 2/3 if gone, 5 if denied, 32 if another process
+    holds it without FILE_SHARE_DELETE.
+    """
+
+    single_handle = True
+
+    def __init__(self, path: str, is_dir: bool) -> None:
+        super().__init__(path)
+        access = DELETE | FILE_READ_ATTRIBUTES | SYNCHRONIZE
+        if is_dir:
+            access |= FILE_LIST_DIRECTORY
+        self._handle = _CreateFileW(
+            to_extended_path(path), access, FILE_SHARE_ALL, None, OPEN_EXISTING,
+            FILE_FLAG_BACKUP_SEMANTICS | FILE_FLAG_OPEN_REPARSE_POINT, None,
+        )
+        if self._handle == INVALID_HANDLE_VALUE:
+            self._handle = None
+            raise _last_error(path)
+        self._info = BY_HANDLE_FILE_INFORMATION()
+        if not _GetFileInformationByHandle(self._handle, ctypes.byref(self._info)):
+            error = _last_error(path)
+            self.close()
+            raise error
+
+    def is_reparse(self) -> bool:
+        return bool(self._info.dwFileAttributes & FILE_ATTRIBUTE_REPARSE_POINT)
+
+    def identity(self) -> tuple[str, str]:
+        info = self._info
+        file_id = (info.nFileIndexHigh << 32) | info.nFileIndexLow
+        return f"0x{info.dwVolumeSerialNumber:08X}", f"0x{file_id:016X}"
+
+    def is_empty_dir(self) -> bool:
+        buf = ctypes.create_string_buffer(_DIR_BUFFER_BYTES)
+        info_class = _FILE_FULL_DIRECTORY_RESTART_INFO
+        while _GetFileInformationByHandleEx(self._handle, info_class, buf, _DIR_BUFFER_BYTES):
+            info_class = _FILE_FULL_DIRECTORY_INFO
+            offset = 0
+            while True:
+                next_offset, *_, name_len, _ea = _DIR_INFO.unpack_from(buf, offset)
+                start = offset + _DIR_INFO.size
+                name = buf.raw[start:start + name_len].decode("utf-16-le")
+                if name not in (".", ".."):
+                    return False
+                if not next_offset:
+                    break
+                offset += next_offset
+        if ctypes.get_last_error() != _ERROR_NO_MORE_FILES:
+            raise _last_error(self.path)
+        return True
+
+    def remove(self, is_dir: bool) -> None:
+        """Mark for deletion; the entry goes away when the handle closes.
+
+        A non-empty directory fails here with winerror 145.
+        """
+        delete = wintypes.BOOLEAN(True)  # FILE_DISPOSITION_INFO
+        if not _SetFileInformationByHandle(
+            self._handle, _FILE_DISPOSITION_INFO, ctypes.byref(delete), ctypes.sizeof(delete),
+        ):
+            raise _last_error(self.path)
+        self.close()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            _CloseHandle(self._handle)
+            self._handle = None
@@ -1,13 +1,16 @@
 """File identity capture via Win32: volume serial + file index.
 
 Uses CreateFileW + GetFileInformationByHandle through ctypes.
-No pywin32 dependency.
+No pywin32 dependency. On other platforms identity is (st_dev, st_ino)
+from lstat, formatted the same way.
 """
 
 from __future__ import annotations
 
 import ctypes
 import ctypes.wintypes as wintypes
+import os
+import struct
 
 from nullout.win_paths import to_extended_path
 
@@ -21,27 +24,28 @@ FILE_FLAG_BACKUP_SEMANTICS = 0x02000000  # required to open directories
 INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
 
 # --- Win32 bindings ---
-_kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
-
-_CreateFileW = _kernel32.CreateFileW
-_CreateFileW.argtypes = [
-    wintypes.LPCWSTR,  # lpFileName
-    wintypes.DWORD,    # dwDesiredAccess
-    wintypes.DWORD,    # dwShareMode
-    wintypes.LPVOID,   # lpSecurityAttributes
-    wintypes.DWORD,    # dwCreationDisposition
-    wintypes.DWORD,    # dwFlagsAndAttributes
-    wintypes.HANDLE,   # hTemplateFile
-]
-_CreateFileW.restype = wintypes.HANDLE
+if os.name == "nt":
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+    _CreateFileW = _kernel32.CreateFileW
+    _CreateFileW.argtypes = [
+        wintypes.LPCWSTR,  # lpFileName
+        wintypes.DWORD,    # dwDesiredAccess
+        wintypes.DWORD,    # dwShareMode
+        wintypes.LPVOID,   # lpSecurityAttributes
+        wintypes.DWORD,    # dwCreationDisposition
+        wintypes.DWORD,    # dwFlagsAndAttributes
+        wintypes.HANDLE,   # hTemplateFile
+    ]
+    _CreateFileW.restype = wintypes.HANDLE
 
-_GetFileInformationByHandle = _kernel32.GetFileInformationByHandle
-_GetFileInformationByHandle.argtypes = [wintypes.HANDLE, wintypes.LPVOID]
-_GetFileInformationByHandle.restype = wintypes.BOOL
+    _GetFileInformationByHandle = _kernel32.GetFileInformationByHandle
+    _GetFileInformationByHandle.argtypes = [wintypes.HANDLE, wintypes.LPVOID]
+    _GetFileInformationByHandle.restype = wintypes.BOOL
 
-_CloseHandle = _kernel32.CloseHandle
-_CloseHandle.argtypes = [wintypes.HANDLE]
-_CloseHandle.restype = wintypes.BOOL
+    _CloseHandle = _kernel32.CloseHandle
+    _CloseHandle.argtypes = [wintypes.HANDLE]
+    _CloseHandle.restype = wintypes.BOOL
 
 
 class BY_HANDLE_FILE_INFORMATION(ctypes.Structure):
@@ -67,6 +71,8 @@ def get_identity(path: str) -> tuple[str, str]:
 
     Raises OSError if the file cannot be opened.
     """
+    if os.name != "nt":
+        return identity_from_stat(os.stat(path, follow_symlinks=False))
     ext_path = to_extended_path(path)
     share = FILE_SHARE_READ | FILE_SHARE_WRITE | FILE_SHARE_DELETE
 
@@ -90,3 +96,77 @@ def get_identity(path: str) -> tuple[str, str]:
         return vol, fid
     finally:
         _CloseHandle(handle)
+
+
+def identity_from_stat(st: os.stat_result) -> tuple[str, str]:
+    """(volumeSerialHex, fileIdHex) from a stat result (non-Windows identity).
+
+    Lets callers that already hold an lstat, e.g. from a DirEntry or a
+    dir_fd-relative stat, skip a second lookup by path.
+    """
+    return f"0x{st.st_dev:08X}", f"0x{st.st_ino:016X}"
+
+
+# --- Directory enumeration with file IDs (Windows) ---
+
+FILE_LIST_DIRECTORY = 0x00000001
+_FILE_ID_BOTH_DIRECTORY_INFO = 10  # FILE_INFO_BY_HANDLE_CLASS
+_FILE_ID_BOTH_DIRECTORY_RESTART_INFO = 11
+_ERROR_NO_MORE_FILES = 18
+_DIR_BUFFER_BYTES = 64 * 1024
+
+# FILE_ID_BOTH_DIR_INFO field offsets
+_NEXT_OFFSET = 0
+_NAME_LENGTH = 60
+_FILE_ID = 96
+_FILE_NAME = 104
+
+if os.name == "nt":
+    _GetFileInformationByHandleEx = _kernel32.GetFileInformationByHandleEx
+    _GetFileInformationByHandleEx.argtypes = [wintypes.HANDLE, ctypes.c_int, wintypes.LPVOID, wintypes.DWORD]
+    _GetFileInformationByHandleEx.restype = wintypes.BOOL
+
+
+def list_directory_ids(path: str) -> tuple[str, dict[str, str]]:
+    """Return (volumeSerialHex, {name: fileIdHex}) for one directory's entries.
+
+    One handle on the directory yields the volume serial and, through
+    FileIdBothDirectoryInfo, the file ID of every entry, formatted exactly
+    as get_identity formats them. Windows only; raises OSError on failure.
+    """
+    share = FILE_SHARE_READ | FILE_SHARE_WRITE | FILE_SHARE_DELETE
+    handle = _CreateFileW(
+        to_extended_path(path), FILE_LIST_DIRECTORY, share,
+        None, OPEN_EXISTING, FILE_FLAG_BACKUP_SEMANTICS, None,
+    )
+    if handle == INVALID_HANDLE_VALUE:
+        raise OSError(ctypes.get_last_error(), f"CreateFileW failed: {path}")
+    try:
+        info = BY_HANDLE_FILE_INFORMATION()
+        if not _GetFileInformationByHandle(handle, ctypes.byref(info)):
+            raise OSError(ctypes.get_last_error(), "GetFileInformationByHandle failed")
+        vol = f"0x{info.dwVolumeSerialNumber:08X}"
+
+        ids: dict[str, str] = {}
+        buf = ctypes.create_string_buffer(_DIR_BUFFER_BYTES)
+        info_class = _FILE_ID_BOTH_DIRECTORY_RESTART_INFO
+        while _GetFileInformationByHandleEx(handle, info_class, buf, _DIR_BUFFER_BYTES):
+            info_class = _FILE_ID_BOTH_DIRECTORY_INFO
+            raw = buf.raw
+            offset = 0
+            while True:
+                next_offset, = struct.unpack_from("<I", raw, offset + _NEXT_OFFSET)
+                name_len, = struct.unpack_from("<I", raw, offset + _NAME_LENGTH)
+                file_id, = struct.unpack_from("<Q", raw, offset + _FILE_ID)
+                start = offset + _FILE_NAME
+                name = raw[start:start + name_len].decode("utf-16-le", "surrogatepass")
+                ids[name] = f"0x{file_id:016X}"
+                if not next_offset:
+                    break
+                offset += next_offset
+        error_code = ctypes.get_last_error()
+        if error_code != _ERROR_NO_MORE_FILES:
+            raise OSError(error_code, "GetFileInformationByHandleEx failed")
+        return vol, ids
+    finally:
+        _CloseHandle(handle)
@@ -5,6 +5,9 @@ from __future__ import annotations
 import ctypes
 import ctypes.wintypes as wintypes
 import os
+import stat
+
+_IS_WINDOWS = os.name == "nt"
 
 
 def safe_abspath(path: str) -> str:
@@ -13,9 +16,9 @@ def safe_abspath(path: str) -> str:
     Unlike os.path.abspath, this does NOT call GetFullPathNameW which
     strips trailing dots and spaces from path components.
     """
-    if os.path.isabs(path):
-        return path.replace("/", "\\")
-    return os.path.join(os.getcwd(), path).replace("/", "\\")
+    if not os.path.isabs(path):
+        path = os.path.join(os.getcwd(), path)
+    return path.replace("/", "\\") if _IS_WINDOWS else path
 
 
 def to_extended_path(path: str) -> str:
@@ -27,7 +30,11 @@ def to_extended_path(path: str) -> str:
 
     Does NOT use os.path.abspath() because GetFullPathNameW normalizes
     away trailing dots and spaces — the exact characters NullOut exists to handle.
+
+    Other platforms have no such namespace: the path is only made absolute.
     """
+    if not _IS_WINDOWS:
+        return path if os.path.isabs(path) else os.path.join(os.getcwd(), path)
     if path.startswith("\\\\?\\"):
         return path
     # Make absolute without Win32 normalization
@@ -40,20 +47,27 @@ def to_extended_path(path: str) -> str:
     return "\\\\?\\" + path
 
 
-def is_under_root(target_abs: str, root_abs: str) -> bool:
-    """Check if target is inside root using case-insensitive normalized comparison."""
-    t = os.path.normcase(os.path.normpath(target_abs))
+def root_prefix(root_abs: str) -> str:
+    """Normcased, normalized root path ending in os.sep (see Root.prefix)."""
     r = os.path.normcase(os.path.normpath(root_abs))
     if not r.endswith(os.sep):
         r += os.sep
+    return r
+
+
+def is_under_root(target_abs: str, root_abs: str) -> bool:
+    """Check if target is inside root using case-insensitive normalized comparison."""
+    t = os.path.normcase(os.path.normpath(target_abs))
+    r = root_prefix(root_abs)
     return t.startswith(r) or t == r.rstrip(os.sep)
 
 
 # --- Properly typed Win32 binding for GetFileAttributesW ---
-_kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
-_GetFileAttributesW = _kernel32.GetFileAttributesW
-_GetFileAttributesW.argtypes = [wintypes.LPCWSTR]
-_GetFileAttributesW.restype = wintypes.DWORD  # MUST be unsigned — signed returns -1 instead of 0xFFFFFFFF
+if _IS_WINDOWS:
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _GetFileAttributesW = _kernel32.GetFileAttributesW
+    _GetFileAttributesW.argtypes = [wintypes.LPCWSTR]
+    _GetFileAttributesW.restype = wintypes.DWORD  # MUST be unsigned — signed returns -1 instead of 0xFFFFFFFF
 
 _FILE_ATTRIBUTE_REPARSE_POINT = 0x0400
 _INVALID_FILE_ATTRIBUTES = 0xFFFFFFFF
@@ -63,8 +77,14 @@ def is_reparse_point(path: str) -> bool:
     """Check if path is a reparse point (symlink/junction/mount) via Win32 attributes.
 
     Uses extended-path prefix to correctly query entries with trailing dots/spaces
-    that Win32 would otherwise normalize away.
+    that Win32 would otherwise normalize away. Elsewhere, symlinks are the
+    only entries deny_all refuses to follow (mounts get their own device lane).
     """
+    if not _IS_WINDOWS:
+        try:
+            return stat.S_ISLNK(os.lstat(path).st_mode)
+        except OSError:
+            return False
     ext_path = to_extended_path(path)
     try:
         attrs = _GetFileAttributesW(ext_path)
@@ -0,0 +1,78 @@
+"""Tests for the in-process nullout.api Scanner."""
+
+from __future__ import annotations
+
+import os
+import threading
+
+from nullout import scanner
+from nullout.api import FindingRecord, Scanner
+from nullout.scanner import ScanOptions
+
+
+def _touch(path: str) -> None:
+    with open(path, "w") as f:
+        f.write("x")
+
+
+def _build_tree(td: str, dirs: int = 5) -> None:
+    for d in range(dirs):
+        sub = os.path.join(td, f"d{d}")
+        os.makedirs(sub)
+        _touch(os.path.join(sub, "NUL.txt"))
+        _touch(os.path.join(sub, "fine.txt"))
+    os.makedirs(os.path.join(td, "skipme"))
+    _touch(os.path.join(td, "skipme", "CON"))
+
+
+def test_iter_findings_matches_scan(temp_root, store):
+    td, roots = temp_root
+    _build_tree(td)
+    api = Scanner(store)
+
+    records = list(api.iter_findings(td))
+    assert all(isinstance(r, FindingRecord) for r in records)
+    assert not store._findings  # streaming registers nothing
+    result, _ = api.scan(roots["root_test"], ScanOptions(recursive=True, include_dirs=False))
+
+    assert sorted(r.relative_path for r in records) == sorted(f["relativePath"] for f in result.findings)
+    by_path = {f["relativePath"]: f for f in result.findings}
+    for r in records:
+        f = by_path[r.relative_path]
+        assert r.path == f["observedPath"]
+        assert list(r.hazards) == [h["code"] for h in f["hazards"]]
+        assert r.entry_type == f["entryType"]
+        ident = f["evidence"]["identity"]
+        assert (r.volume_serial, r.file_id) == (ident["volumeSerial"], ident["fileId"])
+
+
+def test_iter_findings_options(temp_root):
+    td, roots = temp_root
+    _build_tree(td)
+    api = Scanner()
+
+    paths = {r.relative_path for r in api.iter_findings(roots["root_test"], exclude=["skipme"])}
+    assert os.path.join("skipme", "CON") not in paths
+    assert len(paths) == 5
+
+    assert list(api.iter_findings(td, recursive=False)) == []
+    assert all(r.file_id is None for r in api.iter_findings(td, identity=False))
+
+
+def test_break_stops_walk(temp_root, monkeypatch):
+    td, _ = temp_root
+    _build_tree(td, dirs=200)
+    monkeypatch.setattr("nullout.api.STREAM_BUFFER", 1)
+    recorded = []
+    original = scanner._RecordWalk._record
+
+    def counting(self, *args, **kwargs):
+        recorded.append(args[0])
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(scanner._RecordWalk, "_record", counting)
+    gen = Scanner().iter_findings(td, workers_per_device=1)
+    next(gen)
+    gen.close()
+    assert len(recorded) < 200  # remaining directories were never enumerated
+    assert not any(t.name == "nullout-stream" for t in threading.enumerate())
@@ -0,0 +1,199 @@
+"""Tests for the group-committed audit journal."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from nullout import audit, tools
+from nullout.audit import AuditJournal, plan_status, read_journal
+from nullout.cli import EXIT_NOT_FOUND, run
+from nullout.tools import handle_delete_entry, handle_plan_cleanup, handle_scan_reserved_names
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    j = AuditJournal(str(tmp_path), max_bytes=1024**2)
+    monkeypatch.setattr(audit, "journal_ref", j)
+    yield j
+    j.close()
+
+
+def _plan(td, roots, store, token_secret, names):
+    for name in names:
+        with open(os.path.join(td, name), "w") as f:
+            f.write("x")
+    scan = handle_scan_reserved_names(
+        {"rootId": "root_test", "recursive": False, "includeDirs": False}, roots, store, token_secret,
+    )
+    ids = [f["findingId"] for f in scan["result"]["findings"]]
+    plan = handle_plan_cleanup({"findingIds": ids, "requestedActions": ["DELETE"]}, store, token_secret)
+    return plan["result"]
+
+
+def test_interrupted_plan_is_visible(temp_root, store, token_secret, journal, tmp_path):
+    td, roots = temp_root
+    plan = _plan(td, roots, store, token_secret, ["NUL.txt", "CON.txt", "AUX.txt"])
+    first, second, third = plan["entries"]
+
+    args = {"findingId": first["findingId"], "confirmToken": first["confirmToken"]}
+    assert handle_delete_entry(args, roots, store, token_secret)["ok"]
+    os.remove(store.get_finding(second["findingId"]).observedPath)
+    args = {"findingId": second["findingId"], "confirmToken": second["confirmToken"]}
+    assert not handle_delete_entry(args, roots, store, token_secret)["ok"]
+    assert journal.flush(5)
+
+    status = plan_status(str(tmp_path), plan["planId"])
+    assert status["found"]
+    by_id = {e["findingId"]: e for e in status["entries"]}
+    assert by_id[first["findingId"]]["status"] == "deleted"
+    assert by_id[second["findingId"]]["status"] == "failed"
+    assert by_id[second["findingId"]]["code"] == "E_NOT_FOUND"
+    assert by_id[third["findingId"]]["status"] == "planned"
+    assert by_id[first["findingId"]]["fileId"] == first["bindings"]["fileId"]
+
+    intent = next(r for r in read_journal(str(tmp_path)) if r["event"] == "delete_intent")
+    assert intent["planId"] == plan["planId"]
+    assert intent["fileId"] == first["bindings"]["fileId"]
+
+    out = io.StringIO()
+    assert run(["audit", plan["planId"], "--dir", str(tmp_path)], out) == 0
+    assert len(out.getvalue().splitlines()) == 3
+    assert run(["audit", "plan_missing", "--dir", str(tmp_path)], io.StringIO()) == EXIT_NOT_FOUND
+
+
+def test_crash_torn_line_and_missing_outcome(tmp_path):
+    lines = [
+        {"seq": 1, "event": "plan", "planId": "p", "entries": [{"findingId": "a"}, {"findingId": "b"}]},
+        {"seq": 2, "event": "delete_intent", "planId": "p", "findingId": "a"},
+        {"seq": 3, "event": "delete_outcome", "planId": "p", "findingId": "a", "ok": True},
+        {"seq": 4, "event": "delete_intent", "planId": "p", "findingId": "b"},
+    ]
+    with open(tmp_path / audit.JOURNAL_NAME, "w") as f:
+        f.writelines(json.dumps(line) + "\n" for line in lines)
+        f.write('{"seq": 5, "event": "delete_out')  # torn by the crash
+    statuses = {e["findingId"]: e["status"] for e in plan_status(str(tmp_path), "p")["entries"]}
+    assert statuses == {"a": "deleted", "b": "started"}
+
+    # Reopening continues the sequence after the last complete record
+    j = AuditJournal(str(tmp_path), max_bytes=1024**2)
+    try:
+        assert j.append("note") == 5
+    finally:
+        j.close()
+    assert [r["seq"] for r in read_journal(str(tmp_path))] == [1, 2, 3, 4, 5]
+
+
+def test_group_commit_and_rotation(tmp_path):
+    j = AuditJournal(str(tmp_path), max_bytes=4096)
+    try:
+        def writer(n):
+            for i in range(200):
+                j.append("note", writer=n, i=i)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert j.flush(5)
+        assert j.commits < 800  # many records per fsync
+    finally:
+        j.close()
+
+    assert list(tmp_path.glob("audit-*.ndjson"))  # rotation happens at commit granularity
+    seqs = [r["seq"] for r in read_journal(str(tmp_path))]
+    assert seqs == list(range(1, 801))
+
+
+def test_delete_waits_for_intent_commit(temp_root, store, token_secret, journal, monkeypatch):
+    td, roots = temp_root
+    plan = _plan(td, roots, store, token_secret, ["NUL.txt", "CON.txt"])
+
+    committed_at_delete = []
+    confined_delete = tools._confined_delete
+
+    def spy(finding, roots):
+        committed_at_delete.append(journal._committed)
+        return confined_delete(finding, roots)
+
+    monkeypatch.setattr(tools, "_confined_delete", spy)
+    results = [None, None]
+
+    def delete(i, entry):
+        args = {"findingId": entry["findingId"], "confirmToken": entry["confirmToken"]}
+        results[i] = handle_delete_entry(args, roots, store, token_secret)
+
+    threads = [threading.Thread(target=delete, args=(i, e)) for i, e in enumerate(plan["entries"])]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(r["ok"] for r in results)
+    # plan record is seq 1; the two intents are seqs 2 and 3
+    assert len(committed_at_delete) == 2 and min(committed_at_delete) >= 2
+
+
+def test_uncommitted_intent_blocks_delete(temp_root, store, token_secret, journal, monkeypatch):
+    td, roots = temp_root
+    plan = _plan(td, roots, store, token_secret, ["NUL.txt"])
+    assert journal.flush(5)
+
+    def broken_fsync(fd):
+        raise OSError(5, "I/O error")
+
+    monkeypatch.setattr(audit.os, "fsync", broken_fsync)
+    entry = plan["entries"][0]
+    args = {"findingId": entry["findingId"], "confirmToken": entry["confirmToken"]}
+    result = handle_delete_entry(args, roots, store, token_secret)
+    assert result["error"]["code"] == "E_IO_ERROR"
+    assert os.path.exists(store.get_finding(entry["findingId"]).observedPath)
+
+
+def test_restart_after_rotation_keeps_rotated_files(tmp_path):
+    j = AuditJournal(str(tmp_path), max_bytes=1)  # every commit rotates
+    try:
+        j.append("note", run=1)
+        assert j.flush(5)
+    finally:
+        j.close()
+    assert os.path.getsize(tmp_path / audit.JOURNAL_NAME) == 0
+
+    j = AuditJournal(str(tmp_path), max_bytes=1)
+    try:
+        assert j.append("note", run=2) == 2
+        assert j.flush(5)
+    finally:
+        j.close()
+    rotated = sorted(p.name for p in tmp_path.glob("audit-*.ndjson"))
+    assert rotated == ["audit-000000000001.ndjson", "audit-000000000002.ndjson"]
+    assert [(r["seq"], r["run"]) for r in read_journal(str(tmp_path))] == [(1, 1), (2, 2)]
+
+
+def test_restart_names_rotation_after_first_record(tmp_path):
+    with open(tmp_path / audit.JOURNAL_NAME, "w") as f:
+        f.writelines(json.dumps({"seq": n, "event": "note"}) + "\n" for n in range(5, 11))
+    j = AuditJournal(str(tmp_path), max_bytes=1)
+    try:
+        assert j.append("note") == 11
+        assert j.flush(5)
+    finally:
+        j.close()
+    assert [p.name for p in tmp_path.glob("audit-*.ndjson")] == ["audit-000000000005.ndjson"]
+
+
+def test_rotation_never_overwrites(tmp_path):
+    (tmp_path / "audit-000000000001.ndjson").write_text(json.dumps({"seq": 1, "event": "old"}) + "\n")
+    (tmp_path / audit.JOURNAL_NAME).write_text(json.dumps({"seq": 1, "event": "stray"}) + "\n")
+    j = AuditJournal(str(tmp_path), max_bytes=1)
+    try:
+        j.append("note")
+        assert j.flush(5)
+    finally:
+        j.close()
+    assert json.loads((tmp_path / "audit-000000000001.ndjson").read_text())["event"] == "old"
+    assert (tmp_path / "audit-000000000001-1.ndjson").exists()
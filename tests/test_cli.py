@@ -0,0 +1,78 @@
+"""Tests for the scan / classify command-line modes."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+
+import pytest
+
+from nullout.cli import EXIT_CLEAN, EXIT_HAZARDS, run
+
+
+def _touch(path: str) -> None:
+    with open(path, "w") as f:
+        f.write("x")
+
+
+def _run(argv: list[str], stdin: str = "") -> tuple[int, list[dict]]:
+    out = io.StringIO()
+    status = run(argv, out, io.StringIO(stdin))
+    return status, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_scan_ndjson(temp_root):
+    td, _ = temp_root
+    os.makedirs(os.path.join(td, "a"))
+    os.makedirs(os.path.join(td, "node_modules"))
+    _touch(os.path.join(td, "a", "NUL.txt"))
+    _touch(os.path.join(td, "node_modules", "CON"))
+    _touch(os.path.join(td, "fine.txt"))
+
+    status, rows = _run(["scan", "--root", td, "--exclude", "node_modules", "--workers", "1"])
+    assert status == EXIT_HAZARDS
+    assert [(r["relativePath"], r["hazards"]) for r in rows] == [
+        (os.path.join("a", "NUL.txt"), ["WIN_RESERVED_DEVICE_BASENAME"]),
+    ]
+
+    status, rows = _run(["scan", "--root", os.path.join(td, "a"), "--root", td, "--no-identity"])
+    assert len(rows) == 3
+    assert all(r["fileId"] is None for r in rows)
+
+
+def test_scan_clean_and_summary(temp_root):
+    td, _ = temp_root
+    _touch(os.path.join(td, "fine.txt"))
+    assert _run(["scan", "--root", td]) == (EXIT_CLEAN, [])
+
+    _touch(os.path.join(td, "AUX"))
+    status, rows = _run(["scan", "--root", td, "--format", "summary"])
+    assert status == EXIT_HAZARDS
+    assert rows[0]["stats"]["flagged"] == 1
+    assert sum(rows[0]["summary"]["byCode"]) == 1
+
+
+def test_scan_rejects_missing_root(tmp_path):
+    with pytest.raises(SystemExit) as exc:
+        run(["scan", "--root", str(tmp_path / "missing")], io.StringIO())
+    assert exc.value.code == 2
+
+
+def test_classify(tmp_path):
+    status, rows = _run(["classify", "docs/CON.txt", "report.pdf", "trailing. "])
+    assert status == EXIT_HAZARDS
+    assert rows == [
+        {"path": "docs/CON.txt", "hazards": ["WIN_RESERVED_DEVICE_BASENAME"]},
+        {"path": "trailing. ", "hazards": ["WIN_TRAILING_DOT_SPACE"]},
+    ]
+
+    status, rows = _run(["classify", "--all"], stdin="report.pdf\n")
+    assert status == EXIT_CLEAN
+    assert rows == [{"path": "report.pdf", "hazards": []}]
+
+    if hasattr(os, "symlink"):
+        link = tmp_path / "link"
+        os.symlink(tmp_path, link)
+        status, rows = _run(["classify", str(link)])
+        assert rows[0]["hazards"] == ["REPARSE_POINT_PRESENT"]
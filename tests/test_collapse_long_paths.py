@@ -0,0 +1,81 @@
+"""Tests for collapsing over-length subtrees into aggregate findings."""
+
+from __future__ import annotations
+
+import os
+
+from nullout.hazards import MAX_PATH_LEGACY
+from nullout.tools import handle_expand_finding, handle_scan_reserved_names
+from nullout.win_paths import to_extended_path
+
+
+def _build_long_tree(td: str) -> str:
+    """Nest 100-char directories until one crosses MAX_PATH; fill it. Returns its path."""
+    current = td
+    while len(to_extended_path(current)) <= MAX_PATH_LEGACY:
+        current = os.path.join(current, "d" * 100)
+    os.makedirs(to_extended_path(os.path.join(current, "sub")))
+    for rel in ("a.txt", "CON.txt", os.path.join("sub", "b.txt")):
+        with open(to_extended_path(os.path.join(current, rel)), "w") as f:
+            f.write("12345")
+    return current
+
+
+BASE = {"rootId": "root_test", "recursive": True, "includeDirs": True}
+
+
+def test_collapse_emits_one_aggregate(temp_root, store, token_secret):
+    td, roots = temp_root
+    long_dir = _build_long_tree(td)
+
+    full = handle_scan_reserved_names(BASE, roots, store, token_secret)
+    collapsed = handle_scan_reserved_names({**BASE, "collapseLongPaths": True}, roots, store, token_secret)
+    assert full["ok"] and collapsed["ok"]
+
+    # Full scan: the over-length dir plus all 4 descendants
+    assert full["result"]["stats"]["flagged"] == 5
+
+    findings = collapsed["result"]["findings"]
+    assert len(findings) == 1
+    agg = findings[0]
+    assert agg["observedPath"] == long_dir
+    assert {h["code"] for h in agg["hazards"]} == {"WIN_PATH_TOO_LONG"}
+    counts = agg["evidence"]["aggregate"]
+    assert counts["descendants"] == 4
+    assert counts["files"] == 3 and counts["dirs"] == 1
+    assert counts["sizeBytes"] == 15
+    assert counts["flaggedDescendants"] == 4
+    assert counts["hazardCounts"] == {"WIN_PATH_TOO_LONG": 4, "WIN_RESERVED_DEVICE_BASENAME": 1}
+
+    stats = collapsed["result"]["stats"]
+    assert stats["collapsedEntries"] == 4
+    assert stats["visited"] == full["result"]["stats"]["visited"]
+
+
+def test_expand_finding_yields_individual_findings(temp_root, store, token_secret):
+    td, roots = temp_root
+    _build_long_tree(td)
+    collapsed = handle_scan_reserved_names({**BASE, "collapseLongPaths": True}, roots, store, token_secret)
+    agg = collapsed["result"]["findings"][0]
+
+    expanded = handle_expand_finding({"findingId": agg["findingId"]}, roots, store, token_secret)
+    assert expanded["ok"], expanded
+    names = sorted(f["name"] for f in expanded["result"]["findings"])
+    assert names == ["CON.txt", "a.txt", "b.txt", "sub"]
+    assert all(f["scanId"] == agg["scanId"] for f in expanded["result"]["findings"])
+    assert len(store.get_scan_findings(agg["scanId"])) == 5
+
+    again = handle_expand_finding({"findingId": agg["findingId"]}, roots, store, token_secret)
+    assert again["error"]["code"] == "E_INVALID_REQUEST"
+    assert len(store.get_scan_findings(agg["scanId"])) == 5  # nothing registered twice
+
+
+def test_expand_rejects_plain_finding(temp_root, store, token_secret):
+    td, roots = temp_root
+    with open(to_extended_path(os.path.join(td, "NUL.txt")), "w") as f:
+        f.write("x")
+    scan = handle_scan_reserved_names(BASE, roots, store, token_secret)
+    plain = scan["result"]["findings"][0]
+    result = handle_expand_finding({"findingId": plain["findingId"]}, roots, store, token_secret)
+    assert not result["ok"]
+    assert result["error"]["code"] == "E_INVALID_REQUEST"
@@ -0,0 +1,96 @@
+"""Tests for directory-descriptor-relative traversal and delete checks."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from nullout import dirfd
+from nullout.dirfd import DIR_FD_SUPPORTED, DirFdLimiter
+from nullout.tools import handle_delete_entry, handle_plan_cleanup, handle_scan_reserved_names
+
+pytestmark = pytest.mark.skipif(not DIR_FD_SUPPORTED, reason="needs dir_fd support (POSIX)")
+
+SCAN_ARGS = {"rootId": "root_test", "recursive": True, "includeDirs": False}
+
+
+def _build_tree(td: str) -> None:
+    for a in range(6):
+        for b in range(3):
+            d = os.path.join(td, f"d{a}", f"e{b}")
+            os.makedirs(d)
+            with open(os.path.join(d, "NUL.txt"), "w") as f:
+                f.write("x")
+
+
+def _scan(roots, store, token_secret) -> dict:
+    result = handle_scan_reserved_names(SCAN_ARGS, roots, store, token_secret)
+    assert result["ok"]
+    return result["result"]
+
+
+def test_open_descriptors_are_capped(temp_root, store, token_secret, monkeypatch):
+    td, roots = temp_root
+    _build_tree(td)
+    limiter = DirFdLimiter(2)
+    monkeypatch.setattr(dirfd, "limiter_ref", limiter)
+
+    result = _scan(roots, store, token_secret)
+    assert len(result["findings"]) == 18  # directories past the cap fall back to paths
+    assert 0 < limiter.peak <= 2
+    assert limiter.open_count == 0
+
+
+def test_fd_mode_matches_path_mode(temp_root, store, token_secret, monkeypatch):
+    td, roots = temp_root
+    _build_tree(td)
+    os.symlink(os.path.join(td, "d0"), os.path.join(td, "d5", "CON"))
+
+    def findings() -> dict[str, tuple]:
+        return {
+            f["relativePath"]: (f["evidence"]["identity"]["fileId"], [h["code"] for h in f["hazards"]])
+            for f in _scan(roots, store, token_secret)["findings"]
+        }
+
+    monkeypatch.setattr(dirfd, "limiter_ref", DirFdLimiter(64))
+    by_fd = findings()
+    monkeypatch.setattr(dirfd, "limiter_ref", DirFdLimiter(0))
+    by_path = findings()
+
+    assert by_fd == by_path
+    assert by_fd[os.path.join("d5", "CON")][1][0] == "REPARSE_POINT_PRESENT"  # never followed
+    assert len(by_fd) == 19
+
+
+def test_delete_relative_to_parent_fd(temp_root, store, token_secret, monkeypatch):
+    td, roots = temp_root
+    _build_tree(td)
+    limiter = DirFdLimiter(8)
+    monkeypatch.setattr(dirfd, "limiter_ref", limiter)
+    finding = next(f for f in _scan(roots, store, token_secret)["findings"]
+                   if f["relativePath"] == os.path.join("d1", "e2", "NUL.txt"))
+    plan = handle_plan_cleanup(
+        {"findingIds": [finding["findingId"]], "requestedActions": ["DELETE"]}, store, token_secret,
+    )
+    token = plan["result"]["entries"][0]["confirmToken"]
+
+    result = handle_delete_entry(
+        {"findingId": finding["findingId"], "confirmToken": token}, roots, store, token_secret,
+    )
+    assert result["ok"], result
+    assert result["result"]["telemetry"]["relativeToDirFd"] is True
+    assert not os.path.exists(os.path.join(td, "d1", "e2", "NUL.txt"))
+    assert limiter.open_count == 0
+
+
+def test_max_dir_fds_config(monkeypatch):
+    from nullout.config import DEFAULT_MAX_DIR_FDS, load_max_dir_fds
+
+    monkeypatch.delenv("NULLOUT_MAX_DIR_FDS", raising=False)
+    assert load_max_dir_fds() == DEFAULT_MAX_DIR_FDS
+    monkeypatch.setenv("NULLOUT_MAX_DIR_FDS", "0")
+    assert load_max_dir_fds() == 0
+    monkeypatch.setenv("NULLOUT_MAX_DIR_FDS", "-1")
+    with pytest.raises(RuntimeError):
+        load_max_dir_fds()
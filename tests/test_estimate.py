@@ -0,0 +1,83 @@
+"""Tests for estimate-mode scans (random directory probes)."""
+
+from __future__ import annotations
+
+import os
+
+from nullout import estimate
+from nullout.estimate import estimate_root
+from nullout.scanner import ScanOptions
+from nullout.tools import handle_scan_reserved_names
+
+HAZARDS = ["NUL.txt", "CON.txt", "AUX.txt", "trailing.", "PRN"]
+
+
+def _uneven_tree(td) -> int:
+    """Branches of different fan-out and density; returns the flagged count."""
+    flagged = 0
+    for b, fan_out in enumerate([1, 2, 4, 8]):
+        for c in range(fan_out):
+            leaf = os.path.join(td, f"b{b}", f"c{c}")
+            os.makedirs(leaf)
+            for name in HAZARDS[: (b + c) % len(HAZARDS) + 1]:
+                with open(os.path.join(leaf, name), "w") as f:
+                    f.write("x")
+                flagged += 1
+            with open(os.path.join(leaf, "plain.txt"), "w") as f:
+                f.write("x")
+    with open(os.path.join(td, "COM1.log"), "w") as f:
+        f.write("x")
+    return flagged + 1
+
+
+def _args(**extra):
+    return {"rootId": "root_test", "recursive": True, "includeDirs": False, **extra}
+
+
+def test_small_tree_is_exhausted_and_exact(temp_root, store, token_secret):
+    td, roots = temp_root
+    flagged = _uneven_tree(td)
+    result = handle_scan_reserved_names(_args(mode="estimate"), roots, store, token_secret)["result"]
+    est = result["estimate"]
+    assert est["exact"] and est["stopReason"] == "exhausted"
+    assert est["flagged"] == {"estimate": flagged, "low": flagged, "high": flagged}
+    assert est["directories"]["estimate"] == 1 + 4 + 15
+
+    summary = handle_scan_reserved_names(_args(mode="summary"), roots, store, token_secret)["result"]["summary"]
+    assert est["byCode"]["estimate"] == summary["byCode"]
+    assert est["topDirectories"][0]["relativePath"] == "b3"
+    assert result["stats"]["directoriesListed"] >= 20  # workers may race to list the same directory
+
+
+def test_sampled_interval_covers_true_count(temp_root, monkeypatch):
+    td, roots = temp_root
+    flagged = _uneven_tree(td)
+    monkeypatch.setattr(estimate, "MAX_CACHED_DIRECTORIES", 0)  # never exhausts
+    opts = ScanOptions(recursive=True, include_dirs=False)
+
+    est = estimate_root(roots["root_test"], opts, target_precision=0.1, workers=1, seed=7)
+    out = est.to_dict()
+    assert out["stopReason"] == "targetPrecision" and not out["exact"]
+    assert out["precision"] <= 0.1
+    assert out["flagged"]["low"] <= flagged <= out["flagged"]["high"]
+    assert out["directories"]["low"] <= 20 <= out["directories"]["high"]
+
+    capped = estimate_root(roots["root_test"], opts, target_precision=0.0001, max_probes=40, workers=2, seed=1)
+    assert capped.stop_reason == "maxProbes"
+    assert capped.probes >= 40
+
+
+def test_estimate_respects_excludes(temp_root, store, token_secret):
+    td, roots = temp_root
+    _uneven_tree(td)
+    result = handle_scan_reserved_names(_args(mode="estimate", exclude=["b3"]), roots, store, token_secret)
+    full = handle_scan_reserved_names(_args(exclude=["b3"]), roots, store, token_secret)
+    assert result["result"]["estimate"]["flagged"]["estimate"] == full["result"]["stats"]["flagged"]
+
+
+def test_estimate_rejects_count_budgets_and_export(temp_root, store, token_secret):
+    td, roots = temp_root
+    result = handle_scan_reserved_names(_args(mode="estimate", maxFindings=5), roots, store, token_secret)
+    assert result["error"]["code"] == "E_INVALID_REQUEST"
+    result = handle_scan_reserved_names(_args(mode="estimate", export={}), roots, store, token_secret)
+    assert result["error"]["code"] == "E_INVALID_REQUEST"
@@ -0,0 +1,95 @@
+"""Tests for exclude patterns: automaton matching and pruned scan subtrees."""
+
+from __future__ import annotations
+
+import os
+
+from nullout.excludes import compile_excludes
+from nullout.tools import handle_scan_reserved_names
+from nullout.win_paths import to_extended_path
+
+
+def _excluded(patterns: tuple[str, ...], rel: str) -> bool:
+    matcher = compile_excludes(patterns)
+    assert matcher is not None
+    return matcher.state_for(rel)[1]
+
+
+def test_bare_name_matches_at_any_depth():
+    assert _excluded(("node_modules",), "node_modules")
+    assert _excluded(("node_modules",), "pkg/a/node_modules")
+    assert not _excluded(("node_modules",), "pkg/node_modules_old")
+
+
+def test_anchored_prefix():
+    assert _excluded(("build/output",), "build/output")
+    assert _excluded(("build/output",), "build/output/x")
+    assert not _excluded(("build/output",), "src/build/output")
+    assert not _excluded(("/build",), "src/build")
+    assert _excluded(("/build",), "build")
+
+
+def test_globs_and_double_star():
+    assert _excluded(("**/.git/objects",), "repo/sub/.git/objects")
+    assert not _excluded(("**/.git/objects",), "repo/.git/refs")
+    assert _excluded(("*.egg-info",), "src/nullout.egg-info")
+    assert _excluded(("src/**/cache",), "src/a/b/cache")
+    assert not _excluded(("src/**/cache",), "lib/a/cache")
+
+
+def test_compile_is_cached_and_empty_is_none():
+    assert compile_excludes(("a", "b")) is compile_excludes(("a", "b"))
+    assert compile_excludes(()) is None
+    assert compile_excludes(("  ",)) is None
+
+
+def test_dead_state_stops_checking():
+    matcher = compile_excludes(("build/output",))
+    state, excluded = matcher.step(matcher.start, "src")
+    assert not state and not excluded
+
+
+def test_scan_never_enters_excluded_dirs(temp_root, store, token_secret):
+    td, roots = temp_root
+    for rel in ("keep", os.path.join("pkg", "node_modules", "deep"), os.path.join(".git", "objects")):
+        os.makedirs(to_extended_path(os.path.join(td, rel)))
+    for rel in ("keep", os.path.join("pkg", "node_modules", "deep"), os.path.join(".git", "objects")):
+        with open(to_extended_path(os.path.join(td, rel, "CON.txt")), "w") as f:
+            f.write("x")
+
+    result = handle_scan_reserved_names(
+        {
+            "rootId": "root_test", "recursive": True, "includeDirs": False,
+            "exclude": ["node_modules", ".git/objects"],
+        },
+        roots, store, token_secret,
+    )
+    assert result["ok"]
+    paths = {f["relativePath"] for f in result["result"]["findings"]}
+    assert paths == {os.path.join("keep", "CON.txt")}
+    stats = result["result"]["stats"]
+    assert stats["prunedDirectories"] == 2
+    # root: keep, pkg, .git; keep: CON.txt; pkg: node_modules; .git: objects
+    assert stats["visited"] == 6
+
+
+def test_excluded_dirs_are_skipped_where_the_walk_stops(temp_root, store, token_secret):
+    td, roots = temp_root
+    for rel in ("CON", "AUX", os.path.join("sub", "CON"), os.path.join("sub", "AUX")):
+        os.makedirs(to_extended_path(os.path.join(td, rel)))
+    base = {"rootId": "root_test", "includeDirs": True, "exclude": ["CON"]}
+
+    for extra in ({"recursive": False}, {"recursive": True, "maxDepth": 1}):
+        for mode in ("full", "summary", "estimate"):
+            result = handle_scan_reserved_names({**base, **extra, "mode": mode}, roots, store, token_secret)
+            assert result["ok"], result
+            stats = result["result"]["stats"]
+            if mode == "full":
+                paths = {f["relativePath"] for f in result["result"]["findings"]}
+                expected = {"AUX"} if not extra["recursive"] else {"AUX", os.path.join("sub", "AUX")}
+                assert paths == expected
+            if mode == "estimate":
+                flagged = result["result"]["estimate"]["flagged"]["estimate"]
+            else:
+                flagged = stats["flagged"]
+            assert flagged == (1 if not extra["recursive"] else 2), (extra, mode)
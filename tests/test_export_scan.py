@@ -0,0 +1,95 @@
+"""Tests for streaming scan export to NDJSON/CSV files."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+
+import pytest
+
+from nullout import tools
+from nullout.export import CSV_COLUMNS, export_file_name
+from nullout.tools import handle_export_scan, handle_scan_reserved_names
+from nullout.win_paths import to_extended_path
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    d = tmp_path / "exports"
+    d.mkdir()
+    monkeypatch.setattr(tools, "export_dir_ref", str(d))
+    return d
+
+
+def _populate(td: str, n: int = 5) -> None:
+    for i in range(n):
+        sub = os.path.join(td, f"d{i}")
+        os.makedirs(to_extended_path(sub))
+        with open(to_extended_path(os.path.join(sub, f"COM{i + 1}.log")), "w") as f:
+            f.write("x")
+
+
+BASE = {"rootId": "root_test", "recursive": True, "includeDirs": False}
+
+
+def test_ndjson_export(temp_root, store, export_dir):
+    td, roots = temp_root
+    _populate(td)
+    result = handle_export_scan(BASE, roots, store)
+    assert result["ok"], result
+    export = result["result"]["export"]
+    assert "findings" not in result["result"]
+    assert export["rows"] == 5
+    assert os.path.dirname(export["path"]) == str(export_dir)
+
+    data = open(export["path"], "rb").read()
+    assert hashlib.sha256(data).hexdigest() == export["sha256"]
+    rows = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+    assert sorted(r["name"] for r in rows) == [f"COM{i + 1}.log" for i in range(5)]
+    # Exported findings stay actionable
+    assert all(store.get_finding(r["findingId"]) for r in rows)
+    assert not any(p.name.endswith(".partial") for p in export_dir.iterdir())
+
+
+def test_gzip_csv_export_via_scan_option(temp_root, store, token_secret, export_dir):
+    td, roots = temp_root
+    _populate(td, 3)
+    result = handle_scan_reserved_names(
+        {**BASE, "export": {"format": "csv", "gzip": True, "fileName": "hazards.csv.gz"}},
+        roots, store, token_secret,
+    )
+    assert result["ok"], result
+    export = result["result"]["export"]
+    assert export["path"] == str(export_dir / "hazards.csv.gz")
+    raw = open(export["path"], "rb").read()
+    assert hashlib.sha256(raw).hexdigest() == export["sha256"]
+    rows = list(csv.reader(io.StringIO(gzip.decompress(raw).decode("utf-8"))))
+    assert rows[0] == CSV_COLUMNS
+    assert len(rows) == 1 + 3
+    assert {r[CSV_COLUMNS.index("hazardCodes")] for r in rows[1:]} == {"WIN_RESERVED_DEVICE_BASENAME"}
+
+
+def test_export_requires_configured_dir(temp_root, store, monkeypatch):
+    _, roots = temp_root
+    monkeypatch.setattr(tools, "export_dir_ref", None)
+    result = handle_export_scan(BASE, roots, store)
+    assert not result["ok"]
+    assert result["error"]["code"] == "E_EXPORT_NOT_CONFIGURED"
+
+
+@pytest.mark.parametrize("name", ["../escape.ndjson", "sub/x.ndjson", "..", ""])
+def test_export_file_name_must_be_plain(name):
+    with pytest.raises(ValueError):
+        export_file_name("scan_1", "ndjson", False, name)
+
+
+def test_export_rejects_bad_file_name(temp_root, store, export_dir):
+    _, roots = temp_root
+    result = handle_export_scan({**BASE, "fileName": "../x.ndjson"}, roots, store)
+    assert not result["ok"]
+    assert result["error"]["code"] == "E_INVALID_REQUEST"
+    assert list(export_dir.iterdir()) == []
@@ -0,0 +1,118 @@
+"""Tests for history-guided (prioritized) traversal."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from nullout import heat
+from nullout.heat import HINT_SCORE, HeatMaps, TraversalHints
+from nullout.tools import handle_resume_scan, handle_scan_reserved_names
+
+HOT = ["NUL.txt", "CON.txt", "AUX.txt", "PRN.txt", "COM1.txt"]
+
+
+@pytest.fixture(autouse=True)
+def heat_maps(monkeypatch):
+    maps = HeatMaps()
+    monkeypatch.setattr(heat, "heat_ref", maps)
+    return maps
+
+
+def _tree(td, hot_dir="zz_hot", cold=20):
+    for i in range(cold):
+        os.makedirs(os.path.join(td, f"d{i:02}"))
+        with open(os.path.join(td, f"d{i:02}", "plain.txt"), "w") as f:
+            f.write("x")
+    os.makedirs(os.path.join(td, hot_dir))
+    for name in HOT:
+        with open(os.path.join(td, hot_dir, name), "w") as f:
+            f.write("x")
+
+
+def _scan(roots, store, token_secret, **extra):
+    args = {"rootId": "root_test", "recursive": True, "includeDirs": False, "maxWorkersPerDevice": 1, **extra}
+    return handle_scan_reserved_names(args, roots, store, token_secret)["result"]
+
+
+def test_hot_directory_is_walked_first(temp_root, store, token_secret, heat_maps):
+    td, roots = temp_root
+    _tree(td)
+    full = _scan(roots, store, token_secret, prioritize=True)
+    assert full["stats"]["flagged"] == len(HOT)
+    assert heat_maps.get(td).own == {"zz_hot": len(HOT)}
+
+    page = _scan(roots, store, token_secret, prioritize=True, maxFindings=1)
+    assert sorted(f["name"] for f in page["findings"]) == sorted(HOT)
+    assert page["stats"]["pendingDirectories"] == 20
+    assert page["stats"]["firstFindingMs"] is not None
+
+    # The continuation keeps the ordering and covers the rest exactly once
+    rest = handle_resume_scan(
+        {"continuationToken": page["continuationToken"], "maxWorkersPerDevice": 1}, roots, store, token_secret,
+    )["result"]
+    assert rest["continuationToken"] is None
+    assert rest["findings"] == []
+    assert page["stats"]["visited"] + rest["stats"]["visited"] == full["stats"]["visited"]
+
+
+def test_name_hint_without_history(temp_root, store, token_secret):
+    td, roots = temp_root
+    _tree(td, hot_dir="rootfs")
+    page = _scan(roots, store, token_secret, prioritize=True, maxVisited=22)
+    assert {f["name"] for f in page["findings"]} == set(HOT)
+    assert page["stats"]["pendingDirectories"] == 20
+
+
+def test_clean_scan_has_no_first_finding(temp_root, store, token_secret, heat_maps):
+    td, roots = temp_root
+    with open(os.path.join(td, "plain.txt"), "w") as f:
+        f.write("x")
+    assert _scan(roots, store, token_secret)["stats"]["firstFindingMs"] is None
+    assert heat_maps.get(td) is None
+
+
+def test_unprioritized_walks_record_nothing_without_a_map(temp_root, store, token_secret, heat_maps):
+    td, roots = temp_root
+    _tree(td)
+    assert _scan(roots, store, token_secret)["stats"]["flagged"] == len(HOT)
+    assert _scan(roots, store, token_secret, mode="summary")["stats"]["flagged"] == len(HOT)
+    assert heat_maps.get(td) is None
+
+    # Once a prioritized walk made a map, plain walks keep it current
+    _scan(roots, store, token_secret, prioritize=True)
+    os.remove(os.path.join(td, "zz_hot", "NUL.txt"))
+    _scan(roots, store, token_secret, mode="summary")
+    assert heat_maps.get(td).own == {"zz_hot": len(HOT) - 1}
+
+
+def test_recorded_directories_are_capped(temp_root, store, token_secret, heat_maps, monkeypatch):
+    td, roots = temp_root
+    monkeypatch.setattr(heat, "MAX_HOT_DIRECTORIES", 2)
+    for i in range(6):
+        os.makedirs(os.path.join(td, f"d{i}"))
+        for name in HOT[: i % len(HOT) + 1]:
+            with open(os.path.join(td, f"d{i}", name), "w") as f:
+                f.write("x")
+    _scan(roots, store, token_secret, prioritize=True)
+    assert heat_maps.get(td).own == {"d4": 5, "d3": 4}
+
+
+def test_partial_walks_merge_and_complete_walks_replace():
+    maps = HeatMaps()
+    sep = os.sep
+    maps.learn("/r", {f"a{sep}b": 3, "c": 1}, complete=True)
+    hints = maps.hints_for("/r")
+    assert hints.score("a", "a", 10) == 3
+    assert hints.score("", "", 1) == 4
+
+    maps.learn("/r", {"c": 5}, complete=False)
+    assert maps.get("/r").own == {f"a{sep}b": 3, "c": 5}
+    maps.learn("/r", {"d": 2}, complete=True)
+    assert maps.get("/r").own == {"d": 2}
+
+    cold = TraversalHints(None)
+    assert cold.score("x", "node_modules", 10) == HINT_SCORE
+    assert cold.score("x", "x", 300) == HINT_SCORE
+    assert cold.priority("x", "x", 10) == 0
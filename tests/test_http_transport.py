@@ -0,0 +1,182 @@
+"""Tests for the localhost streamable HTTP transport."""
+
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+from nullout.http_transport import SESSION_HEADER, NullOutHTTPServer
+from nullout.server import NullOutServer
+
+HTTP_TOKEN = b"test-http-token"
+
+
+@pytest.fixture
+def http_server(temp_root, store, token_secret):
+    td, roots = temp_root
+    httpd = NullOutHTTPServer(NullOutServer(roots, store, token_secret), HTTP_TOKEN)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield td, httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _connect(httpd) -> http.client.HTTPConnection:
+    host, port = httpd.server_address[:2]
+    return http.client.HTTPConnection(host, port, timeout=10)
+
+
+def _post(conn, payload, session=None, headers=None):
+    h = {
+        "Content-Type": "application/json",
+        "Accept": "application/json, text/event-stream",
+        "Authorization": "Bearer " + HTTP_TOKEN.decode(),
+    }
+    if session:
+        h[SESSION_HEADER] = session
+    h.update(headers or {})
+    conn.request("POST", "/mcp", body=json.dumps(payload), headers=h)
+    resp = conn.getresponse()
+    body = resp.read()
+    if resp.getheader("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return resp, (json.loads(body) if body else None)
+
+
+def _initialize(conn) -> str:
+    resp, body = _post(conn, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+    assert resp.status == 200
+    assert body["result"]["capabilities"] == {"tools": {}}
+    return resp.getheader(SESSION_HEADER)
+
+
+def test_session_issued_and_reused_on_keep_alive(http_server):
+    _, httpd = http_server
+    conn = _connect(httpd)
+    session = _initialize(conn)
+    assert session
+
+    resp, body = _post(conn, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}, session)
+    assert resp.status == 200
+    assert resp.getheader(SESSION_HEADER) == session
+    assert any(t["name"] == "scan_reserved_names" for t in body["result"]["tools"])
+    conn.close()
+
+
+def test_unknown_and_ended_sessions_are_rejected(http_server):
+    _, httpd = http_server
+    conn = _connect(httpd)
+    resp, _ = _post(conn, {"jsonrpc": "2.0", "id": 1, "method": "tools/list"}, "not-a-session")
+    assert resp.status == 404
+
+    session = _initialize(conn)
+    conn.request("DELETE", "/mcp", headers={SESSION_HEADER: session, "Authorization": "Bearer " + HTTP_TOKEN.decode()})
+    resp = conn.getresponse()
+    resp.read()
+    assert resp.status == 204
+
+    resp, _ = _post(conn, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}, session)
+    assert resp.status == 404
+    conn.close()
+
+
+def test_notification_and_batch(http_server):
+    _, httpd = http_server
+    conn = _connect(httpd)
+    session = _initialize(conn)
+
+    resp, body = _post(conn, {"jsonrpc": "2.0", "method": "notifications/initialized"}, session)
+    assert resp.status == 202
+    assert body is None
+
+    resp, body = _post(conn, [
+        {"jsonrpc": "2.0", "id": "a", "method": "get_server_info"},
+        {"jsonrpc": "2.0", "id": "b", "method": "no_such_tool"},
+    ], session)
+    assert [r["id"] for r in body] == ["a", "b"]
+    assert body[1]["error"]["code"] == -32601
+    conn.close()
+
+
+def test_large_responses_are_gzipped(http_server):
+    _, httpd = http_server
+    conn = _connect(httpd)
+    session = _initialize(conn)
+    resp, body = _post(
+        conn, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}, session,
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert resp.getheader("Content-Encoding") == "gzip"
+    assert body["result"]["tools"]
+    conn.close()
+
+
+def test_foreign_origin_rejected(http_server):
+    _, httpd = http_server
+    conn = _connect(httpd)
+    resp, _ = _post(
+        conn, {"jsonrpc": "2.0", "id": 1, "method": "initialize"},
+        headers={"Origin": "http://evil.example"},
+    )
+    assert resp.status == 403
+    conn.close()
+
+
+@pytest.mark.parametrize("auth", [None, "Bearer wrong-token", "Basic " + HTTP_TOKEN.decode()])
+def test_unauthenticated_request_rejected(http_server, auth):
+    _, httpd = http_server
+    conn = _connect(httpd)
+    h = {"Content-Type": "application/json"}
+    if auth is not None:
+        h["Authorization"] = auth
+    conn.request("POST", "/mcp", body=json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/list"}), headers=h)
+    resp = conn.getresponse()
+    resp.read()
+    assert resp.status == 401
+    assert resp.getheader("WWW-Authenticate") == "Bearer"
+    assert resp.getheader(SESSION_HEADER) is None
+    conn.close()
+
+
+def test_http_token_required(monkeypatch):
+    from nullout.config import get_http_token
+
+    monkeypatch.delenv("NULLOUT_HTTP_TOKEN", raising=False)
+    with pytest.raises(RuntimeError):
+        get_http_token()
+    with pytest.raises(ValueError):
+        NullOutHTTPServer(None, b"")
+
+
+def test_clients_share_one_store(http_server):
+    td, httpd = http_server
+    os.makedirs(os.path.join(td, "sub"))
+    with open(os.path.join(td, "sub", "NUL.txt"), "w") as f:
+        f.write("x")
+
+    a, b = _connect(httpd), _connect(httpd)
+    session_a, session_b = _initialize(a), _initialize(b)
+    assert session_a != session_b
+
+    _, body = _post(a, {"jsonrpc": "2.0", "id": 2, "method": "scan_reserved_names", "params": {
+        "rootId": "root_test", "recursive": True, "includeDirs": False,
+    }}, session_a)
+    finding_id = body["result"]["result"]["findings"][0]["findingId"]
+
+    _, body = _post(b, {"jsonrpc": "2.0", "id": 3, "method": "get_finding", "params": {
+        "findingId": finding_id,
+    }}, session_b)
+    assert body["result"]["ok"]
+    a.close()
+    b.close()
+
+
+def test_rejects_non_loopback_bind():
+    with pytest.raises(ValueError):
+        NullOutHTTPServer(None, HTTP_TOKEN, host="0.0.0.0")
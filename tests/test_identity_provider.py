@@ -0,0 +1,80 @@
+"""Tests for enumeration-sourced identity providers."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from nullout import identity
+from nullout.tools import handle_scan_reserved_names
+from nullout.win_identity import get_identity
+from nullout.win_paths import to_extended_path
+
+
+def _entry(directory: str, name: str) -> os.DirEntry[str]:
+    with os.scandir(to_extended_path(directory)) as it:
+        return next(e for e in it if e.name == name)
+
+
+def test_scan_identities_come_from_enumeration(temp_root, store, token_secret):
+    td, roots = temp_root
+    os.makedirs(to_extended_path(os.path.join(td, "sub", "AUX")))
+    for rel in ("CON.txt", os.path.join("sub", "NUL"), os.path.join("sub", "trail.")):
+        with open(to_extended_path(os.path.join(td, rel)), "w") as f:
+            f.write("x")
+
+    result = handle_scan_reserved_names(
+        {"rootId": "root_test", "recursive": True, "includeDirs": True}, roots, store, token_secret,
+    )
+    assert result["ok"]
+    findings = result["result"]["findings"]
+    assert len(findings) == 4
+    for f in findings:
+        ident = f["evidence"]["identity"]
+        assert (ident["volumeSerial"], ident["fileId"]) == get_identity(f["observedPath"])
+    stats = result["result"]["stats"]
+    assert stats["identityFromEnumeration"] == 4
+    assert stats["identityFileOpens"] == 0
+
+
+def test_listing_failure_falls_back_to_open(temp_root, monkeypatch):
+    td, _ = temp_root
+    path = os.path.join(td, "PRN.log")
+    with open(to_extended_path(path), "w") as f:
+        f.write("x")
+
+    def fail(directory: str) -> tuple[str, dict[str, str]]:
+        raise OSError(5, "denied")
+
+    monkeypatch.setattr(identity, "list_directory_ids", fail)
+    source = identity.WindowsEnumerated(td)
+    assert source.identity(_entry(td, "PRN.log"), path) == get_identity(path)
+    assert (source.enumerated, source.opened) == (0, 1)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX-only")
+def test_posix_source_distrusts_mismatched_d_ino(temp_root):
+    td, _ = temp_root
+    path = os.path.join(td, "COM1")
+    with open(path, "w") as f:
+        f.write("x")
+
+    class SkewedEntry:
+        """DirEntry whose d_ino disagrees with lstat, as on some overlay mounts."""
+
+        def __init__(self, entry: os.DirEntry[str]) -> None:
+            self._entry = entry
+            self.name = entry.name
+
+        def inode(self) -> int:
+            return self._entry.inode() + 1
+
+        def is_dir(self, follow_symlinks: bool = True) -> bool:
+            return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+        def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+            return self._entry.stat(follow_symlinks=follow_symlinks)
+
+    source = identity.PosixEnumerated(os.stat(td).st_dev)
+    assert source.identity(SkewedEntry(_entry(td, "COM1")), path) == get_identity(path)
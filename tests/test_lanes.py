@@ -0,0 +1,110 @@
+"""Tests for per-device I/O lanes: limits config, bounded concurrency, lane stats."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import pytest
+
+from nullout.config import LaneLimits, load_lane_limits
+from nullout.lanes import DeviceScheduler
+
+
+def test_lane_limits_default(monkeypatch):
+    monkeypatch.delenv("NULLOUT_IO_LANES", raising=False)
+    limits = load_lane_limits()
+    assert limits.for_device(123) == limits.default
+
+
+def test_lane_limits_per_device_path(monkeypatch, tmp_path):
+    monkeypatch.setenv("NULLOUT_IO_LANES", f"default=2;{tmp_path}=1")
+    limits = load_lane_limits()
+    assert limits.default == 2
+    assert limits.for_device(os.stat(tmp_path).st_dev) == 1
+
+
+@pytest.mark.parametrize("raw", ["default", "default=0", "default=x", "=3"])
+def test_lane_limits_reject_malformed(monkeypatch, raw):
+    monkeypatch.setenv("NULLOUT_IO_LANES", raw)
+    with pytest.raises(RuntimeError):
+        load_lane_limits()
+
+
+def test_scheduler_bounds_concurrency_per_device():
+    """Each device lane never runs more than its limit; lanes run side by side."""
+    limits = LaneLimits(default=2, per_device={1: 1})
+    scheduler = DeviceScheduler(limits)
+    lock = threading.Lock()
+    active: dict[int, int] = {1: 0, 2: 0}
+    peak: dict[int, int] = {1: 0, 2: 0}
+
+    def task(device: int, fan_out: int) -> int:
+        with lock:
+            active[device] += 1
+            peak[device] = max(peak[device], active[device])
+        time.sleep(0.01)
+        # Children are queued before the parent finishes, like subdirectories
+        for _ in range(fan_out):
+            scheduler.submit(device, task, device, 0)
+        with lock:
+            active[device] -= 1
+        return 1
+
+    scheduler.submit(1, task, 1, 4)
+    scheduler.submit(2, task, 2, 4)
+    scheduler.wait()
+
+    assert peak[1] == 1
+    assert peak[2] == 2
+    lanes = {lane["device"]: lane for lane in scheduler.lane_stats()}
+    assert lanes["0x1"]["directories"] == 5 and lanes["0x1"]["workers"] == 1
+    assert lanes["0x2"]["entries"] == 5 and lanes["0x2"]["workers"] == 2
+
+
+def test_scheduler_runs_lower_priority_values_first():
+    scheduler = DeviceScheduler(LaneLimits(default=1))
+    gate = threading.Event()
+    order: list[str] = []
+
+    def task(name: str) -> int:
+        if name == "first":
+            gate.wait(5)
+        order.append(name)
+        return 1
+
+    scheduler.submit(0, task, "first")
+    for name, priority in [("a", 0), ("hot", -5), ("b", 0), ("warm", -1)]:
+        scheduler.submit(0, task, name, priority=priority)
+    gate.set()
+    scheduler.wait()
+    assert order == ["first", "hot", "warm", "a", "b"]
+
+
+def test_scheduler_reraises_task_error():
+    scheduler = DeviceScheduler(LaneLimits())
+
+    def boom() -> int:
+        raise ValueError("task failed")
+
+    scheduler.submit(0, boom)
+    with pytest.raises(ValueError):
+        scheduler.wait()
+
+
+def test_scan_reports_lane_stats(temp_root, store, token_secret):
+    from nullout.tools import handle_scan_reserved_names
+
+    td, roots = temp_root
+    os.makedirs(os.path.join(td, "a", "b"))
+    result = handle_scan_reserved_names(
+        {"rootId": "root_test", "recursive": True, "includeDirs": True, "maxWorkersPerDevice": 3},
+        roots, store, token_secret,
+    )
+    assert result["ok"]
+    lanes = result["result"]["stats"]["lanes"]
+    assert len(lanes) == 1
+    assert lanes[0]["workers"] == 3
+    assert lanes[0]["directories"] == 3
+    assert lanes[0]["entries"] == 2
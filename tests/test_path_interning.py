@@ -0,0 +1,63 @@
+"""Tests for findings backed by shared path nodes."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from nullout.models import Finding
+from nullout.pathtrie import PathNode
+from nullout.tools import handle_scan_reserved_names
+from nullout.win_paths import to_extended_path
+
+
+def test_findings_share_directory_nodes(temp_root, store, token_secret):
+    td, roots = temp_root
+    deep = os.path.join(td, "a", "b", "c")
+    os.makedirs(to_extended_path(deep))
+    for name in ("CON.txt", "NUL.log", "trail."):
+        with open(to_extended_path(os.path.join(deep, name)), "w") as f:
+            f.write("x")
+
+    result = handle_scan_reserved_names(
+        {"rootId": "root_test", "recursive": True, "includeDirs": False}, roots, store, token_secret,
+    )
+    assert result["ok"]
+    findings = [store.get_finding(f["findingId"]) for f in result["result"]["findings"]]
+    assert len(findings) == 3
+
+    parents = {id(f.path.parent) for f in findings}
+    assert len(parents) == 1  # one node for a/b/c, shared by all three
+
+    by_name = {f["name"]: f for f in result["result"]["findings"]}
+    con = by_name["CON.txt"]
+    assert con["relativePath"] == os.path.join("a", "b", "c", "CON.txt")
+    assert con["observedPath"] == os.path.join(deep, "CON.txt")
+    assert con["canonicalPath"] == to_extended_path(os.path.join(deep, "CON.txt"))
+    # Trailing dot is kept: paths are concatenated, never normalized
+    assert by_name["trail."]["relativePath"].endswith("trail.")
+
+
+def test_path_node_round_trip():
+    root = PathNode.root(os.path.join(os.sep, "r"))
+    node = root.descend(os.path.join("x", "y. ", "z"))
+    assert node.relative() == os.path.join("x", "y. ", "z")
+    assert node.full() == os.path.join(os.sep, "r", "x", "y. ", "z")
+    assert root.descend("") is root
+    assert root.relative() == ""
+
+
+def test_finding_keeps_dataclass_constructor():
+    args = ("fnd_1", "root_test", "scan_1", "a/NUL.txt", "/r/a/NUL.txt", "/r/a/NUL.txt", "file", "NUL.txt", "NUL", ".txt")
+    positional = Finding(*args)
+    keywords = Finding(**dict(zip(
+        ("findingId", "rootId", "scanId", "relativePath", "observedPath", "canonicalPath",
+         "entryType", "name", "baseName", "extension"),
+        args,
+    )))
+    assert positional == keywords
+    assert positional.relativePath == "a/NUL.txt" and positional.hazards == [] and positional.evidence == {}
+
+    with pytest.raises(TypeError):
+        Finding(*args[:6])  # entryType and the name fields are still required
@@ -0,0 +1,97 @@
+"""Tests for fields projection and the columnar response format."""
+
+from __future__ import annotations
+
+import json
+import os
+
+from nullout.hazards import HAZARD_CODES, hazard_from_code
+from nullout.tools import handle_get_finding, handle_scan_all_roots, handle_scan_reserved_names
+
+SCAN_ARGS = {"rootId": "root_test", "recursive": True, "includeDirs": False}
+
+
+def _build_tree(td: str) -> None:
+    for i in range(5):
+        d = os.path.join(td, f"d{i}")
+        os.makedirs(d)
+        for name in ("NUL.txt", "CON.log", "ok.txt"):
+            with open(os.path.join(d, name), "w") as f:
+                f.write("x" * i)
+
+
+def _scan(roots, store, token_secret, **extra) -> dict:
+    result = handle_scan_reserved_names({**SCAN_ARGS, **extra}, roots, store, token_secret)
+    assert result["ok"], result
+    return result["result"]
+
+
+def test_fields_project_each_finding(temp_root, store, token_secret):
+    td, roots = temp_root
+    _build_tree(td)
+    fields = ["findingId", "relativePath", "hazardCodes", "evidence.fs.sizeBytes"]
+    findings = _scan(roots, store, token_secret, fields=fields)["findings"]
+
+    assert len(findings) == 10
+    for f in findings:
+        assert list(f) == ["findingId", "relativePath", "hazardCodes", "evidence"]
+        assert f["evidence"] == {"fs": {"sizeBytes": int(f["relativePath"][1])}}
+        assert f["hazardCodes"] == ["WIN_RESERVED_DEVICE_BASENAME"]
+
+
+def test_columnar_roundtrips_to_full_findings(temp_root, store, token_secret):
+    td, roots = temp_root
+    _build_tree(td)
+    full = _scan(roots, store, token_secret)["findings"]
+    block = _scan(roots, store, token_secret, format="columnar")["findings"]
+
+    assert block["count"] == len(full)
+    codes = block["dictionaries"]["hazardCodes"]
+    assert codes == list(HAZARD_CODES)
+    rows = []
+    for i in range(block["count"]):
+        row = {field: block["columns"][field][i] for field in block["fields"]}
+        row["hazards"] = [hazard_from_code(codes[c]) for c in row["hazards"]]
+        rows.append(row)
+
+    def strip(f):  # second scan has new ids
+        return {k: v for k, v in f.items() if k not in ("findingId", "scanId")}
+
+    key = lambda f: f["relativePath"]  # noqa: E731
+    assert [strip(r) for r in sorted(rows, key=key)] == [strip(f) for f in sorted(full, key=key)]
+
+
+def test_columnar_with_fields_is_smaller(temp_root, store, token_secret):
+    td, roots = temp_root
+    _build_tree(td)
+    full = _scan(roots, store, token_secret)["findings"]
+    block = _scan(
+        roots, store, token_secret, format="columnar", fields=["findingId", "relativePath", "hazardCodes"],
+    )["findings"]
+
+    assert set(block["columns"]) == {"findingId", "relativePath", "hazardCodes"}
+    assert block["columns"]["hazardCodes"][0] == [HAZARD_CODES.index("WIN_RESERVED_DEVICE_BASENAME")]
+    assert len(json.dumps(block)) * 5 < len(json.dumps(full))
+
+
+def test_unknown_field_or_format_rejected(temp_root, store, token_secret):
+    _, roots = temp_root
+    for extra in ({"fields": ["bogus"]}, {"fields": ["hazards.code"]}, {"format": "xml"}):
+        result = handle_scan_reserved_names({**SCAN_ARGS, **extra}, roots, store, token_secret)
+        assert not result["ok"]
+        assert result["error"]["code"] == "E_INVALID_REQUEST"
+
+
+def test_get_finding_and_scan_all_roots_accept_fields(temp_root, store, token_secret):
+    td, roots = temp_root
+    _build_tree(td)
+    finding_id = _scan(roots, store, token_secret)["findings"][0]["findingId"]
+
+    result = handle_get_finding({"findingId": finding_id, "fields": ["relativePath", "evidence.identity"]}, store)
+    assert set(result["result"]["finding"]) == {"relativePath", "evidence"}
+    assert set(result["result"]["finding"]["evidence"]) == {"identity"}
+
+    result = handle_scan_all_roots(
+        {"recursive": True, "includeDirs": False, "format": "columnar", "fields": ["findingId"]}, roots, store,
+    )
+    assert result["result"]["scans"][0]["findings"]["count"] == 10
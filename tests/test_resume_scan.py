@@ -0,0 +1,94 @@
+"""Tests for budget-limited scans and resume_scan continuation tokens."""
+
+from __future__ import annotations
+
+import os
+
+from nullout.tools import handle_resume_scan, handle_scan_reserved_names
+from nullout.win_paths import to_extended_path
+
+
+def _build_tree(td: str) -> set[str]:
+    """Create 3 levels of directories, each holding one hazardous file."""
+    expected: set[str] = set()
+    for a in range(3):
+        for b in range(3):
+            d = os.path.join(td, f"d{a}", f"d{a}{b}")
+            os.makedirs(to_extended_path(d))
+            for rel in (os.path.join(f"d{a}", f"CON.{a}"), os.path.join(f"d{a}", f"d{a}{b}", f"NUL.{a}{b}")):
+                with open(to_extended_path(os.path.join(td, rel)), "w") as f:
+                    f.write("x")
+                expected.add(rel)
+    return expected
+
+
+SCAN_ARGS = {"rootId": "root_test", "recursive": True, "includeDirs": False}
+
+
+def test_full_scan_has_no_continuation(temp_root, store, token_secret):
+    td, roots = temp_root
+    expected = _build_tree(td)
+    result = handle_scan_reserved_names(SCAN_ARGS, roots, store, token_secret)
+    assert result["ok"]
+    assert result["result"]["continuationToken"] is None
+    assert result["result"]["stats"]["complete"] is True
+    assert {f["relativePath"] for f in result["result"]["findings"]} == expected
+
+
+def test_resumes_cover_root_exactly_once(temp_root, store, token_secret):
+    td, roots = temp_root
+    expected = _build_tree(td)
+
+    result = handle_scan_reserved_names({**SCAN_ARGS, "maxVisited": 1}, roots, store, token_secret)
+    assert result["ok"]
+    scan_id = result["result"]["scanId"]
+    stats = result["result"]["stats"]
+    assert stats["complete"] is False
+    assert stats["stopReason"] == "maxVisited"
+    assert stats["pendingDirectories"] > 0
+
+    seen = [f["relativePath"] for f in result["result"]["findings"]]
+    visited = result["result"]["stats"]["visited"]
+    hops = 0
+    while result["result"]["continuationToken"]:
+        hops += 1
+        assert hops < 50
+        result = handle_resume_scan(
+            {"continuationToken": result["result"]["continuationToken"], "maxVisited": 1},
+            roots, store, token_secret,
+        )
+        assert result["ok"], result
+        assert result["result"]["scanId"] == scan_id
+        seen.extend(f["relativePath"] for f in result["result"]["findings"])
+        visited += result["result"]["stats"]["visited"]
+
+    assert hops > 1
+    assert sorted(seen) == sorted(expected)  # no duplicates, nothing missed
+    assert visited == 3 + 3 * 4 + 9  # every entry enumerated once
+    assert len(store.get_scan_findings(scan_id)) == len(expected)
+
+
+def test_max_findings_stops_between_directories(temp_root, store, token_secret):
+    td, roots = temp_root
+    _build_tree(td)
+    result = handle_scan_reserved_names(
+        {**SCAN_ARGS, "maxFindings": 1, "maxWorkersPerDevice": 1}, roots, store, token_secret,
+    )
+    assert result["ok"]
+    assert result["result"]["stats"]["stopReason"] == "maxFindings"
+    assert result["result"]["continuationToken"]
+
+
+def test_tampered_continuation_rejected(temp_root, store, token_secret):
+    td, roots = temp_root
+    _build_tree(td)
+    result = handle_scan_reserved_names({**SCAN_ARGS, "maxVisited": 1}, roots, store, token_secret)
+    token = result["result"]["continuationToken"]
+
+    bad = handle_resume_scan({"continuationToken": token}, roots, store, b"other-secret")
+    assert not bad["ok"]
+    assert bad["error"]["code"] == "E_CONTINUATION_TOKEN_INVALID"
+
+    body, sig = token.split(".", 1)
+    forged = handle_resume_scan({"continuationToken": f"{body}.{sig[::-1]}"}, roots, store, token_secret)
+    assert not forged["ok"]
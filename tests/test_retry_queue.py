@@ -0,0 +1,168 @@
+"""Tests for deferOnInUse and the background deletion retry queue."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import pytest
+
+from nullout import retry, tools
+from nullout.audit import AuditJournal, read_journal
+from nullout.retry import RetryQueue
+from nullout.server import shutdown
+from nullout.store import Store
+from nullout.tools import (
+    handle_delete_entry,
+    handle_get_pending_deletions,
+    handle_plan_cleanup,
+    handle_scan_reserved_names,
+)
+
+
+class _InUse(OSError):
+    winerror = 32
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    q = RetryQueue(max_attempts=4, base_delay_ms=5, max_delay_ms=20)
+    monkeypatch.setattr(retry, "queue_ref", q)
+    yield q
+    q.stop()
+
+
+@pytest.fixture
+def locked(monkeypatch):
+    """Make the next N removes fail with a sharing violation (winerror 32)."""
+    state = {"failures": 0, "removes": 0}
+    real_open = tools.open_entry
+
+    def open_entry(*args, **kwargs):
+        target = real_open(*args, **kwargs)
+        real_remove = target.remove
+
+        def remove(is_dir):
+            state["removes"] += 1
+            if state["failures"] > 0:
+                state["failures"] -= 1
+                raise _InUse(13, "in use")
+            return real_remove(is_dir)
+
+        target.remove = remove
+        return target
+
+    monkeypatch.setattr(tools, "open_entry", open_entry)
+    return state
+
+
+def _finding(td, roots, store, token_secret, name="NUL.txt"):
+    with open(os.path.join(td, name), "w") as f:
+        f.write("x")
+    scan = handle_scan_reserved_names(
+        {"rootId": "root_test", "recursive": False, "includeDirs": False}, roots, store, token_secret,
+    )
+    finding = next(f for f in scan["result"]["findings"] if f["name"] == name)
+    plan = handle_plan_cleanup({"findingIds": [finding["findingId"]], "requestedActions": ["DELETE"]}, store,
+                               token_secret)
+    return finding, plan["result"]["entries"][0]["confirmToken"]
+
+
+def _wait_finished(finding_id: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        entry = handle_get_pending_deletions({"findingIds": [finding_id]})["result"]["deletions"][0]
+        if entry["status"] != "pending" or time.monotonic() > deadline:
+            return entry
+        time.sleep(0.01)
+
+
+def test_deferred_delete_succeeds_after_retries(temp_root, store, token_secret, queue, locked):
+    td, roots = temp_root
+    finding, token = _finding(td, roots, store, token_secret)
+    locked["failures"] = 2
+
+    args = {"findingId": finding["findingId"], "confirmToken": token, "deferOnInUse": True}
+    result = handle_delete_entry(args, roots, store, token_secret)
+    assert result["ok"]
+    assert result["result"]["deferred"] is True
+    assert result["result"]["pending"]["status"] == "pending"
+    assert result["result"]["pending"]["lastError"]["code"] == "E_IN_USE"
+
+    entry = _wait_finished(finding["findingId"])
+    assert entry["status"] == "deleted"
+    assert entry["attempts"] == 3
+    assert locked["removes"] == 3
+    assert not os.path.exists(finding["observedPath"])
+    assert handle_get_pending_deletions({})["result"]["counts"] == {"pending": 0, "deleted": 1, "failed": 0}
+
+
+def test_gives_up_after_max_attempts(temp_root, store, token_secret, queue, locked):
+    td, roots = temp_root
+    finding, token = _finding(td, roots, store, token_secret)
+    locked["failures"] = 100
+
+    args = {"findingId": finding["findingId"], "confirmToken": token, "deferOnInUse": True}
+    handle_delete_entry(args, roots, store, token_secret)
+    entry = _wait_finished(finding["findingId"])
+    assert entry["status"] == "failed"
+    assert entry["attempts"] == 4
+    assert entry["lastError"]["code"] == "E_IN_USE"
+    assert os.path.exists(finding["observedPath"])
+
+
+def test_retry_rechecks_identity(temp_root, store, token_secret, queue, locked):
+    td, roots = temp_root
+    finding, token = _finding(td, roots, store, token_secret)
+    locked["failures"] = 1
+    queue.base_delay_ms = 200  # time to swap the file before the first retry
+
+    args = {"findingId": finding["findingId"], "confirmToken": token, "deferOnInUse": True}
+    handle_delete_entry(args, roots, store, token_secret)
+    os.remove(finding["observedPath"])
+    with open(os.path.join(td, "other"), "w") as f:
+        f.write("y")  # keep the old inode number from being reused right away
+    with open(finding["observedPath"], "w") as f:
+        f.write("replacement")
+
+    entry = _wait_finished(finding["findingId"])
+    assert entry["status"] == "failed"
+    assert entry["lastError"]["code"] == "E_CHANGED_SINCE_SCAN"
+    assert os.path.exists(finding["observedPath"])
+
+
+def test_without_flag_in_use_is_returned(temp_root, store, token_secret, queue, locked):
+    td, roots = temp_root
+    finding, token = _finding(td, roots, store, token_secret)
+    locked["failures"] = 1
+    result = handle_delete_entry({"findingId": finding["findingId"], "confirmToken": token}, roots, store,
+                                 token_secret)
+    assert result["error"]["code"] == "E_IN_USE"
+    assert handle_get_pending_deletions({})["result"]["deletions"] == []
+
+
+def test_backoff_grows_and_is_capped():
+    q = RetryQueue(base_delay_ms=100, max_delay_ms=1000)
+    for attempts, full in [(1, 0.1), (2, 0.2), (3, 0.4), (10, 1.0)]:
+        delay = q.delay_s(attempts)
+        assert full / 2 <= delay <= full
+
+
+def test_shutdown_waits_for_running_retry(tmp_path, monkeypatch):
+    q = RetryQueue(base_delay_ms=1, max_delay_ms=1)
+    monkeypatch.setattr(retry, "queue_ref", q)
+    journal = AuditJournal(str(tmp_path), max_bytes=1024**2)
+    started = threading.Event()
+
+    def attempt():
+        started.set()
+        time.sleep(0.1)  # still running when shutdown begins
+        journal.append("delete_outcome", findingId="fnd_1", ok=True)
+        return {"ok": True}
+
+    q.add("fnd_1", str(tmp_path / "x"), attempt, {"code": "E_IN_USE"})
+    assert started.wait(5)
+    shutdown(Store(), journal)
+    assert [r["event"] for r in read_journal(str(tmp_path))] == ["delete_outcome"]
+    assert q.entries()[0]["status"] == "deleted"
@@ -32,6 +32,7 @@ def test_traversal_escape(tmp_path):
     assert not is_under_root(escape, root)
 
 
+@pytest.mark.skipif(os.name != "nt", reason="Windows-only")
 def test_case_insensitive(tmp_path):
     root = str(tmp_path)
     # Windows paths are case-insensitive
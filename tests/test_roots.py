@@ -0,0 +1,120 @@
+"""Tests for the roots file, per-root policy and hot reload."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from nullout import tools
+from nullout.config import Root
+from nullout.roots import RootRegistry, load_roots_file
+from nullout.tools import handle_list_allowed_roots, handle_scan_reserved_names
+
+
+def _write(path, doc) -> str:
+    path.write_text(json.dumps(doc) if not isinstance(doc, str) else doc, encoding="utf-8")
+    return str(path)
+
+
+def _tree(tmp_path, name: str) -> str:
+    root = tmp_path / name
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "CON").write_text("x")
+    (root / "a" / "b" / "NUL.txt").write_text("x")
+    return str(root)
+
+
+def test_json_file_with_policy(tmp_path, monkeypatch, store):
+    monkeypatch.setenv("NULLOUT_EXCLUDES", "node_modules")
+    a, b = _tree(tmp_path, "a"), _tree(tmp_path, "b")
+    path = _write(tmp_path / "roots.json", {"roots": [
+        {"id": "tenant-a", "path": a, "name": "Tenant A", "excludes": [".git"], "maxDepth": 1,
+         "maxWorkersPerDevice": 2},
+        {"path": b},
+    ]})
+    roots = load_roots_file(path)
+    assert list(roots) == ["tenant-a", "root_1"]
+    tenant = roots["tenant-a"]
+    assert tenant.display_name == "Tenant A"
+    assert tenant.excludes == ("node_modules", ".git")
+    assert (tenant.max_depth, tenant.max_workers_per_device) == (1, 2)
+
+    listed = handle_list_allowed_roots({}, roots)["result"]["roots"]
+    assert listed[0]["maxDepth"] == 1 and listed[1]["maxDepth"] == 50
+
+    # The root's maxDepth is the default; the request can still override it
+    scan = {"rootId": "tenant-a", "recursive": True, "includeDirs": False}
+    shallow = handle_scan_reserved_names(scan, roots, store, b"s")["result"]["findings"]
+    assert [f["relativePath"] for f in shallow] == ["CON"]
+    deep = handle_scan_reserved_names({**scan, "maxDepth": 5}, roots, store, b"s")["result"]["findings"]
+    assert len(deep) == 2
+
+
+def test_toml_file(tmp_path):
+    pytest.importorskip("tomllib")
+    a = _tree(tmp_path, "a")
+    path = _write(tmp_path / "roots.toml", f"[[roots]]\nid = \"t\"\npath = '{a}'\nmaxDepth = 3\n")
+    assert load_roots_file(path)["t"].max_depth == 3
+
+
+@pytest.mark.parametrize("doc,message", [
+    ({"roots": []}, "lists no roots"),
+    ({"roots": [{"path": "MISSING"}]}, "does not exist"),
+    ({"roots": [{"id": "x", "path": "."}, {"id": "x", "path": "."}]}, "duplicate root id"),
+    ({"roots": [{"path": ".", "maxDepth": 0}]}, "positive integer"),
+    ({"roots": [{"path": ".", "exclude": ["x"]}]}, "unknown keys"),
+    ("{not json", "Invalid roots file"),
+])
+def test_invalid_files(tmp_path, monkeypatch, doc, message):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(RuntimeError, match=message):
+        load_roots_file(_write(tmp_path / "roots.json", doc))
+
+
+def test_reload_swaps_roots_and_keeps_them_on_error(tmp_path):
+    a, b = _tree(tmp_path, "a"), _tree(tmp_path, "b")
+    path = tmp_path / "roots.json"
+    _write(path, [{"id": "a", "path": a}])
+    registry = RootRegistry.from_file(str(path))
+    assert list(registry) == ["a"]
+    assert not registry.reload_if_changed()
+
+    _write(path, [{"id": "a", "path": a}, {"id": "b", "path": b}])
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert registry.reload_if_changed()
+    assert sorted(registry) == ["a", "b"] and registry.generation == 1
+
+    _write(path, [{"id": "c", "path": str(tmp_path / "gone")}])
+    assert not registry.reload()
+    assert sorted(registry) == ["a", "b"]
+
+
+def test_scan_all_roots_uses_one_generation(tmp_path, store, monkeypatch):
+    a, b = _tree(tmp_path, "a"), _tree(tmp_path, "b")
+    path = tmp_path / "roots.json"
+    _write(path, [{"id": "a", "path": a}])
+    registry = RootRegistry.from_file(str(path))
+    _write(path, [{"id": "b", "path": b, "maxDepth": 1}])
+
+    scan_options = tools._scan_options
+
+    def reload_midway(args, root=None):
+        registry.reload()  # a hot reload while the request is running
+        return scan_options(args, root)
+
+    monkeypatch.setattr(tools, "_scan_options", reload_midway)
+    result = tools.handle_scan_all_roots({"recursive": True, "includeDirs": True}, registry, store)
+    assert result["ok"], result
+    assert [s["rootId"] for s in result["result"]["scans"]] == ["a"]
+    assert list(registry) == ["b"]
+
+
+def test_root_contains_uses_precomputed_prefix(tmp_path):
+    root = Root("r", "r", str(tmp_path / "data"))
+    assert root.prefix.endswith(os.sep)
+    assert root.contains(str(tmp_path / "data"))
+    assert root.contains(str(tmp_path / "data" / "x" / ".." / "y"))
+    assert not root.contains(str(tmp_path / "data2"))
+    assert not root.contains(str(tmp_path / "data" / ".." / "other"))
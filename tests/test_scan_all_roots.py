@@ -0,0 +1,135 @@
+"""Tests for scan_all_roots: nested/duplicate root dedupe and attribution."""
+
+from __future__ import annotations
+
+import os
+
+from nullout.config import Root
+from nullout.hazards import MAX_PATH_LEGACY
+from nullout.scanner import layout_roots
+from nullout.tools import handle_expand_finding, handle_scan_all_roots
+from nullout.win_paths import to_extended_path
+
+
+def _touch(path: str) -> None:
+    with open(to_extended_path(path), "w") as f:
+        f.write("x")
+
+
+def _nested_roots(td: str) -> dict[str, Root]:
+    inner = os.path.join(td, "inner")
+    os.makedirs(to_extended_path(os.path.join(inner, "deep")))
+    return {
+        "root_outer": Root(root_id="root_outer", display_name="Outer", path=td),
+        "root_inner": Root(root_id="root_inner", display_name="Inner", path=inner),
+        "root_dup": Root(root_id="root_dup", display_name="Dup", path=td),
+    }
+
+
+def test_layout_detects_nesting_and_duplicates(tmp_path):
+    roots = _nested_roots(str(tmp_path))
+    layout = layout_roots(roots)
+
+    assert layout.scan_order == ["root_outer", "root_inner"]
+    assert layout.duplicates == {"root_dup": "root_outer"}
+    assert list(layout.prune["root_outer"].values()) == ["root_inner"]
+    assert layout.prune["root_inner"] == {}
+
+
+def test_sibling_roots_are_not_nested(tmp_path):
+    a = tmp_path / "a"
+    ab = tmp_path / "ab"
+    a.mkdir()
+    ab.mkdir()
+    roots = {
+        "root_a": Root(root_id="root_a", display_name="a", path=str(a)),
+        "root_ab": Root(root_id="root_ab", display_name="ab", path=str(ab)),
+    }
+    layout = layout_roots(roots)
+    assert layout.prune == {"root_a": {}, "root_ab": {}}
+
+
+def test_scan_all_roots_walks_shared_subtree_once(temp_root, store):
+    td, _ = temp_root
+    roots = _nested_roots(td)
+    _touch(os.path.join(td, "CON.txt"))
+    _touch(os.path.join(td, "inner", "NUL.txt"))
+    _touch(os.path.join(td, "inner", "deep", "AUX"))
+
+    result = handle_scan_all_roots({"recursive": True, "includeDirs": True}, roots, store)
+    assert result["ok"], result
+
+    scans = {s["rootId"]: s for s in result["result"]["scans"]}
+    assert set(scans) == {"root_outer", "root_inner"}
+    assert scans["root_outer"]["scanId"] != scans["root_inner"]["scanId"]
+
+    outer_names = sorted(f["name"] for f in scans["root_outer"]["findings"])
+    inner_names = sorted(f["name"] for f in scans["root_inner"]["findings"])
+    assert outer_names == ["CON.txt"]
+    assert inner_names == ["AUX", "NUL.txt"]
+    assert scans["root_outer"]["nestedRoots"] == ["root_inner"]
+
+    # Entries under the inner root are visited by the inner walk only
+    stats = result["result"]["stats"]
+    assert stats["roots"] == 2
+    assert stats["flagged"] == 3
+    assert stats["visited"] == 2 + 3  # outer: CON.txt, inner/; inner: NUL.txt, deep/, deep/AUX
+    assert result["result"]["duplicateRoots"] == [{"rootId": "root_dup", "scannedAs": "root_outer"}]
+
+    for scan in scans.values():
+        for f in scan["findings"]:
+            stored = store.get_finding(f["findingId"])
+            assert stored is not None and stored.rootId == scan["rootId"]
+
+
+def test_per_root_depth_and_workers(tmp_path, store):
+    for name in ("shallow", "deep"):
+        os.makedirs(tmp_path / name / "a" / "b")
+        _touch(str(tmp_path / name / "a" / "b" / "NUL.txt"))
+    roots = {
+        "root_shallow": Root("root_shallow", "Shallow", str(tmp_path / "shallow"), max_depth=1,
+                             max_workers_per_device=1),
+        "root_deep": Root("root_deep", "Deep", str(tmp_path / "deep")),
+    }
+    result = handle_scan_all_roots({"recursive": True, "includeDirs": False}, roots, store)["result"]
+    flagged = {scan["rootId"]: scan["stats"]["flagged"] for scan in result["scans"]}
+    assert flagged == {"root_shallow": 0, "root_deep": 1}
+    own_lanes = [lane for lane in result["stats"]["lanes"] if lane.get("rootId") == "root_shallow"]
+    assert own_lanes and all(lane["workers"] == 1 for lane in own_lanes)
+
+    # Request values still win over the root's defaults
+    args = {"recursive": True, "includeDirs": False, "maxDepth": 5, "maxWorkersPerDevice": 2}
+    result = handle_scan_all_roots(args, roots, store)["result"]
+    assert {scan["rootId"]: scan["stats"]["flagged"] for scan in result["scans"]} == {
+        "root_shallow": 1, "root_deep": 1,
+    }
+    assert all("rootId" not in lane and lane["workers"] == 2 for lane in result["stats"]["lanes"])
+
+
+def test_nested_root_inside_collapsed_subtree_is_counted_once(tmp_path, store, token_secret):
+    td = str(tmp_path)
+    long_dir = td
+    while len(to_extended_path(long_dir)) <= MAX_PATH_LEGACY:
+        long_dir = os.path.join(long_dir, "d" * 100)
+    inner = os.path.join(long_dir, "inner")
+    os.makedirs(to_extended_path(inner))
+    _touch(os.path.join(long_dir, "a.txt"))
+    _touch(os.path.join(inner, "b.txt"))
+    _touch(os.path.join(inner, "c.txt"))
+    roots = {
+        "root_outer": Root(root_id="root_outer", display_name="Outer", path=td),
+        "root_inner": Root(root_id="root_inner", display_name="Inner", path=inner),
+    }
+
+    result = handle_scan_all_roots({"recursive": True, "includeDirs": True, "collapseLongPaths": True}, roots, store)
+    assert result["ok"], result
+    scans = {s["rootId"]: s for s in result["result"]["scans"]}
+    assert scans["root_outer"]["nestedRoots"] == ["root_inner"]
+    aggregate = next(f for f in scans["root_outer"]["findings"] if f["observedPath"] == long_dir)
+    assert aggregate["evidence"]["aggregate"]["descendants"] == 2  # a.txt and inner/, not inner's files
+    assert sorted(f["name"] for f in scans["root_inner"]["findings"]) == ["b.txt", "c.txt"]
+
+    # Expanding the aggregate stops at the inner root as well
+    expanded = handle_expand_finding({"findingId": aggregate["findingId"]}, roots, store, token_secret)
+    assert expanded["ok"], expanded
+    assert sorted(f["name"] for f in expanded["result"]["findings"]) == ["a.txt", "inner"]
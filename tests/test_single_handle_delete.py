@@ -0,0 +1,81 @@
+"""Tests for single-open verify-and-delete targets."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from nullout.dirfd import DIR_FD_SUPPORTED, DirFdEntry, DirFdLimiter, EntryChangedError, open_entry
+from nullout.tools import handle_delete_entry, handle_plan_cleanup, handle_scan_reserved_names
+from nullout.win_identity import get_identity
+from nullout.win_paths import to_extended_path
+
+
+def _plan_and_delete(finding: dict, roots, store, token_secret) -> dict:
+    plan = handle_plan_cleanup(
+        {"findingIds": [finding["findingId"]], "requestedActions": ["DELETE"]}, store, token_secret,
+    )
+    token = plan["result"]["entries"][0]["confirmToken"]
+    return handle_delete_entry(
+        {"findingId": finding["findingId"], "confirmToken": token}, roots, store, token_secret,
+    )
+
+
+def test_open_target_reads_identity_once(temp_root):
+    td, _ = temp_root
+    path = os.path.join(td, "CON.txt")
+    with open(to_extended_path(path), "w") as f:
+        f.write("x")
+
+    target = open_entry(path, DirFdLimiter(), is_dir=False)
+    try:
+        assert target.identity() == get_identity(path)
+        assert not target.is_reparse()
+        target.remove(is_dir=False)
+    finally:
+        target.close()
+    assert not os.path.exists(to_extended_path(path))
+
+
+def test_open_missing_target_raises(temp_root):
+    td, _ = temp_root
+    with pytest.raises(FileNotFoundError):
+        open_entry(os.path.join(td, "gone", "NUL"), DirFdLimiter(), is_dir=False)
+
+
+def test_delete_reports_single_handle(temp_root, store, token_secret):
+    td, roots = temp_root
+    os.makedirs(to_extended_path(os.path.join(td, "full.")))
+    with open(to_extended_path(os.path.join(td, "full.", "a")), "w") as f:
+        f.write("x")
+    os.makedirs(to_extended_path(os.path.join(td, "empty.")))
+
+    scan = handle_scan_reserved_names(
+        {"rootId": "root_test", "recursive": False, "includeDirs": True}, roots, store, token_secret,
+    )
+    by_name = {f["name"]: f for f in scan["result"]["findings"]}
+
+    full = _plan_and_delete(by_name["full."], roots, store, token_secret)
+    assert not full["ok"]
+    assert full["error"]["code"] == "E_DIR_NOT_EMPTY"
+
+    empty = _plan_and_delete(by_name["empty."], roots, store, token_secret)
+    assert empty["ok"], empty
+    assert empty["result"]["telemetry"]["singleHandle"] is True
+    assert not os.path.exists(to_extended_path(os.path.join(td, "empty.")))
+
+
+@pytest.mark.skipif(os.name == "nt" or not DIR_FD_SUPPORTED, reason="needs dir_fd support (POSIX)")
+def test_directory_swapped_after_check_is_detected(temp_root):
+    td, _ = temp_root
+    path = os.path.join(td, "victim")
+    os.mkdir(path)
+    target = DirFdEntry(path, DirFdLimiter())
+    try:
+        os.rename(path, os.path.join(td, "moved"))
+        os.mkdir(path)  # same name, different inode
+        with pytest.raises(EntryChangedError):
+            target.is_empty_dir()
+    finally:
+        target.close()
@@ -0,0 +1,125 @@
+"""Tests for memory-mapped columnar scan snapshots and warm restart."""
+
+from __future__ import annotations
+
+import os
+
+from nullout import tools
+from nullout.server import load_snapshots
+from nullout.snapshot import Snapshot
+from nullout.store import Store
+from nullout.tools import (
+    handle_delete_entry,
+    handle_plan_cleanup,
+    handle_save_snapshot,
+    handle_scan_reserved_names,
+)
+from nullout.win_paths import to_extended_path
+
+
+def _scan(td: str, roots, store, token_secret) -> dict:
+    os.makedirs(to_extended_path(os.path.join(td, "sub", "deep")))
+    for rel in ("CON.txt", os.path.join("sub", "NUL"), os.path.join("sub", "deep", "trail.")):
+        with open(to_extended_path(os.path.join(td, rel)), "w") as f:
+            f.write("data")
+    result = handle_scan_reserved_names(
+        {"rootId": "root_test", "recursive": True, "includeDirs": False}, roots, store, token_secret,
+    )
+    assert result["ok"]
+    return result["result"]
+
+
+def test_snapshot_round_trips_findings(temp_root, store, token_secret, tmp_path, monkeypatch):
+    td, roots = temp_root
+    scan = _scan(td, roots, store, token_secret)
+    monkeypatch.setattr(tools, "snapshot_dir_ref", str(tmp_path))
+
+    saved = handle_save_snapshot({"scanId": scan["scanId"]}, roots, store)
+    assert saved["ok"], saved
+    info = saved["result"]["snapshot"]
+    assert info["findings"] == 3
+    assert info["rows"] == 5  # three findings plus the sub and sub/deep ancestors
+
+    with Snapshot(info["path"]) as snap:
+        assert snap.scan_id == scan["scanId"]
+        assert sorted(snap.finding_ids()) == sorted(f["findingId"] for f in scan["findings"])
+        for f in scan["findings"]:
+            assert snap.get_finding(f["findingId"]).to_dict() == f
+        assert snap.get_finding("fnd_missing") is None
+        assert snap.hazard_counts() == {"WIN_RESERVED_DEVICE_BASENAME": 2, "WIN_TRAILING_DOT_SPACE": 1}
+        rows = list(snap.rows_with_hazard("WIN_TRAILING_DOT_SPACE"))
+        assert [snap.relative_path(r) for r in rows] == [os.path.join("sub", "deep", "trail.")]
+
+
+def test_warm_restart_serves_findings(temp_root, store, token_secret, tmp_path, monkeypatch):
+    td, roots = temp_root
+    scan = _scan(td, roots, store, token_secret)
+    monkeypatch.setattr(tools, "snapshot_dir_ref", str(tmp_path))
+    assert handle_save_snapshot({"scanId": scan["scanId"]}, roots, store)["ok"]
+    (tmp_path / "junk.nosnap").write_bytes(b"not a snapshot")
+
+    fresh = Store()
+    assert load_snapshots(fresh, str(tmp_path)) == 1
+    assert len(fresh.get_scan_findings(scan["scanId"])) == 3
+
+    # Identity survives the round trip, so cleanup still works after a restart
+    finding = next(f for f in scan["findings"] if f["name"] == "CON.txt")
+    plan = handle_plan_cleanup(
+        {"findingIds": [finding["findingId"]], "requestedActions": ["DELETE"]}, fresh, token_secret,
+    )
+    assert plan["ok"]
+    token = plan["result"]["entries"][0]["confirmToken"]
+    deleted = handle_delete_entry(
+        {"findingId": finding["findingId"], "confirmToken": token}, roots, fresh, token_secret,
+    )
+    assert deleted["ok"], deleted
+    assert not os.path.exists(to_extended_path(os.path.join(td, "CON.txt")))
+
+
+def test_save_snapshot_requires_configuration(temp_root, store, token_secret, monkeypatch):
+    td, roots = temp_root
+    scan = _scan(td, roots, store, token_secret)
+    monkeypatch.setattr(tools, "snapshot_dir_ref", None)
+    result = handle_save_snapshot({"scanId": scan["scanId"]}, roots, store)
+    assert not result["ok"]
+    assert result["error"]["code"] == "E_SNAPSHOT_NOT_CONFIGURED"
+
+
+def test_saving_twice_replaces_the_mapped_snapshot(temp_root, store, token_secret, tmp_path, monkeypatch):
+    td, roots = temp_root
+    scan = _scan(td, roots, store, token_secret)
+    monkeypatch.setattr(tools, "snapshot_dir_ref", str(tmp_path))
+    first = handle_save_snapshot({"scanId": scan["scanId"]}, roots, store)
+    old = store.get_snapshot(scan["scanId"])
+    second = handle_save_snapshot({"scanId": scan["scanId"]}, roots, store)
+    assert first["ok"] and second["ok"], second
+    assert old._mm.closed and store.get_snapshot(scan["scanId"]) is not old
+
+    # A store that only has the snapshot can save it again from its own mapping
+    fresh = Store()
+    assert load_snapshots(fresh, str(tmp_path)) == 1
+    again = handle_save_snapshot({"scanId": scan["scanId"]}, roots, fresh)
+    assert again["ok"], again
+    assert again["result"]["snapshot"]["findings"] == 3
+    ids = fresh.get_scan_findings(scan["scanId"])
+    assert sorted(ids) == sorted(f["findingId"] for f in scan["findings"])
+    assert fresh.get_finding(ids[0]) is not None
+
+
+def test_snapshot_keeps_recorded_order(temp_root, store, token_secret, tmp_path, monkeypatch):
+    td, roots = temp_root
+    os.makedirs(os.path.join(td, "CON"))
+    for i in range(12):  # more than 9, so findingIds do not sort in recorded order
+        with open(os.path.join(td, "CON", f"NUL.{i}"), "w") as f:
+            f.write("x")
+    scan = handle_scan_reserved_names(
+        {"rootId": "root_test", "recursive": True, "includeDirs": True}, roots, store, token_secret,
+    )["result"]
+    monkeypatch.setattr(tools, "snapshot_dir_ref", str(tmp_path))
+    assert handle_save_snapshot({"scanId": scan["scanId"]}, roots, store)["ok"]
+
+    fresh = Store()
+    assert load_snapshots(fresh, str(tmp_path)) == 1
+    recorded = store.get_scan_findings(scan["scanId"])
+    assert recorded != sorted(recorded)
+    assert fresh.get_scan_findings(scan["scanId"]) == recorded
@@ -0,0 +1,159 @@
+"""Tests for memory-budgeted scans (NULLOUT_MAX_SCAN_MEMORY spill)."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from nullout import scanner, tools
+from nullout.config import load_max_scan_memory
+from nullout.spill import ScanMemoryBudget
+from nullout.tools import (
+    handle_delete_entry,
+    handle_export_scan,
+    handle_get_finding,
+    handle_get_scan_findings,
+    handle_plan_cleanup,
+    handle_scan_reserved_names,
+)
+
+SCAN_ARGS = {"rootId": "root_test", "recursive": True, "includeDirs": False}
+TOTAL = 120
+
+
+@pytest.fixture
+def small_budget(monkeypatch):
+    monkeypatch.setattr(scanner, "scan_memory_limit_ref", 20_000)  # a few dozen findings
+
+
+def _build_tree(td: str) -> None:
+    for d in range(TOTAL // 10):
+        sub = os.path.join(td, f"d{d}")
+        os.makedirs(sub)
+        for i in range(10):
+            with open(os.path.join(sub, f"NUL.{i}"), "w") as f:
+                f.write("x")
+
+
+def test_findings_past_budget_spill(temp_root, store, token_secret, small_budget):
+    td, roots = temp_root
+    _build_tree(td)
+    result = handle_scan_reserved_names(SCAN_ARGS, roots, store, token_secret)["result"]
+
+    stats = result["stats"]
+    assert stats["flagged"] == TOTAL
+    assert 0 < stats["spilledFindings"] < TOTAL
+    assert len(result["findings"]) == TOTAL - stats["spilledFindings"]
+    assert stats["memory"]["inMemoryBytes"] <= stats["memory"]["limitBytes"]
+    assert len(store._findings) == len(result["findings"])  # spilled ones keep only an offset
+
+    # Paging returns every finding, spilled or not, each resolvable by id
+    seen, offset = [], 0
+    while offset is not None:
+        page = handle_get_scan_findings({"scanId": result["scanId"], "offset": offset, "limit": 50}, store)
+        seen.extend(page["result"]["findings"])
+        offset = page["result"]["nextOffset"]
+    assert len(seen) == TOTAL
+    assert len({f["relativePath"] for f in seen}) == TOTAL
+    spilled = [f for f in seen if store.is_spilled(f["findingId"])]
+    assert len(spilled) == stats["spilledFindings"]
+    assert handle_get_finding({"findingId": spilled[0]["findingId"]}, store)["result"]["finding"] == spilled[0]
+
+
+def test_spilled_finding_can_be_deleted(temp_root, store, token_secret, small_budget):
+    td, roots = temp_root
+    _build_tree(td)
+    result = handle_scan_reserved_names(SCAN_ARGS, roots, store, token_secret)["result"]
+    ids = store.get_scan_findings(result["scanId"])
+    spilled_id = next(i for i in ids if store.is_spilled(i))
+
+    plan = handle_plan_cleanup({"findingIds": [spilled_id], "requestedActions": ["DELETE"]}, store, token_secret)
+    entry = plan["result"]["entries"][0]
+    deleted = handle_delete_entry(
+        {"findingId": spilled_id, "confirmToken": entry["confirmToken"]}, roots, store, token_secret,
+    )
+    assert deleted["ok"], deleted
+    finding = store.get_finding(spilled_id)
+    assert not os.path.exists(finding.observedPath)
+
+
+def test_export_with_spill(temp_root, store, small_budget, tmp_path, monkeypatch):
+    td, roots = temp_root
+    _build_tree(td)
+    monkeypatch.setattr(tools, "export_dir_ref", str(tmp_path))
+    export = handle_export_scan({**SCAN_ARGS, "format": "ndjson"}, roots, store)["result"]["export"]
+    with open(export["path"], encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == TOTAL
+    assert all(store.get_finding(r["findingId"]) is not None for r in rows)
+
+
+def test_segment_is_closed_once_nothing_is_served_from_it(temp_root, store, token_secret, small_budget):
+    td, roots = temp_root
+    _build_tree(td)
+    first = handle_scan_reserved_names(SCAN_ARGS, roots, store, token_secret)["result"]
+    second = handle_scan_reserved_names(SCAN_ARGS, roots, store, token_secret)["result"]
+    ids = store.get_scan_findings(first["scanId"])
+    segment = store._spilled[next(i for i in ids if store.is_spilled(i))][0]
+    assert segment.live == first["stats"]["spilledFindings"]
+
+    store.remove_findings(first["scanId"], ids[:-1])
+    assert not segment.closed
+    store.remove_findings(first["scanId"], ids[-1:])
+    assert segment.closed
+
+    other = store._spilled[next(i for i in store.get_scan_findings(second["scanId"]) if store.is_spilled(i))][0]
+    store.close()
+    assert other.closed and not store._spilled
+
+
+def test_read_in_progress_keeps_segment_open(temp_root, store, token_secret, small_budget, monkeypatch):
+    td, roots = temp_root
+    _build_tree(td)
+    scan_id = handle_scan_reserved_names(SCAN_ARGS, roots, store, token_secret)["result"]["scanId"]
+    ids = store.get_scan_findings(scan_id)
+    spilled_id = next(i for i in ids if store.is_spilled(i))
+    segment = store._spilled[spilled_id][0]
+    read = segment.read
+
+    def racing_read(offset, length):
+        store.remove_findings(scan_id, ids)  # a watcher drops everything mid-read
+        assert not segment.closed
+        return read(offset, length)
+
+    monkeypatch.setattr(segment, "read", racing_read)
+    assert store.get_finding(spilled_id).findingId == spilled_id
+    assert segment.closed
+    assert store.get_finding(spilled_id) is None
+
+
+def test_unused_segment_is_closed_with_the_budget():
+    budget = ScanMemoryBudget(10)
+    assert not budget.charge({"findingId": "f1", "name": "NUL"})
+    segment = budget.segment
+    budget.close()
+    assert segment.closed
+
+
+def test_unlimited_by_default(temp_root, store, token_secret):
+    td, roots = temp_root
+    _build_tree(td)
+    result = handle_scan_reserved_names(SCAN_ARGS, roots, store, token_secret)["result"]
+    assert len(result["findings"]) == TOTAL
+    assert result["stats"]["spilledFindings"] == 0
+    assert "memory" not in result["stats"]
+
+
+@pytest.mark.parametrize("raw,expected", [("", 0), ("0", 0), ("4096", 4096), ("64k", 65536), ("2M", 2 * 1024**2),
+                                          ("1GB", 1024**3)])
+def test_load_max_scan_memory(monkeypatch, raw, expected):
+    monkeypatch.setenv("NULLOUT_MAX_SCAN_MEMORY", raw)
+    assert load_max_scan_memory() == expected
+
+
+def test_load_max_scan_memory_rejects_garbage(monkeypatch):
+    monkeypatch.setenv("NULLOUT_MAX_SCAN_MEMORY", "lots")
+    with pytest.raises(RuntimeError):
+        load_max_scan_memory()
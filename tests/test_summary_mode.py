@@ -0,0 +1,72 @@
+"""Tests for summary-mode scans: histograms without findings or store entries."""
+
+from __future__ import annotations
+
+import os
+
+from nullout.hazards import HAZARD_CODES
+from nullout.tools import handle_scan_reserved_names
+from nullout.win_paths import to_extended_path
+
+
+def _touch(path: str) -> None:
+    with open(to_extended_path(path), "w") as f:
+        f.write("x")
+
+
+def _build(td: str) -> None:
+    os.makedirs(to_extended_path(os.path.join(td, "hot", "NUL")))
+    _touch(os.path.join(td, "CON.txt"))
+    for i in range(3):
+        _touch(os.path.join(td, "hot", f"AUX.{i}"))
+    _touch(os.path.join(td, "hot", "trailing."))
+    _touch(os.path.join(td, "hot", "NUL", "fine.txt"))
+
+
+def test_summary_counts_match_full_scan(temp_root, store, token_secret):
+    td, roots = temp_root
+    _build(td)
+    base = {"rootId": "root_test", "recursive": True, "includeDirs": True}
+
+    full = handle_scan_reserved_names(base, roots, store, token_secret)
+    summary = handle_scan_reserved_names({**base, "mode": "summary"}, roots, store, token_secret)
+    assert full["ok"] and summary["ok"]
+
+    s = summary["result"]["summary"]
+    assert "findings" not in summary["result"]
+    assert s["hazardCodes"] == list(HAZARD_CODES)
+
+    expected = [0] * len(HAZARD_CODES)
+    for f in full["result"]["findings"]:
+        for h in f["hazards"]:
+            expected[HAZARD_CODES.index(h["code"])] += 1
+    assert s["byCode"] == expected
+    assert summary["result"]["stats"]["flagged"] == full["result"]["stats"]["flagged"] == 6
+
+    reserved = HAZARD_CODES.index("WIN_RESERVED_DEVICE_BASENAME")
+    assert s["byEntryType"]["dir"][reserved] == 1  # hot/NUL
+    assert s["byDepth"][0][reserved] == 1  # CON.txt
+    assert s["byDepth"][1][reserved] == 4  # AUX.0-2 + NUL
+    assert s["topDirectories"][0] == {"relativePath": "hot", "flagged": 5}
+
+
+def test_summary_skips_store(temp_root, store, token_secret):
+    td, roots = temp_root
+    _build(td)
+    result = handle_scan_reserved_names(
+        {"rootId": "root_test", "recursive": True, "includeDirs": True, "mode": "summary", "topDirectories": 1},
+        roots, store, token_secret,
+    )
+    assert result["ok"]
+    assert store.get_scan_findings(result["result"]["scanId"]) == []
+    assert len(result["result"]["summary"]["topDirectories"]) == 1
+
+
+def test_summary_rejects_budget(temp_root, store, token_secret):
+    _, roots = temp_root
+    result = handle_scan_reserved_names(
+        {"rootId": "root_test", "recursive": True, "includeDirs": True, "mode": "summary", "maxVisited": 5},
+        roots, store, token_secret,
+    )
+    assert not result["ok"]
+    assert result["error"]["code"] == "E_INVALID_REQUEST"
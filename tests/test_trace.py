@@ -0,0 +1,79 @@
+"""Tests for scan tracing: per-phase timings and Chrome trace files."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+
+from nullout import tools
+from nullout.trace import PHASES, ScanTrace
+from nullout.tools import handle_scan_all_roots, handle_scan_reserved_names
+
+
+def _tree(td):
+    for sub in ("a", "b", os.path.join("b", "c")):
+        os.makedirs(os.path.join(td, sub), exist_ok=True)
+        with open(os.path.join(td, sub, "NUL.txt"), "w") as f:
+            f.write("x")
+
+
+def _scan(roots, store, token_secret, **extra):
+    args = {"rootId": "root_test", "recursive": True, "includeDirs": False, **extra}
+    return handle_scan_reserved_names(args, roots, store, token_secret)
+
+
+def test_untraced_scan_has_no_phases(temp_root, store, token_secret):
+    td, roots = temp_root
+    _tree(td)
+    stats = _scan(roots, store, token_secret)["result"]["stats"]
+    assert "phasesMs" not in stats and "trace" not in stats
+
+
+def test_traced_scan_writes_chrome_trace(temp_root, store, token_secret, tmp_path, monkeypatch):
+    td, roots = temp_root
+    _tree(td)
+    monkeypatch.setattr(tools, "trace_dir_ref", str(tmp_path))
+    result = _scan(roots, store, token_secret, trace=True)["result"]
+    assert result["stats"]["flagged"] == 3
+
+    phases = result["stats"]["phasesMs"]
+    assert set(phases) == set(PHASES)
+    assert phases["enumerate"] > 0 and phases["classify"] > 0 and phases["finding"] > 0
+
+    info = result["stats"]["trace"]
+    assert os.path.dirname(info["path"]) == str(tmp_path)
+    with open(info["path"]) as f:
+        doc = json.load(f)
+    events = doc["traceEvents"]
+    dirs = sorted(e["name"] for e in events if e.get("cat") == "directory")
+    assert dirs == [".", "a", "b", os.path.join("b", "c")]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events if e.get("cat") == "directory")
+    names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert any(name.startswith("nullout-lane-") for name in names)
+    assert info["events"] == len(events) - len(names)
+
+
+def test_env_switch_traces_every_scan(temp_root, store, token_secret, monkeypatch):
+    td, roots = temp_root
+    _tree(td)
+    monkeypatch.setattr(tools, "trace_all_ref", True)
+    assert "phasesMs" in _scan(roots, store, token_secret)["result"]["stats"]
+    stats = handle_scan_all_roots({"recursive": True, "includeDirs": False}, roots, store)["result"]["stats"]
+    assert stats["phasesMs"]["serialize"] >= 0
+    assert "trace" not in stats  # no NULLOUT_TRACE_DIR
+
+
+def test_phase_time_is_exclusive_per_thread():
+    trace = ScanTrace()
+    outer = trace.timed("walk", lambda: trace.timed("identity", lambda: sum(range(20000)))())
+
+    threads = [threading.Thread(target=outer) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    phases = trace.phases_ms()
+    assert phases["identity"] > 0
+    assert set(trace.to_chrome()["otherData"]["phasesMs"]) == set(PHASES)
+    assert phases["walk"] < phases["identity"]  # the nested call is not counted twice
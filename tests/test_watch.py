@@ -0,0 +1,220 @@
+"""Tests for watch_root / get_watch_changes."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import pytest
+
+from nullout import watch
+from nullout.config import Root
+from nullout.scanner import ScanOptions
+from nullout.tools import handle_get_finding, handle_get_watch_changes, handle_watch_root
+from nullout.watch import RootWatcher, WatchRegistry, inotify_available
+
+BACKENDS = [
+    pytest.param(True, marks=pytest.mark.skipif(not inotify_available(), reason="needs inotify")),
+    False,
+]
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    reg = WatchRegistry()
+    monkeypatch.setattr(watch, "registry_ref", reg)
+    yield reg
+    reg.stop_all()
+
+
+def _touch(path: str) -> None:
+    with open(path, "w") as f:
+        f.write("x")
+
+
+def _wait_changes(since: int, count: int, timeout: float = 5.0) -> list[dict]:
+    deadline = time.monotonic() + timeout
+    while True:
+        changes = handle_get_watch_changes({"sinceSeq": since})["result"]["changes"]
+        if len(changes) >= count or time.monotonic() > deadline:
+            return changes
+        time.sleep(0.02)
+
+
+def _start(roots, store, native: bool, registry) -> dict:
+    """Start a watch with a short poll interval on the requested backend."""
+    root = roots["root_test"]
+    watcher, findings = registry.watch(root.root_id, lambda: RootWatcher(
+        root, store.new_id("scan"), ScanOptions(recursive=True, include_dirs=False), store, registry,
+        poll_interval_ms=50, native=native,
+    ))
+    return {**watcher.info(), "findings": findings}
+
+
+@pytest.mark.parametrize("native", BACKENDS)
+def test_created_entries_become_findings(temp_root, store, registry, native):
+    td, roots = temp_root
+    os.makedirs(os.path.join(td, "a"))
+    _touch(os.path.join(td, "a", "NUL.txt"))
+    started = _start(roots, store, native, registry)
+    assert started["backend"] == ("inotify" if native else "poll")
+    assert [f["relativePath"] for f in started["findings"]] == [os.path.join("a", "NUL.txt")]
+
+    time.sleep(0.06)  # let a poll record the starting mtimes (coarse-mtime filesystems)
+    _touch(os.path.join(td, "a", "CON.log"))
+    _touch(os.path.join(td, "a", "fine.txt"))
+    changes = _wait_changes(0, 1)
+
+    assert [(c["kind"], c["finding"]["relativePath"]) for c in changes] == [
+        ("added", os.path.join("a", "CON.log")),
+    ]
+    finding_id = changes[0]["finding"]["findingId"]
+    assert handle_get_finding({"findingId": finding_id}, store)["ok"]
+
+
+@pytest.mark.parametrize("native", BACKENDS)
+def test_new_subtree_and_removals(temp_root, store, registry, native):
+    td, roots = temp_root
+    _touch(os.path.join(td, "AUX"))
+    started = _start(roots, store, native, registry)
+    aux_id = started["findings"][0]["findingId"]
+
+    # A directory moved in with contents: its subtree is walked and watched
+    staging = os.path.join(os.path.dirname(td), os.path.basename(td) + "_staging")
+    os.makedirs(os.path.join(staging, "deep"))
+    _touch(os.path.join(staging, "deep", "PRN.txt"))
+    try:
+        os.rename(staging, os.path.join(td, "moved"))
+    finally:
+        if os.path.isdir(staging):
+            os.rmdir(staging)
+    changes = _wait_changes(0, 1)
+    assert changes[0]["finding"]["relativePath"] == os.path.join("moved", "deep", "PRN.txt")
+    seq = changes[-1]["seq"]
+
+    os.remove(os.path.join(td, "AUX"))
+    os.remove(os.path.join(td, "moved", "deep", "PRN.txt"))
+    changes = _wait_changes(seq, 2)
+    assert sorted((c["kind"], c["relativePath"]) for c in changes) == [
+        ("removed", "AUX"),
+        ("removed", os.path.join("moved", "deep", "PRN.txt")),
+    ]
+    assert not handle_get_finding({"findingId": aux_id}, store)["ok"]
+    assert store.get_scan_findings(started["scanId"]) == []
+
+
+@pytest.mark.parametrize("native", BACKENDS)
+def test_replaced_entries_change_identity(temp_root, store, registry, native):
+    td, roots = temp_root
+    _touch(os.path.join(td, "NUL.txt"))
+    _touch(os.path.join(td, "AUX.txt"))
+    started = _start(roots, store, native, registry)
+    old_ids = {f["relativePath"]: f["findingId"] for f in started["findings"]}
+
+    time.sleep(0.06)
+    _touch(os.path.join(td, "staging"))
+    os.replace(os.path.join(td, "staging"), os.path.join(td, "NUL.txt"))  # same name, new file
+    os.remove(os.path.join(td, "AUX.txt"))
+    os.mkdir(os.path.join(td, "AUX.txt"))  # now a directory, not reported (include_dirs=False)
+    changes = _wait_changes(0, 3)
+
+    paths = [c.get("relativePath") or c["finding"]["relativePath"] for c in changes]
+    assert sorted(zip([c["kind"] for c in changes], paths)) == [
+        ("added", "NUL.txt"), ("removed", "AUX.txt"), ("removed", "NUL.txt"),
+    ]
+    removed = {c["relativePath"]: c["findingId"] for c in changes if c["kind"] == "removed"}
+    assert removed == old_ids
+    added = next(c["finding"] for c in changes if c["kind"] == "added")
+    assert added["findingId"] != old_ids["NUL.txt"]
+    assert store.get_scan_findings(started["scanId"]) == [added["findingId"]]
+
+
+def test_slow_start_does_not_block_other_roots(temp_root, store, registry, tmp_path, monkeypatch):
+    _, roots = temp_root
+    roots["root_other"] = Root(root_id="root_other", display_name="Other", path=str(tmp_path))
+    entered, release = threading.Event(), threading.Event()
+    original = RootWatcher.start
+
+    def start(self):
+        if self.root.root_id == "root_test":
+            entered.set()
+            release.wait(5)
+        return original(self)
+
+    monkeypatch.setattr(RootWatcher, "start", start)
+
+    def watch_root(root_id):
+        registry.watch(root_id, lambda: RootWatcher(
+            roots[root_id], store.new_id("scan"), ScanOptions(recursive=True, include_dirs=False), store, registry, poll_interval_ms=50,
+        ))
+
+    slow = threading.Thread(target=watch_root, args=("root_test",))
+    slow.start()
+    try:
+        assert entered.wait(5)
+        other = threading.Thread(target=watch_root, args=("root_other",))
+        other.start()
+        other.join(2)
+        assert not other.is_alive()
+        assert list(registry.watchers) == ["root_other"]
+    finally:
+        release.set()
+        slow.join()
+    assert sorted(registry.watchers) == ["root_other", "root_test"]
+
+
+def test_watch_root_tool(temp_root, store, registry):
+    td, roots = temp_root
+    _touch(os.path.join(td, "NUL"))
+    args = {"rootId": "root_test", "pollIntervalMs": 50, "fields": ["relativePath"]}
+    first = handle_watch_root(args, roots, store)["result"]
+    assert first["findings"] == [{"relativePath": "NUL"}]
+
+    again = handle_watch_root(args, roots, store)["result"]
+    assert again["scanId"] == first["scanId"]
+    assert again["findings"] == first["findings"]
+
+    stopped = handle_watch_root({"rootId": "root_test", "stop": True}, roots, store)["result"]
+    assert stopped["stopped"] is True
+    assert not registry.watchers
+
+    result = handle_watch_root({"rootId": "nope"}, roots, store)
+    assert result["error"]["code"] == "E_ROOT_NOT_ALLOWED"
+
+
+def test_concurrent_watch_calls_start_one_watcher(temp_root, store, registry):
+    td, roots = temp_root
+    _touch(os.path.join(td, "NUL.txt"))
+    barrier = threading.Barrier(4)
+    results = []
+
+    def call():
+        barrier.wait()
+        results.append(handle_watch_root({"rootId": "root_test", "pollIntervalMs": 50}, roots, store))
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({r["result"]["scanId"] for r in results}) == 1
+    assert all(len(r["result"]["findings"]) == 1 for r in results)
+    assert list(registry.watchers) == ["root_test"]
+    assert sum(t.name == "nullout-watch-root_test" for t in threading.enumerate()) == 1
+
+    registry.stop_all()
+    assert registry.watchers == {}
+    assert not any(t.name == "nullout-watch-root_test" for t in threading.enumerate())
+
+
+def test_change_log_truncation_and_paging():
+    reg = WatchRegistry(limit=3)
+    for i in range(5):
+        reg.emit("r", "removed", findingId=f"f{i}", relativePath=str(i))
+    changes, truncated = reg.changes(0)
+    assert truncated
+    assert [c["seq"] for c in changes] == [3, 4, 5]
+    changes, truncated = reg.changes(3, limit=1)
+    assert not truncated
+    assert [c["seq"] for c in changes] == [4]